@@ -0,0 +1,104 @@
+"""
+Run the benchmarks without asv.
+
+    python -m benchmarks [-k pattern] [--repeat 5] [--json results.json]
+
+time_* methods report the best wall time of the repeats.
+peakmem_* methods report the peak memory traced by tracemalloc, together with
+the growth of the maximum resident set size of this process.
+"""
+import sys
+import json
+import time
+import inspect
+import argparse
+import itertools
+import tracemalloc
+import gc
+
+from . import benchmarks
+
+
+def _max_rss():
+    """ Maximum resident set size of this process in bytes, if available """
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes in linux, bytes in mac
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _cases():
+    """ Yield (name, class, method name, params) of every benchmark """
+    for cls_name, cls in inspect.getmembers(benchmarks, inspect.isclass):
+        if cls.__module__ != benchmarks.__name__:
+            continue
+        params = getattr(cls, 'params', None)
+        if params is None:
+            param_list = [()]
+        elif len(params) > 0 and isinstance(params[0], list):
+            param_list = list(itertools.product(*params))
+        else:
+            param_list = [(p, ) for p in params]
+        for method in sorted(vars(cls)):
+            if not method.startswith(('time_', 'peakmem_')):
+                continue
+            for p in param_list:
+                name = '{}.{}'.format(cls_name, method)
+                if p:
+                    name += '({})'.format(', '.join(repr(v) for v in p))
+                yield name, cls, method, p
+
+
+def run(pattern=None, repeat=5):
+    results = {}
+    for name, cls, method, params in _cases():
+        if pattern is not None and pattern not in name:
+            continue
+        instance = cls()
+        if hasattr(instance, 'setup'):
+            instance.setup(*params)
+        func = getattr(instance, method)
+        gc.collect()
+        if method.startswith('time_'):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func(*params)
+                times.append(time.perf_counter() - start)
+            results[name] = {'time': min(times)}
+            print('{:60s} {:10.4f} s'.format(name, min(times)))
+        else:
+            # warm up, so that the imports inside the method are not counted
+            func(*params)
+            gc.collect()
+            rss = _max_rss()
+            tracemalloc.start()
+            func(*params)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rss_growth = None if rss is None else _max_rss() - rss
+            results[name] = {'peakmem': peak, 'max_rss_growth': rss_growth}
+            print('{:60s} {:10.1f} MB'.format(name, peak / 1024**2))
+        if hasattr(instance, 'teardown'):
+            instance.teardown(*params)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the sif_parser benchmarks.')
+    parser.add_argument('-k', dest='pattern', help='run benchmarks whose name contains this.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='save the results into this file.')
+    args = parser.parse_args()
+
+    results = run(args.pattern, args.repeat)
+    if args.json is not None:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
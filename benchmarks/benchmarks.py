@@ -0,0 +1,116 @@
+"""
+Benchmarks of the readers, in the asv style.
+
+`time_*` methods measure the wall time and `peakmem_*` methods measure the
+peak memory. They can be run by asv, or offline by `python -m benchmarks`.
+
+The size of the synthetic data is controlled by the environment variables
+SIF_BENCH_FRAMES, SIF_BENCH_HEIGHT and SIF_BENCH_WIDTH.
+The data is generated once into SIF_BENCH_DIR (default: a temporary directory).
+"""
+import os
+import tempfile
+import numpy as np
+import sif_parser
+from sif_parser import _sif_open
+
+from .generate import make_sif, make_spool
+
+
+N_FRAMES = int(os.environ.get('SIF_BENCH_FRAMES', 200))
+HEIGHT = int(os.environ.get('SIF_BENCH_HEIGHT', 256))
+WIDTH = int(os.environ.get('SIF_BENCH_WIDTH', 256))
+DATA_DIR = os.environ.get(
+    'SIF_BENCH_DIR', os.path.join(tempfile.gettempdir(), 'sif_parser_bench'))
+
+
+def sif_path():
+    path = os.path.join(DATA_DIR, 'bench_{}x{}x{}.sif'.format(N_FRAMES, HEIGHT, WIDTH))
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        make_sif(path + '.tmp', N_FRAMES, HEIGHT, WIDTH)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def spool_path():
+    path = os.path.join(DATA_DIR, 'bench_spool_{}x{}x{}'.format(N_FRAMES, HEIGHT, WIDTH))
+    if not os.path.exists(path):
+        make_spool(path + '.tmp', N_FRAMES, HEIGHT, WIDTH, images_per_file=10)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+class Header:
+    def setup(self):
+        self.path = sif_path()
+
+    def time_open_header(self):
+        with open(self.path, 'rb') as f:
+            _sif_open._open(f)
+
+
+class NpOpen:
+    params = [None, 'memmap', 'dask']
+    param_names = ['lazy']
+
+    def setup(self, lazy):
+        self.path = sif_path()
+
+    def time_np_open(self, lazy):
+        sif_parser.np_open(self.path, lazy=lazy)
+
+    def time_np_open_and_sum(self, lazy):
+        data, info = sif_parser.np_open(self.path, lazy=lazy)
+        np.asarray(data.sum(axis=0))
+
+    def peakmem_np_open_and_sum(self, lazy):
+        data, info = sif_parser.np_open(self.path, lazy=lazy)
+        np.asarray(data.sum(axis=0))
+
+
+class NpOpenWorkers:
+    params = [1, 2, 4, 8]
+    param_names = ['workers']
+
+    def setup(self, workers):
+        self.path = sif_path()
+
+    def time_np_open(self, workers):
+        sif_parser.np_open(self.path, workers=workers)
+
+
+class XrOpen:
+    params = [None, 'dask']
+    param_names = ['lazy']
+
+    def setup(self, lazy):
+        self.path = sif_path()
+
+    def time_xr_open(self, lazy):
+        sif_parser.xr_open(self.path, lazy=lazy)
+
+    def peakmem_xr_open(self, lazy):
+        sif_parser.xr_open(self.path, lazy=lazy)
+
+
+class SpoolOpen:
+    def setup(self):
+        self.path = spool_path()
+
+    def time_np_spool_open(self):
+        sif_parser.np_spool_open(self.path)
+
+    def peakmem_np_spool_open(self):
+        sif_parser.np_spool_open(self.path)
+
+
+class Reduce:
+    def setup(self):
+        self.path = sif_path()
+
+    def time_reduce(self):
+        sif_parser.reduce(self.path, ops=['sum', 'max', 'frame_total'])
+
+    def peakmem_reduce(self):
+        sif_parser.reduce(self.path, ops=['sum', 'max', 'frame_total'])
@@ -0,0 +1,104 @@
+"""
+Generate synthetic sif files and spooling directories of any size for the
+benchmarks.
+
+    python -m benchmarks.generate /path/to/file.sif --frames 1000 --height 512 --width 512
+    python -m benchmarks.generate /path/to/spool_dir --spool --frames 1000
+"""
+import os
+import argparse
+import numpy as np
+import sif_parser
+
+
+def _info(n_frames, height, width):
+    """ Metadata of the synthetic acquisition """
+    info = {
+        'NumberOfFrames': n_frames,
+        'size': (width, height),
+        'ExperimentTime': 1690545064,
+        'DetectorTemperature': -60.0,
+        'ExposureTime': 0.1,
+        'CycleTime': 0.1,
+        'DetectorType': 'synthetic',
+        'OriginalFilename': 'C:\\data\\synthetic.sif',
+    }
+    return info
+
+
+def _frames(n_frames, height, width, block_frames, seed, dtype=np.float32):
+    """ Yield blocks of realistic-looking frames: a background with shot noise """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[:height, :width]
+    signal = 500.0 + 2000.0 * np.exp(
+        -((x - width / 2)**2 + (y - height / 2)**2) / (0.1 * (width**2 + height**2) + 1))
+    for start in range(0, n_frames, block_frames):
+        n = min(block_frames, n_frames - start)
+        yield rng.poisson(signal, size=(n, height, width)).astype(dtype)
+
+
+def make_sif(path, n_frames=100, height=512, width=512, block_frames=64, seed=0):
+    """
+    Write a synthetic sif file with float32 frames.
+    The frames are generated block by block so any size can be made.
+    """
+    sif_parser.write_sif(
+        path, _frames(n_frames, height, width, block_frames, seed),
+        _info(n_frames, height, width))
+    return path
+
+
+def make_spool(spool_dir, n_frames=100, height=512, width=512,
+               encoding='Mono32', images_per_file=1, padding=800, seed=0):
+    """
+    Write a synthetic spooling directory: a .sifx header, an .ini file and
+    *spool.dat files that contain images_per_file frames each.
+    Each frame is followed by `padding` bytes, as Andor Solis does.
+    """
+    dtype = {'Mono16': '<u2', 'Mono32': '<u4'}[encoding]
+    itemsize = np.dtype(dtype).itemsize
+    os.makedirs(spool_dir, exist_ok=True)
+    sif_parser.write_sif(
+        os.path.join(spool_dir, 'Spooled files.sifx'), None,
+        _info(n_frames, height, width))
+    frame_bytes = height * width * itemsize + padding
+    with open(os.path.join(spool_dir, 'acquisitionmetadata.ini'), 'w') as f:
+        f.write('[data]\n'
+                'AOIHeight = {}\nAOIWidth = {}\nAOIStride = {}\n'
+                'PixelEncoding = {}\nImageSizeBytes = {}\n\n\n'
+                '[multiimage]\nImagesPerFile = {}\n'.format(
+                    height, width, width * itemsize, encoding, frame_bytes,
+                    images_per_file))
+
+    blocks = _frames(n_frames, height, width, images_per_file, seed, dtype=dtype)
+    for i, block in enumerate(blocks):
+        # Andor names the files with the reversed index
+        filename = str(i).zfill(10)[::-1] + 'spool.dat'
+        with open(os.path.join(spool_dir, filename), 'wb') as f:
+            for frame in block:
+                frame.tofile(f)
+                f.write(b'\x00' * padding)
+    return spool_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic sif file.')
+    parser.add_argument('path', help='path of the sif file or the spooling directory.')
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--height', type=int, default=512)
+    parser.add_argument('--width', type=int, default=512)
+    parser.add_argument('--spool', action='store_true',
+                        help='make a spooling directory instead of a sif file.')
+    parser.add_argument('--encoding', default='Mono32', choices=['Mono16', 'Mono32'])
+    parser.add_argument('--images-per-file', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.spool:
+        make_spool(args.path, args.frames, args.height, args.width,
+                   encoding=args.encoding, images_per_file=args.images_per_file)
+    else:
+        make_sif(args.path, args.frames, args.height, args.width)
+
+
+if __name__ == '__main__':
+    main()
@@ -40,6 +40,8 @@ setup(name='sif_parser',
       install_requires=[
         'numpy>=1.10',
         'pandas'],
+      extras_require={
+        'pil': ['Pillow>=10.1']},
       classifiers=['License :: OSI Approved :: BSD License',
                    'Natural Language :: English',
                    'Operating System :: MacOS :: MacOS X',
@@ -48,6 +50,7 @@ setup(name='sif_parser',
                    'Programming Language :: Python :: 3.6',
                    'Topic :: Scientific/Engineering :: Physics'],
       entry_points={
-          'console_scripts': ['sif_parser=sif_parser.__main__:_main']
+          'console_scripts': ['sif_parser=sif_parser.__main__:_main'],
+          'xarray.backends': ['sif=sif_parser.xarray_backend:SifBackendEntrypoint'],
           }
       )
@@ -1,3 +1,15 @@
 from ._version import __version__, __version_info__
 from .sif_open import np_open, xr_open, np_spool_open, xr_spool_open
+from .sif_file import SifFile
+from ._sif_open import SifHeader
+from ._sif_write import write_sif
+from ._convert import convert
+from ._arrow import to_arrow, to_arrow_reader
+from ._compressed import build_index
+from .streaming import follow, reduce
+from .shared import share, SharedSif
+from .multifile import open_mfsif
+from ._instrument import instrument
 from . import utils
+from . import remote
+from . import catalog
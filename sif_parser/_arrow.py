@@ -0,0 +1,169 @@
+import json
+
+import numpy as np
+
+from .sif_file import SifFile
+from .sif_open import _seconds, _attrs, _header_calibration
+from .utils import _jsonable
+
+# Export to Apache Arrow.
+# The counts are wrapped without copying: pyarrow uses the buffer of the
+# float32 frames as the values of the column.
+
+_LAYOUTS = ['spectra', 'long']
+
+
+def to_arrow(path, layout='spectra', ignore_corrupt=False):
+    """
+    Read a sif file into pyarrow.Table.
+
+    Parameters
+    ----------
+    path:
+        path to the file, or a binary file object.
+    layout: either of 'spectra' | 'long'
+        'spectra': a row for each row of each frame, with the columns
+            frame, row, time and counts, which is a FixedSizeList of the
+            pixels of the row. The counts are not copied.
+            If the calibration differs among the frames, the wavelength
+            column has the calibration of each row. Otherwise the
+            calibration is in the schema metadata.
+        'long': a row for each pixel, with the columns frame, row, pixel,
+            time, wavelength (if calibrated) and counts.
+    ignore_corrupt:
+        True if ignore the corrupted frames.
+
+    Returns
+    -------
+    table: pyarrow.Table
+        The metadata (info of np_open without the timestamps) is in the
+        schema metadata, each as a JSON string.
+    """
+    with SifFile(path, ignore_corrupt=ignore_corrupt) as sif:
+        exporter = _Exporter(sif, layout)
+        return exporter.table(sif[:])
+
+
+def to_arrow_reader(path, batch_frames=64, layout='spectra',
+                    ignore_corrupt=False):
+    """
+    Read a sif file as a stream of pyarrow.RecordBatch, batch_frames frames
+    at a time, so that a large file can be written to Parquet without
+    loading it into the memory.
+
+    >>> reader = sif_parser.to_arrow_reader('/path/to/file.sif')
+    >>> with pyarrow.parquet.ParquetWriter('file.parquet', reader.schema) as writer:
+    ...     for batch in reader:
+    ...         writer.write_batch(batch)
+
+    Parameters
+    ----------
+    path:
+        path to the file, or a binary file object.
+    batch_frames: int
+        number of frames in a batch.
+    layout, ignore_corrupt:
+        see to_arrow.
+
+    Returns
+    -------
+    reader: pyarrow.RecordBatchReader
+    """
+    if batch_frames < 1:
+        raise ValueError('batch_frames should be positive. Given {}'.format(
+            batch_frames))
+    sif = SifFile(path, ignore_corrupt=ignore_corrupt)
+    try:
+        exporter = _Exporter(sif, layout)
+    except Exception:
+        sif.close()
+        raise
+
+    def batches():
+        with sif:
+            for start in range(0, len(sif), batch_frames):
+                yield exporter.batch(sif[start:start + batch_frames], start)
+
+    return exporter.pa.RecordBatchReader.from_batches(exporter.schema, batches())
+
+
+class _Exporter(object):
+    """ Schema and record batches of a file """
+    def __init__(self, sif, layout):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(
+                "pyarrow needs to be installed to use to_arrow."
+            )
+        if layout not in _LAYOUTS:
+            raise ValueError('layout should be one of {}. Given {}'.format(
+                _LAYOUTS, layout))
+        self.pa = pa = pyarrow
+        self.layout = layout
+        header = sif.header
+        n, height, width = sif.shape
+        info = header.as_dict(frames=False)
+        self.times = _seconds(header.timestamps[:n])
+        self.calibration = _header_calibration(header, info)
+        if self.calibration is not None and self.calibration.shape[-1] != width:
+            # such as of an image
+            self.calibration = None
+
+        metadata = {key: json.dumps(_jsonable(value), allow_nan=False)
+                    for key, value in _attrs(info).items()}
+        fields = [pa.field('frame', pa.int32()), pa.field('row', pa.int32())]
+        if layout == 'long':
+            fields.append(pa.field('pixel', pa.int32()))
+        fields.append(pa.field('time', pa.float64()))
+        if layout == 'spectra':
+            if self.calibration is not None and self.calibration.ndim == 2:
+                fields.append(pa.field('wavelength', pa.list_(pa.float64(), width)))
+            elif self.calibration is not None:
+                metadata['calibration'] = json.dumps(_jsonable(self.calibration), allow_nan=False)
+            fields.append(pa.field('counts', pa.list_(pa.float32(), width)))
+        else:
+            if self.calibration is not None:
+                fields.append(pa.field('wavelength', pa.float64()))
+            fields.append(pa.field('counts', pa.float32()))
+        self.schema = pa.schema(fields, metadata=metadata)
+
+    def table(self, data):
+        return self.pa.Table.from_batches([self.batch(data, 0)], schema=self.schema)
+
+    def batch(self, data, start):
+        """ RecordBatch of the frames data, which start from the frame start """
+        pa = self.pa
+        n, height, width = data.shape
+        frames = np.arange(start, start + n, dtype=np.int32)
+        times = self.times[start:start + n]
+        calibration = self.calibration
+        if calibration is not None and calibration.ndim == 2:
+            calibration = calibration[start:start + n]
+        # a view of data, which pyarrow wraps without copying
+        values = pa.array(np.ascontiguousarray(data).reshape(-1), type=pa.float32())
+
+        if self.layout == 'spectra':
+            columns = [
+                pa.array(np.repeat(frames, height)),
+                pa.array(np.tile(np.arange(height, dtype=np.int32), n)),
+                pa.array(np.repeat(times, height)),
+            ]
+            if calibration is not None and calibration.ndim == 2:
+                wavelength = np.repeat(calibration, height, axis=0).reshape(-1)
+                columns.append(pa.FixedSizeListArray.from_arrays(
+                    pa.array(wavelength), width))
+            columns.append(pa.FixedSizeListArray.from_arrays(values, width))
+        else:
+            columns = [
+                pa.array(np.repeat(frames, height * width)),
+                pa.array(np.tile(np.repeat(np.arange(height, dtype=np.int32), width), n)),
+                pa.array(np.tile(np.arange(width, dtype=np.int32), n * height)),
+                pa.array(np.repeat(times, height * width)),
+            ]
+            if calibration is not None:
+                wavelength = np.broadcast_to(
+                    calibration.reshape(-1, 1, width), (n, height, width))
+                columns.append(pa.array(wavelength.reshape(-1)))
+            columns.append(values)
+        return pa.RecordBatch.from_arrays(columns, schema=self.schema)
@@ -0,0 +1,288 @@
+import io
+import os
+import json
+import bz2
+import lzma
+import zlib
+
+# Transparent reading of compressed sif files, such as file.sif.gz.
+#
+# Frames are located by their offsets in the decompressed data, so the
+# decompressed stream must be seekable. A seek backward (or far forward)
+# restarts from the nearest checkpoint before the target instead of the
+# beginning of the file:
+# + the beginning of every gzip member / xz or bz2 stream. These can be saved
+#   into an index file by build_index, because a new decompressor starts there.
+# + for gzip, a copy of the decompressor state every `interval` bytes.
+#   zlib does not serialize its state, so these are kept only in memory.
+#   At most MAX_CHECKPOINTS of them are kept: when there are more, the
+#   interval is doubled and every other one is dropped.
+#   xz and bz2 have no such checkpoints, so a seek backward within a stream
+#   decompresses it from the beginning of the stream.
+#   Restarting inside a deflate stream from a saved window (as zran does)
+#   needs the bit position of a deflate block boundary and inflatePrime,
+#   which the zlib module does not expose.
+# Therefore, the index only helps random access of multi-member files. For a
+# single-member file, it only saves the scan for the length, and the first
+# access of each frame after reopening decompresses from the beginning.
+
+_MAGICS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+]
+CHECKPOINT_INTERVAL = 4 << 20
+MAX_CHECKPOINTS = 64
+_CHUNK = 1 << 16
+_INDEX_SUFFIX = '.index.json'
+
+
+def detect(f):
+    """
+    Returns the codec of the binary file f, or None if not compressed.
+    The position of f is kept.
+    """
+    position = f.tell()
+    magic = f.read(6)
+    f.seek(position)
+    for prefix, codec in _MAGICS:
+        if magic.startswith(prefix):
+            return codec
+    return None
+
+
+def _decompressor(codec):
+    if codec == 'gzip':
+        return zlib.decompressobj(wbits=31)
+    if codec == 'xz':
+        return lzma.LZMADecompressor()
+    return bz2.BZ2Decompressor()
+
+
+def open_compressed(path, codec=None, interval=CHECKPOINT_INTERVAL):
+    """
+    Open a compressed file as a seekable binary file object of the
+    decompressed content. The index saved by build_index is used if it is
+    up to date.
+    """
+    path = os.fspath(path)
+    raw = open(path, 'rb')
+    try:
+        codec = codec or detect(raw)
+        if codec is None:
+            raise ValueError('{} is not compressed.'.format(path))
+        reader = CompressedReader(raw, codec, interval=interval)
+        index = _load_index(path, raw)
+        if index is not None:
+            reader._set_index(index)
+    except Exception:
+        raw.close()
+        raise
+    return io.BufferedReader(reader, buffer_size=_CHUNK)
+
+
+def build_index(path, index_path=None, interval=CHECKPOINT_INTERVAL):
+    """
+    Decompress the file once and save its index next to it, so that the
+    next open does not need to decompress the whole file to find its size,
+    and can start at any gzip member / xz or bz2 stream.
+
+    Only the boundaries of the members are saved. A file of a single member
+    (as made by the plain gzip, xz or bzip2) is still decompressed from the
+    beginning to reach a frame after it is reopened. Compress it in
+    independent blocks, e.g. by bgzip or pbzip2, for fast random access.
+
+    Parameters
+    ----------
+    path:
+        path to the compressed file
+    index_path:
+        path to the index file. Default: path + '.index.json'
+
+    Returns
+    -------
+    index_path: str
+    """
+    path = os.fspath(path)
+    index_path = index_path or path + _INDEX_SUFFIX
+    with open(path, 'rb') as raw:
+        codec = detect(raw)
+        if codec is None:
+            raise ValueError('{} is not compressed.'.format(path))
+        reader = CompressedReader(raw, codec, interval=interval)
+        length = reader.seek(0, io.SEEK_END)
+        stat = os.fstat(raw.fileno())
+        index = {
+            'codec': codec,
+            'compressed_size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'length': length,
+            'members': [[d, c] for d, c, state in reader._checkpoints if state is None],
+        }
+    with open(index_path, 'w') as f:
+        json.dump(index, f)
+    return index_path
+
+
+def _load_index(path, raw):
+    index_path = path + _INDEX_SUFFIX
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'r') as f:
+        index = json.load(f)
+    stat = os.fstat(raw.fileno())
+    if (index.get('compressed_size') != stat.st_size or
+            index.get('mtime_ns') != stat.st_mtime_ns):
+        # the index is for an older file
+        return None
+    return index
+
+
+class CompressedReader(io.RawIOBase):
+    """
+    Seekable raw file object of the decompressed content of raw.
+    """
+    def __init__(self, raw, codec, interval=CHECKPOINT_INTERVAL):
+        self._raw = raw
+        self._codec = codec
+        self._interval = interval
+        self._start = raw.tell()
+        # (decompressed position, compressed position, decompressor or None)
+        self._checkpoints = [(0, self._start, None)]
+        self._length = None
+        self._pos = 0
+        self._restore(self._checkpoints[0])
+
+    def _set_index(self, index):
+        self._checkpoints = [(d, c, None) for d, c in index['members']]
+        self._length = index['length']
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            if self._length is None:
+                # decompress until the end, which also builds the checkpoints
+                self._goto(max(self._dpos, self._checkpoints[-1][0]))
+                while self._fill():
+                    self._buffer = b''
+                    self._buffer_start = self._dpos
+            offset += self._length
+        if offset < 0:
+            raise ValueError('negative seek position {}'.format(offset))
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, b):
+        out = memoryview(b).cast('B')
+        self._goto(self._pos)
+        n = 0
+        while n < len(out):
+            if self._pos >= self._dpos and not self._fill():
+                break
+            start = self._pos - self._buffer_start
+            chunk = self._buffer[start:start + len(out) - n]
+            out[n:n + len(chunk)] = chunk
+            n += len(chunk)
+            self._pos += len(chunk)
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._raw.close()
+            self._decompressor = None
+            self._checkpoints = []
+        super().close()
+
+    def _restore(self, checkpoint):
+        dpos, cpos, state = checkpoint
+        self._decompressor = _decompressor(self._codec) if state is None else state.copy()
+        self._cpos = cpos
+        self._dpos = dpos
+        self._buffer = b''
+        self._buffer_start = dpos
+        self._eof = False
+
+    def _goto(self, pos):
+        """ Make the decompressed data at pos available next """
+        if self._buffer_start <= pos <= self._dpos:
+            return
+        # the last checkpoint before pos
+        checkpoint = self._checkpoints[0]
+        for c in self._checkpoints:
+            if c[0] > pos:
+                break
+            checkpoint = c
+        if pos < self._buffer_start or checkpoint[0] > self._dpos:
+            self._restore(checkpoint)
+        while self._dpos < pos:
+            self._buffer = b''
+            self._buffer_start = self._dpos
+            if not self._fill():
+                return
+
+    def _fill(self):
+        """
+        Decompress the next chunk into the buffer.
+        Returns False at the end of the data.
+        """
+        while not self._eof:
+            self._raw.seek(self._cpos)
+            data = self._raw.read(_CHUNK)
+            if not data:
+                self._eof = True
+                break
+            self._cpos += len(data)
+            output = self._decompress(data)
+            if output:
+                self._buffer = self._buffer[self._pos - self._buffer_start:] if (
+                    self._buffer_start <= self._pos <= self._dpos) else b''
+                self._buffer_start = self._dpos - len(self._buffer)
+                self._buffer += output
+                self._dpos += len(output)
+                self._checkpoint()
+                return True
+        self._length = self._dpos
+        return False
+
+    def _decompress(self, data):
+        outputs = [self._decompressor.decompress(data)]
+        while self._decompressor.eof:
+            # the next gzip member or the next xz / bz2 stream
+            unused = self._decompressor.unused_data
+            dpos = self._dpos + sum(len(o) for o in outputs)
+            cpos = self._cpos - len(unused)
+            if unused.strip(b'\x00') == b'' and self._raw.read(1) in [b'', b'\x00']:
+                # trailing padding
+                self._eof = True
+                break
+            self._decompressor = _decompressor(self._codec)
+            if dpos > self._checkpoints[-1][0]:
+                self._checkpoints.append((dpos, cpos, None))
+            outputs.append(self._decompressor.decompress(unused))
+        return b''.join(outputs)
+
+    def _checkpoint(self):
+        """ Keep the decompressor state every interval bytes """
+        if self._codec != 'gzip' or self._eof:
+            return
+        last = self._checkpoints[-1][0]
+        if self._dpos - last >= self._interval:
+            self._checkpoints.append(
+                (self._dpos, self._cpos, self._decompressor.copy()))
+            states = [c for c in self._checkpoints if c[2] is not None]
+            if len(states) > MAX_CHECKPOINTS:
+                # bound the memory for a large file
+                self._interval *= 2
+                dropped = set(id(c) for c in states[::2])
+                self._checkpoints = [
+                    c for c in self._checkpoints if id(c) not in dropped]
@@ -0,0 +1,152 @@
+import os
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .sif_open import _CHUNK_BYTES
+from .streaming import _block_tasks, _map_blocks
+from .utils import extract_calibration, _jsonable
+
+_META_FILE = 'meta.json'
+_CHUNK_FILE = 'chunk_{:06d}.npy'
+
+
+def convert(path, dest, chunks=None, format=None, workers=4,
+            ignore_corrupt=False):
+    """
+    Convert a sif file or a spooling acquisition into a chunked array store
+    on the disk, which can be read in parallel for the repeated analysis.
+
+    The frames are streamed block by block from the file, and the chunks are
+    written (and compressed, for zarr) by a pool of threads, so that the
+    whole data is never held in the memory.
+
+    Parameters
+    ----------
+    path:
+        path to the sif file or to the spooling directory.
+    dest:
+        path to the store to create.
+    chunks: int
+        number of frames in a chunk. Default: as many as fit in 16 MB.
+    format: either of None | 'zarr' | 'npy'
+        'zarr': a zarr array, compressed by the default compressor of zarr,
+            with the metadata in its attributes. This requires zarr installed.
+        'npy': a directory of chunk_000000.npy, chunk_000001.npy, ... which
+            can be opened by np.load(mmap_mode='r'), and meta.json.
+            The chunks are not compressed, so that they can be memory-mapped.
+        None: 'zarr' if zarr is installed, otherwise 'npy'.
+    workers: int
+        number of threads that read and write the chunks.
+    ignore_corrupt:
+        True if ignore the corrupted frames (or missing *.dat files).
+
+    Returns
+    -------
+    dest: str
+
+    The metadata holds
+        info: the metadata as np_open returns, without the items of each
+            frame (the timestamps, the calibrations and the tile)
+        timestamps: list of the timestamp of each frame
+        calibration: the calibration of each pixel (or of each frame), or None
+    and, for 'npy', shape, dtype and chunks (the number of frames in each
+    chunk file).
+    """
+    if format is None:
+        try:
+            import zarr
+            format = 'zarr'
+        except ImportError:
+            format = 'npy'
+    elif format == 'zarr':
+        import zarr
+    elif format != 'npy':
+        raise ValueError(
+            'format should be "zarr" or "npy". Given {}'.format(format))
+
+    path = os.fspath(path)
+    dest = os.fspath(dest)
+    # the blocks read, of about _CHUNK_BYTES, are regrouped into the chunks
+    tasks, info, shape, dtype = _block_tasks(path, None, ignore_corrupt)
+    if chunks is None:
+        frame_bytes = max(int(np.prod(shape[1:])) * dtype.itemsize, 1)
+        chunks = max(_CHUNK_BYTES // frame_bytes, 1)
+    meta = _metadata(info, shape[0])
+
+    if format == 'zarr':
+        array = zarr.open_array(
+            dest, mode='w', shape=shape, chunks=(chunks, ) + shape[1:],
+            dtype=dtype)
+        array.attrs.update(meta)
+
+        def write(i, block):
+            array[i * chunks:i * chunks + len(block)] = block
+    else:
+        os.makedirs(dest, exist_ok=True)
+
+        def write(i, block):
+            np.save(os.path.join(dest, _CHUNK_FILE.format(i)), block)
+
+    sizes = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for i, block in enumerate(_chunked(_map_blocks(lambda b: b, tasks, workers),
+                                           chunks, shape[1:], dtype)):
+            sizes.append(len(block))
+            pending.append(executor.submit(write, i, block))
+            # bound the number of chunks in the memory
+            while len(pending) >= 2 * workers:
+                pending.popleft().result()
+        while pending:
+            pending.popleft().result()
+
+    if format == 'npy':
+        meta.update({
+            'format': 'npy',
+            'shape': [sum(sizes)] + list(shape[1:]),
+            'dtype': dtype.str,
+            'chunks': sizes,
+        })
+        with open(os.path.join(dest, _META_FILE), 'w') as f:
+            json.dump(meta, f, allow_nan=False)
+    return dest
+
+
+def _chunked(blocks, chunks, frame_shape, dtype):
+    """
+    Regroup the blocks of frames into the arrays of chunks frames (the last
+    one can be shorter).
+    """
+    buffer = np.empty((chunks, ) + tuple(frame_shape), dtype=dtype)
+    n = 0
+    for block in blocks:
+        while len(block) > 0:
+            m = min(chunks - n, len(block))
+            buffer[n:n + m] = block[:m]
+            block = block[m:]
+            n += m
+            if n == chunks:
+                yield buffer
+                buffer = np.empty_like(buffer)
+                n = 0
+    if n > 0:
+        yield buffer[:n]
+
+
+def _metadata(info, n_frames):
+    """ JSON serializable metadata of the store """
+    timestamps = [info['timestamp_of_{:d}'.format(f)] for f in range(n_frames)
+                  if 'timestamp_of_{:d}'.format(f) in info]
+    calibration = extract_calibration(info)
+    # the items of each frame are stored as the timestamps and the calibration
+    return {
+        'info': {key: _jsonable(value) for key, value in info.items()
+                 if key != 'tile' and not key.startswith(
+                     ('timestamp_of_', 'Calibration_data_for_frame_'))},
+        'timestamps': [int(t) for t in timestamps],
+        'calibration': _jsonable(calibration),
+    }
+
@@ -0,0 +1,172 @@
+import time
+import functools
+import threading
+from contextlib import contextmanager
+
+# Per-stage timing and I/O accounting of the readers.
+# When no callback is registered, every hook returns right after checking
+# an empty list, so that the readers do not slow down.
+
+_callbacks = []
+_local = threading.local()
+
+
+@contextmanager
+def instrument(callback=None):
+    """
+    Report the duration and the amount of I/O of each reading stage.
+
+    Parameters
+    ----------
+    callback: callable
+        called with a dict for every finished stage, with the keys
+        stage: name of the stage, such as '_open', 'np_open', 'read',
+            'dask_graph', '_to_xarray', 'extract_calibration', 'np_spool_open'
+        duration: wall time in seconds
+        nbytes: number of bytes read in this stage (including the inner stages)
+        nreads: number of read calls in this stage
+        depth: nesting level of the stage. 0 for the outermost one.
+        If None, the events are collected into the list given by `as`.
+
+    Examples
+    --------
+    >>> with sif_parser.instrument() as events:
+    ...     sif_parser.xr_open('/path/to/file.sif')
+    >>> for event in events:
+    ...     print(event['stage'], event['duration'], event['nbytes'])
+    """
+    events = []
+    if callback is None:
+        callback = events.append
+    _callbacks.append(callback)
+    try:
+        yield events
+    finally:
+        _callbacks.remove(callback)
+
+
+def enabled():
+    return len(_callbacks) > 0
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ['name', 'start', 'nbytes', 'nreads', 'depth']
+
+    def __init__(self, name):
+        self.name = name
+        self.nbytes = 0
+        self.nreads = 0
+
+    def __enter__(self):
+        stack = _stack()
+        self.depth = len(stack)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        duration = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+        if stack:
+            stack[-1].nbytes += self.nbytes
+            stack[-1].nreads += self.nreads
+        event = {'stage': self.name, 'duration': duration,
+                 'nbytes': self.nbytes, 'nreads': self.nreads,
+                 'depth': self.depth}
+        for callback in list(_callbacks):
+            callback(event)
+        return False
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def stage(name):
+    """ Context manager that measures a stage """
+    if not _callbacks:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def timed(name):
+    """ Decorator that measures every call of the function as a stage """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _callbacks:
+                return func(*args, **kwargs)
+            with _Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_header(func):
+    """
+    Decorator for _sif_open._open, that measures it as '_open' stage
+    together with the bytes and the calls of the header reads.
+    """
+    @functools.wraps(func)
+    def wrapper(fp):
+        if not _callbacks:
+            return func(fp)
+        with _Stage('_open'):
+            reader = CountingReader(fp)
+            try:
+                return func(reader)
+            finally:
+                count(reader.nbytes, reader.nreads)
+    return wrapper
+
+
+def count(nbytes, nreads=1):
+    """ Add the amount of I/O to the current stage """
+    if not _callbacks:
+        return
+    stack = _stack()
+    if stack:
+        stack[-1].nbytes += nbytes
+        stack[-1].nreads += nreads
+
+
+class CountingReader:
+    """
+    File-like wrapper that counts the bytes and the calls of the reads,
+    used while the header is parsed.
+    """
+    def __init__(self, fp):
+        self._fp = fp
+        self.nbytes = 0
+        self.nreads = 0
+
+    def read(self, *args):
+        data = self._fp.read(*args)
+        self.nbytes += len(data)
+        self.nreads += 1
+        return data
+
+    def readline(self, *args):
+        data = self._fp.readline(*args)
+        self.nbytes += len(data)
+        self.nreads += 1
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
@@ -1,5 +1,5 @@
 import numpy as np
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 
 # Read Andor Technology Multi-Channel files with PIL.
 # Based on Marcel Leutenegger's MATLAB script.
@@ -24,6 +24,9 @@ def _read_until(fp, terminator=' '):
     word = ''
     while True:
         c = _to_string(fp.read(1))
+        if c == '':
+            # a header that is still being written (or truncated)
+            raise ValueError('Reached the end of the file')
         if c == terminator or c == '\n':
             if len(word) > 0:
                 break
@@ -64,6 +67,22 @@ def _open(fp):
     info: dict
         Dictionary containing misc data.
     """
+    header = _read_header(fp)
+    return header.tile, header.size, header.no_images, header.as_dict()
+
+
+def _read_header(fp):
+    """
+    Read the header of SIF file into SifHeader.
+
+    Parameters
+    -----------
+    fp: File pointing to SIF file
+
+    Returns
+    -------
+    header: SifHeader
+    """
     info = OrderedDict()
 
     # Line 1 - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -214,23 +233,24 @@ def _open(fp):
     info['TotalLength'] = total_length
     info['ImageLength'] = image_length
 
+    subimages = []
     for i in range(no_subimages):
         # read subimage information
         _read_until(fp, ' ') # 65538
 
         frame_area = fp.readline().strip().split()
         x0, y1, x1, y0, ybin, xbin = map(int,frame_area[:6])
-        width = int((1 + x1 - x0) / xbin)
-        height = int((1 + y1 - y0) / ybin)
-        
-    size = (int(width), int(height) * no_subimages)
-    tile = []
+        subimages.append(SubImage(x0, x1, y0, y1, xbin, ybin))
+        width = subimages[-1].width
+
+    # subimages (tracks) are stacked vertically in a frame
+    size = (int(width), sum(subimage.height for subimage in subimages))
     info['xbin'] = xbin
     info['ybin'] = ybin
+    info['SubImages'] = subimages
     
     fp = _skip_spaces(fp)
-    for f in range(no_images):
-        info['timestamp_of_{0:d}'.format(f)] = int(fp.readline())
+    timestamps = np.array([int(fp.readline()) for f in range(no_images)], dtype=np.int64)
     
     offset = fp.tell()
     try: # remove extra 0 if it exits.
@@ -252,46 +272,215 @@ def _open(fp):
     except:
         fp.seek(offset)
 
-    tile = [("raw",(0,0)+size, offset+f*width*height*no_subimages*4,
-                     ('F;32F', 0, 1)) for f in range(no_images)]
-                     
-    info['size'] = size
-    info['tile'] = tile
-    info['offset'] = offset
-    
-    info = extract_user_text(info)
-    return tile, size, no_images, info
+    return SifHeader(info, timestamps, size, offset)
 
 
-def extract_user_text(info):
+
+class SubImage(namedtuple('SubImage', ['x0', 'x1', 'y0', 'y1', 'xbin', 'ybin'])):
     """
-    Extract known information from info['user_text'].
-    Current known info is
-    + 'Calibration data for frame %d'
+    Geometry of a subimage (track) on the detector. The pixel ranges are
+    1-based and inclusive.
     """
-    user_text = info['user_text']
-    if b'Calibration data for' in user_text[:20]:
-        texts = user_text.split(b'\n')
-        for i in range(info['NumberOfFrames']):
+    __slots__ = ()
+
+    @property
+    def width(self):
+        return int((1 + self.x1 - self.x0) / self.xbin)
+
+    @property
+    def height(self):
+        return int((1 + self.y1 - self.y0) / self.ybin)
+
+
+class SifHeader(object):
+    """
+    Header of a SIF file with typed fields.
+
+    Per-frame data is kept in arrays and the text fields are kept as raw
+    bytes, which are decoded only when accessed. So the memory of a header
+    does not depend on the number of metadata keys, and many headers can be
+    held at once, e.g., in a catalog.
+
+    Attributes
+    ----------
+    version: int
+        SifVersion
+    no_images: int
+        number of frames
+    size: tuple
+        (width, height) of a frame
+    offset: int
+        position of the first frame in the file
+    timestamps: np.ndarray
+        int64 array of the timestamps of the frames in us
+    subimages: list of SubImage
+        geometry of each subimage (track), which are stacked vertically in
+        a frame
+    frame_calibrations: np.ndarray or None
+        [frames x coefficients] calibration stored for each frame
+    calibration: list or None
+        polynomial coefficients of the calibration
+
+    The other attributes correspond to the keys of the info dict, e.g.,
+    exposure_time for 'ExposureTime'. Use as_dict() for the info dict
+    returned by np_open.
+    """
+    # (key of the info dict, attribute) in the order of the info dict
+    _FIELDS = [
+        ('SifVersion', 'version'),
+        ('ExperimentTime', 'experiment_time'),
+        ('DetectorTemperature', 'detector_temperature'),
+        ('ExposureTime', 'exposure_time'),
+        ('CycleTime', 'cycle_time'),
+        ('AccumulatedCycleTime', 'accumulated_cycle_time'),
+        ('AccumulatedCycles', 'accumulated_cycles'),
+        ('StackCycleTime', 'stack_cycle_time'),
+        ('PixelReadoutTime', 'pixel_readout_time'),
+        ('GainDAC', 'gain_dac'),
+        ('GateWidth', 'gate_width'),
+        ('GratingBlaze', 'grating_blaze'),
+        ('DetectorType', 'detector_type'),
+        ('DetectorDimensions', 'detector_dimensions'),
+        ('OriginalFilename', '_original_filename'),
+        ('user_text', '_user_text'),
+        ('ShutterTime', 'shutter_time'),
+        ('spectrograph', 'spectrograph'),
+        ('GateGain', 'gate_gain'),
+        ('GateDelay', 'gate_delay'),
+        ('SifCalbVersion', 'calibration_version'),
+        ('PixelCalibration', 'pixel_calibration'),
+        ('Calibration_data', '_calibration_data'),
+        ('Calibration_data_old', '_calibration_data_old'),
+        ('RamanExWavelength', 'raman_ex_wavelength'),
+        ('FrameAxis', '_frame_axis'),
+        ('DataType', '_data_type'),
+        ('ImageAxis', '_image_axis'),
+        ('NumberOfFrames', 'no_images'),
+        ('NumberOfSubImages', 'no_subimages'),
+        ('TotalLength', 'total_length'),
+        ('ImageLength', 'image_length'),
+        ('xbin', 'xbin'),
+        ('ybin', 'ybin'),
+        ('SubImages', 'subimages'),
+    ]
+    # raw fields that are converted in as_dict
+    _RAW_KEYS = ['user_text', 'Calibration_data', 'Calibration_data_old']
+    __slots__ = [attr for key, attr in _FIELDS] + ['timestamps', 'size', 'offset']
+
+    def __init__(self, info, timestamps, size, offset):
+        for key, attr in self._FIELDS:
+            setattr(self, attr, info.get(key, None))
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.size = tuple(size)
+        self.offset = offset
+
+    @classmethod
+    def read(cls, sif_file):
+        """
+        Read the header from a path or a binary file object.
+        A compressed file or a http(s) url is read as np_open does.
+        """
+        if hasattr(sif_file, 'read'):
+            return _read_header(sif_file)
+        from .sif_open import _open_file
+        with _open_file(sif_file) as f:
+            return _read_header(f)
+
+    @property
+    def original_filename(self):
+        return _to_string(self._original_filename)
+
+    @property
+    def frame_axis(self):
+        return _to_string(self._frame_axis)
+
+    @property
+    def data_type(self):
+        return _to_string(self._data_type)
+
+    @property
+    def image_axis(self):
+        return _to_string(self._image_axis)
+
+    @property
+    def tile(self):
+        """ A list of tuples, that contains the image location in the file """
+        stride = self.size[0] * self.size[1] * 4
+        return [("raw", (0, 0) + self.size, self.offset + f * stride,
+                 ('F;32F', 0, 1)) for f in range(self.no_images)]
+
+    def _frame_calibrations(self):
+        """ Calibrations stored for each frame in the user text, or None """
+        if b'Calibration data for' not in self._user_text[:20]:
+            return None
+        texts = self._user_text.split(b'\n')
+        calibrations = []
+        for i in range(self.no_images):
             key = 'Calibration_data_for_frame_{:d}'.format(i+1)
             coefs = texts[i][len(key)+2:].strip().split(b',')
-            info[key] = [float(c) for c in coefs]
-        # Calibration data should be None for this case
-        info['Calibration_data'] = None
-    else:
-        coefs = info['Calibration_data'].strip().split()
-        try:
-            info['Calibration_data'] = [float(c) for c in coefs]
-        except ValueError:
-            del info['Calibration_data']
-    del info['user_text']
-
-    if 'Calibration_data' not in info:
-        coefs = info['Calibration_data_old'].strip().split()
+            calibrations.append([float(c) for c in coefs])
+        return calibrations
+
+    @property
+    def frame_calibrations(self):
+        calibrations = self._frame_calibrations()
+        return None if calibrations is None else np.array(calibrations)
+
+    def _calibration(self):
+        """
+        Returns the calibration and whether it is taken from the newer field.
+        """
+        if b'Calibration data for' in self._user_text[:20]:
+            return None, True
+        if self._calibration_data is not None:
+            try:
+                return [float(c) for c in self._calibration_data.strip().split()], True
+            except ValueError:
+                pass
         try:
-            info['Calibration_data'] = [float(c) for c in coefs]
+            return [float(c) for c in self._calibration_data_old.strip().split()], False
         except ValueError:
-            pass
-    del info['Calibration_data_old']
-
-    return info
+            return None, False
+
+    @property
+    def calibration(self):
+        return self._calibration()[0]
+
+    def as_dict(self, frames=True):
+        """
+        Returns the metadata as OrderedDict, the same as info of np_open.
+
+        Parameters
+        ----------
+        frames: bool
+            False to skip the items of each frame, i.e., the timestamps and
+            the calibrations of the frames, and the tile.
+        """
+        info = OrderedDict()
+        calibration, newer = self._calibration()
+        for key, attr in self._FIELDS:
+            value = getattr(self, attr)
+            if key == 'Calibration_data' and value is not None and newer:
+                info[key] = calibration
+            elif value is not None and key not in self._RAW_KEYS:
+                info[key] = value
+
+        if frames:
+            for f, timestamp in enumerate(self.timestamps.tolist()):
+                info['timestamp_of_{0:d}'.format(f)] = timestamp
+        info['size'] = self.size
+        if frames:
+            info['tile'] = self.tile
+        info['offset'] = self.offset
+
+        frame_calibrations = self._frame_calibrations() if frames else None
+        if frame_calibrations is not None:
+            for i, coefs in enumerate(frame_calibrations):
+                info['Calibration_data_for_frame_{:d}'.format(i+1)] = coefs
+        if 'Calibration_data' not in info and (newer or calibration is not None):
+            info['Calibration_data'] = calibration
+        return info
+
+    def __repr__(self):
+        return '<SifHeader version={} frames={} size={}>'.format(
+            self.version, self.no_images, self.size)
@@ -0,0 +1,215 @@
+import os
+
+import numpy as np
+from ._sif_open import _MAGIC
+
+# Write Andor Technology Multi-Channel files.
+# The header follows SifVersion 65567, which is what _sif_open._open expects
+# for the newest Andor Solis.
+
+SIF_VERSION = 65567
+
+
+def write_sif(path, frames, info=None):
+    """
+    Write frames into a sif file.
+
+    The frames are written block by block as they come from the iterable,
+    so a large file can be written without holding all the data in memory.
+
+    Parameters
+    ----------
+    path:
+        path to the file to write
+    frames:
+        np.ndarray sized [frames x height x width] or [height x width], or
+        an iterable of 2d frames [height x width] or of 3d blocks
+        [frames x height x width].
+        None: write only the header, such as the .sifx file of a spooling
+        acquisition.
+    info: dict
+        metadata, such as one returned by np_open.
+        For an iterable of frames, info['NumberOfFrames'] is required
+        because the header precedes the data.
+        Missing items are filled by default values.
+        The header is always written in SifVersion 65567, whatever
+        info['SifVersion'] is.
+
+    Returns
+    -------
+    n_frames: int
+        number of frames written
+
+    If the frames do not match the header, ValueError is raised and the
+    incomplete file is removed.
+    """
+    info = {} if info is None else info
+    if frames is None:
+        blocks = iter([])
+        first = None
+        shape = info['size'][::-1]
+    else:
+        if isinstance(frames, np.ndarray) and frames.ndim == 2:
+            frames = frames[np.newaxis]
+        if isinstance(frames, np.ndarray) and frames.ndim == 3:
+            info = dict(info, NumberOfFrames=len(frames))
+            frames = [frames]
+        blocks = iter(frames)
+        first = next(blocks, None)
+        if first is None:
+            raise ValueError(
+                'No frames are given. Use frames=None to write only the header.')
+        first = np.asarray(first)
+        shape = first.shape[-2:]
+
+    if 'NumberOfFrames' not in info:
+        raise ValueError(
+            "info['NumberOfFrames'] is required to write frames from an iterable.")
+    no_images = info['NumberOfFrames']
+
+    try:
+        with open(path, 'wb') as f:
+            f.write(_header(info, no_images, shape[0], shape[1]))
+            if first is None:
+                return 0
+
+            n = 0
+            for block in _chain(first, blocks):
+                block = np.asarray(block, dtype='<f')
+                n += 1 if block.ndim == 2 else len(block)
+                if n > no_images or block.shape[-2:] != tuple(shape):
+                    raise ValueError(
+                        'The frames do not match the header. The header has {} '
+                        'frames of {}.'.format(no_images, tuple(shape)))
+                block.tofile(f)
+        if n != no_images:
+            raise ValueError(
+                'Number of frames should be {} according to info, but {} frames '
+                'are given.'.format(no_images, n))
+    except BaseException:
+        # do not leave the incomplete file
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return n
+
+
+def _chain(first, rest):
+    yield first
+    for item in rest:
+        yield item
+
+
+def _float(value):
+    return repr(float(value)).encode()
+
+
+def _header(info, no_images, height, width):
+    """
+    Make the header of a sif file from info.
+    """
+    get = info.get
+    xbin = get('xbin', 1)
+    ybin = get('ybin', 1)
+    dimensions = get('DetectorDimensions', (width * xbin, height * ybin))
+    filename = get('OriginalFilename', b'')
+    if not isinstance(filename, bytes):
+        filename = filename.encode('utf-8')
+    spectrograph = '_'.join(str(get('spectrograph', '999')).split()) or '999'
+
+    # calibrations for each frame are stored in the user text
+    user_text = b''
+    if 'Calibration_data_for_frame_1' in info:
+        user_text = b'\n'.join(
+            'Calibration data for frame {:d}: '.format(i + 1).encode() +
+            b','.join(_float(c) for c in
+                      info['Calibration_data_for_frame_{:d}'.format(i + 1)])
+            for i in range(no_images))
+    if 'Mechelle' in spectrograph:
+        calibration = get('PixelCalibration', [])
+    else:
+        calibration = get('Calibration_data', None)
+        if calibration is None:
+            calibration = [0.0, 1.0, 0.0, 0.0]
+
+    def _axis(key, default):
+        value = get(key, default)
+        if not isinstance(value, bytes):
+            value = value.encode('utf-8')
+        return b'%d\n' % len(value) + value
+
+    # subimages (tracks) stacked vertically in a frame
+    subimages = get('SubImages', None)
+    if not subimages or sum(
+            int((1 + y1 - y0) / yb) for x0, x1, y0, y1, xb, yb in subimages) != height:
+        subimages = [(1, width * xbin, 1, height * ybin, xbin, ybin)]
+
+    cycle_time = get('CycleTime', 0.0)
+    lines = [
+        _MAGIC.encode(),
+        b'65538 1\n',
+        b'%d 0 0 1 %d %s \x00 \x00 \x00 \x03 \x01 0 %s %s %s %d \x00 %s %s 0 1 %s '
+        b'0 0 %s 0 0 \x00 \x00 1 0 5 0 0 0 0 0 0 1 500000 0 %s 0 4 6390 1 1 '
+        b'-999 0 0 0 0 0 5 4 32 30000 0 0 1 1000 0 0 0 550 0 0 0 0 0 0 0 0 0 '
+        b'1 1 13\n' % (
+            SIF_VERSION, get('ExperimentTime', 0),
+            _float(get('DetectorTemperature', 0.0)),
+            _float(get('ExposureTime', 0.0)), _float(cycle_time),
+            _float(get('AccumulatedCycleTime', cycle_time)),
+            get('AccumulatedCycles', 1),
+            _float(get('StackCycleTime', cycle_time)),
+            _float(get('PixelReadoutTime', 1e-6)),
+            _float(get('GainDAC', 0.0)), _float(get('GateWidth', 0.0)),
+            _float(get('GratingBlaze', 0.0))),
+        get('DetectorType', 'unknown').encode('utf-8') + b' \n',
+        b' %d %d %d\n' % (dimensions[0], dimensions[1], len(filename)),
+        filename + b' \n',
+        b'65538 %d\n' % len(user_text),
+        user_text + b'\n',
+        b'65538 \x01 \x02 \x03 \x00 %s %s\n' % tuple(
+            _float(t) for t in get('ShutterTime', (0.0, 0.0))),
+        b'65540 1 1 561.47 1 1 599.566 650NM\n',
+        b'1 50\n',
+        b'1 0 0 0 0  0 0 0 0 0 0 10\n',
+        b'0 %s\n' % spectrograph.encode('utf-8'),
+        b'0 10\n',
+        b'0 10\n',
+        b'0 0 \n',
+        b'65537 0 500 1200\n',
+        b'0 %s 999\n' % spectrograph.encode('utf-8'),
+        b'\n',
+        # intensifier: gain, gate delay and width in ps
+        b'65539 1 5 %s 0 0 %s %s 1 2000000 1 100 0 0 100 0 0\n' % (
+            _float(get('GateGain', 0.0)),
+            _float(get('GateDelay', 0.0) * 1e12),
+            _float(get('GateWidth', 0.0) * 1e12)),
+        b'1 1 0 10000\n',
+        b'0 1 0 2000\n',
+        b'0 1 0 2000\n',
+        b'1 0 0\n',
+        b'\n',
+        b'-1\n',
+        b'65538 0 %d %d %d %d 1 1 1 1\n' % (
+            dimensions[0], dimensions[1], dimensions[0], dimensions[1]),
+        b'65540 \x02 \x00 \x01 \x00 \x01 \x00\n',
+        b' '.join(_float(c) for c in calibration) + b'\n',
+        b'0 1 0 0\n',
+        b'0 1 0 0\n',
+        _float(get('RamanExWavelength', np.nan)) + b'\n',
+        b'13\n',
+        b'13\n',
+        b'1\n',
+        _axis('FrameAxis', b'Wavelength'),
+        _axis('DataType', b'Counts'),
+        _axis('ImageAxis', b'Pixel number'),
+        b'65541 1 %d %d 1 %d %d %d %d\n' % (
+            width * xbin, height * ybin, no_images, len(subimages),
+            no_images * width * height, width * height),
+    ]
+    for x0, x1, y0, y1, xb, yb in subimages:
+        lines.append(b'65538 %d %d %d %d %d %d 0\n' % (x0, y1, x1, y0, yb, xb))
+    for f in range(no_images):
+        timestamp = get('timestamp_of_{0:d}'.format(f), int(f * cycle_time * 1e6))
+        lines.append(b'%10d\n' % timestamp)
+    lines.append(b'0\n')
+    return b''.join(lines)
@@ -0,0 +1,198 @@
+import os
+import sqlite3
+from collections import OrderedDict
+from contextlib import closing
+
+from . import _sif_open
+from .sif_open import _open_file
+
+# A catalog of the headers of the sif files in a directory tree, stored in
+# SQLite so that the files can be searched by their metadata without opening
+# them again.
+#
+# >>> sif_parser.catalog.build('/archive', workers=8, db='index.sqlite')
+# >>> sif_parser.catalog.query(
+# ...     'index.sqlite', 'GateDelay > ? AND DetectorTemperature < ?', (400e-6, -60))
+
+EXTENSIONS = ('.sif', '.sif.gz', '.sif.xz', '.sif.bz2')
+
+# (column, SQL type, function of SifHeader)
+_COLUMNS = [
+    ('SifVersion', 'INTEGER', lambda h: h.version),
+    ('ExperimentTime', 'INTEGER', lambda h: h.experiment_time),
+    ('DetectorTemperature', 'REAL', lambda h: h.detector_temperature),
+    ('ExposureTime', 'REAL', lambda h: h.exposure_time),
+    ('CycleTime', 'REAL', lambda h: h.cycle_time),
+    ('AccumulatedCycles', 'INTEGER', lambda h: h.accumulated_cycles),
+    ('GainDAC', 'REAL', lambda h: h.gain_dac),
+    ('GateWidth', 'REAL', lambda h: h.gate_width),
+    ('GateDelay', 'REAL', lambda h: h.gate_delay),
+    ('GateGain', 'REAL', lambda h: h.gate_gain),
+    ('DetectorType', 'TEXT', lambda h: h.detector_type),
+    ('spectrograph', 'TEXT', lambda h: h.spectrograph),
+    ('RamanExWavelength', 'REAL', lambda h: h.raman_ex_wavelength),
+    ('OriginalFilename', 'TEXT', lambda h: h.original_filename),
+    ('NumberOfFrames', 'INTEGER', lambda h: h.no_images),
+    ('NumberOfSubImages', 'INTEGER', lambda h: h.no_subimages),
+    ('width', 'INTEGER', lambda h: h.size[0]),
+    ('height', 'INTEGER', lambda h: h.size[1]),
+    ('xbin', 'INTEGER', lambda h: h.xbin),
+    ('ybin', 'INTEGER', lambda h: h.ybin),
+]
+_INDEXED = ['ExperimentTime', 'DetectorTemperature', 'ExposureTime',
+            'GateDelay', 'GateWidth', 'NumberOfFrames']
+_BATCH = 1000
+
+
+def build(root, workers=None, db='index.sqlite', extensions=EXTENSIONS):
+    """
+    Scan the sif files under root and store their headers into a SQLite
+    database. Only the headers are read, by a pool of processes.
+
+    A rescan is incremental: files whose size and modification time are
+    unchanged are not read again, and the files removed are deleted from
+    the database.
+
+    Parameters
+    ----------
+    root:
+        the directory to scan
+    workers: int or None
+        number of processes. None: the number of CPUs. 1: scan in this
+        process.
+    db:
+        path to the SQLite database
+    extensions: tuple of str
+        suffixes of the files to scan (case insensitive)
+
+    Returns
+    -------
+    summary: dict
+        the numbers of 'added', 'updated', 'removed', 'unchanged' and
+        'failed' files. A file that failed is stored with its error message
+        in the column 'error'.
+    """
+    root = os.path.abspath(root)
+    extensions = tuple(e.lower() for e in extensions)
+    found = OrderedDict()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(extensions):
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+
+    summary = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0, 'failed': 0}
+    with closing(_connect(db)) as connection, connection:
+        prefix = os.path.join(root, '')
+        known = {path: (size, mtime_ns) for path, size, mtime_ns in connection.execute(
+            'SELECT path, size, mtime_ns FROM files WHERE substr(path, 1, ?) = ?',
+            (len(prefix), prefix))}
+
+        removed = [(path, ) for path in known if path not in found]
+        connection.executemany('DELETE FROM files WHERE path = ?', removed)
+        summary['removed'] = len(removed)
+
+        todo = []
+        for path, stat in found.items():
+            if known.get(path) == stat:
+                summary['unchanged'] += 1
+            else:
+                todo.append(path)
+                summary['updated' if path in known else 'added'] += 1
+
+        names = ['path', 'size', 'mtime_ns', 'error'] + [c[0] for c in _COLUMNS]
+        sql = 'INSERT OR REPLACE INTO files ({}) VALUES ({})'.format(
+            ', '.join(names), ', '.join('?' * len(names)))
+        rows = []
+        for path, (row, error) in zip(todo, _map(_scan, todo, workers)):
+            rows.append((path, ) + found[path] + (error, ) + row)
+            summary['failed'] += error is not None
+            if len(rows) >= _BATCH:
+                connection.executemany(sql, rows)
+                rows = []
+        connection.executemany(sql, rows)
+    return summary
+
+
+def query(db, where=None, params=(), columns=None, order_by='path'):
+    """
+    Search the catalog made by build.
+
+    Parameters
+    ----------
+    db:
+        path to the SQLite database
+    where: str
+        SQL condition, such as 'GateDelay > ? AND DetectorTemperature < ?'.
+        The column names are the keys of info of np_open, together with
+        path, size, mtime_ns, error, width and height.
+    params: tuple
+        values for the placeholders in where
+    columns: list of str
+        columns to return. None: all of them.
+    order_by: str
+        SQL ordering of the results.
+
+    Returns
+    -------
+    rows: list of OrderedDict
+    """
+    columns = '*' if columns is None else ', '.join(columns)
+    sql = 'SELECT {} FROM files'.format(columns)
+    if where:
+        sql += ' WHERE ' + where
+    if order_by:
+        sql += ' ORDER BY ' + order_by
+    with closing(_connect(db)) as connection:
+        cursor = connection.execute(sql, tuple(params))
+        names = [d[0] for d in cursor.description]
+        return [OrderedDict(zip(names, row)) for row in cursor]
+
+
+def _connect(db):
+    connection = sqlite3.connect(db)
+    columns = ', '.join('{} {}'.format(name, kind) for name, kind, _ in _COLUMNS)
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, '
+        'mtime_ns INTEGER, error TEXT, {})'.format(columns))
+    for name in _INDEXED:
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS idx_{0} ON files ({0})'.format(name))
+    return connection
+
+
+def _scan(path):
+    """
+    Read the header of path. Returns the values of _COLUMNS and the error
+    message (None on success).
+    """
+    try:
+        with _open_file(path) as f:
+            header = _sif_open._read_header(f)
+        return tuple(_value(func(header)) for _, _, func in _COLUMNS), None
+    except Exception as e:
+        return (None, ) * len(_COLUMNS), '{}: {}'.format(type(e).__name__, e)
+
+
+def _value(value):
+    # SQLite does not have NaN
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _map(func, items, workers):
+    if workers == 1 or len(items) <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(items) // (4 * workers)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(func, items, chunksize=chunksize):
+            yield result
@@ -1,24 +1,36 @@
 import os
 import sys
+import csv
 import argparse
 from glob import glob
 import logging
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 
 from . import utils
+from .sif_open import np_open, _header_calibration
+from ._sif_open import SifHeader
 
 
-def main():
+def main(argv=None):
     """
     Main function for the CLI.
     Accepts glob patterns of file paths to parse as .sif files.
     Converts the matched files to .csv, either individually,
     or joined into a single file if using the `--join` flag.
+
+    `sif_parser catalog ...` builds and searches a catalog of files instead,
+    see `catalog_main`.
     """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ['catalog']:
+        return catalog_main(argv[1:])
+
     parser = get_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     paths = []
     for p in args.pattern:
@@ -32,7 +44,8 @@ def main():
         paths,
         output_dir=args.output_dir,
         join=args.join,
-        verbose=args.verbose
+        verbose=args.verbose,
+        grid=args.grid
     )
 
 
@@ -40,7 +53,8 @@ def convert_files(
     paths: Iterable[str],
     output_dir = None,
     join: bool = False,
-    verbose: bool = False
+    verbose: bool = False,
+    grid = None
 ):
     """
     Converts sif files to csv.
@@ -51,6 +65,10 @@ def convert_files(
         or place the output of each conversion in it own file.
         [Default: False]
     :param verbose: Whether to log info.
+    :param grid: Wavelengths to resample all the spectra onto, or the
+        number of points over the range shared by all the files.
+        The spectra are joined into a single file, see `resample_files`.
+        [Default: None]
     """
     if len(paths) == 0:
         return
@@ -72,6 +90,11 @@ def convert_files(
 
     logging.info('Matched %s', paths)
 
+    if grid is not None:
+        fn = get_new_join_fn(output_dir)
+        resample_files(paths, grid, os.path.join(output_dir, fn))
+        return
+
     jdf = []
     for path in paths:
         logging.info('Converting %s', path)
@@ -107,6 +130,123 @@ def convert_files(
         df.to_csv(os.path.join(output_dir, fn), index=False)
 
 
+def resample_files(
+    paths: Iterable[str],
+    grid,
+    output_path: str,
+    block_size: int = 64
+):
+    """
+    Resamples the spectra of sif files onto a common wavelength grid and
+    writes them into a single csv, with a row for each spectrum and a column
+    for each wavelength.
+    The files are read `block_size` at a time, and the spectra of a block
+    are interpolated at once and appended to the file, so that the memory
+    does not grow with the number of files.
+
+    :param paths: Iterable of file paths to convert.
+    :param grid: Wavelengths to resample onto, or the number of points over
+        the range shared by all the files.
+    :param output_path: Path of the csv file.
+    :param block_size: Number of files read at once.
+    """
+    paths = list(paths)
+    if isinstance(grid, (int, np.integer)):
+        grid = np.linspace(*_shared_range(paths), grid)
+    grid = np.asarray(grid, dtype=float)
+
+    with open(output_path, 'w', newline='') as f:
+        f.write(','.join(['sample'] + [str(w) for w in grid.tolist()]) + '\n')
+        for i in range(0, len(paths), block_size):
+            names, wavelengths, counts = [], [], []
+            for path in paths[i:i + block_size]:
+                logging.info('Converting %s', path)
+                spectra = _read_spectra(path)
+                names += spectra[0]
+                wavelengths += spectra[1]
+                counts += spectra[2]
+
+            # interpolate the spectra of the same width at once
+            start = 0
+            while start < len(counts):
+                stop = start + 1
+                while stop < len(counts) and len(counts[stop]) == len(counts[start]):
+                    stop += 1
+                resampled = utils.resample(
+                    np.stack(wavelengths[start:stop]),
+                    np.stack(counts[start:stop]),
+                    grid
+                )
+                pd.DataFrame(resampled, index=names[start:stop]).to_csv(
+                    f, header=False
+                )
+                start = stop
+
+
+def _read_spectra(path: str):
+    """
+    :param path: Path to a sif file.
+    :returns: Lists of the names, the wavelengths and the counts of
+        each row of each frame in the file.
+    """
+    data, info = np_open(path)
+    wavelengths = utils.extract_calibration(info)
+    if wavelengths is None:
+        raise ValueError(f'{path} has no wavelength calibration.')
+
+    n, height, width = data.shape
+    wavelengths = np.broadcast_to(
+        wavelengths.reshape(-1, 1, width), data.shape
+    ).reshape(-1, width)
+    counts = data.reshape(-1, width)
+
+    fn, _ = os.path.splitext(os.path.basename(path))
+    if len(counts) == 1:
+        names = [fn]
+    else:
+        names = [f'{fn}[{f}][{r}]' for f in range(n) for r in range(height)]
+    return names, list(wavelengths), list(counts)
+
+
+def _shared_range(paths: Iterable[str]):
+    """
+    :param paths: Paths to sif files.
+    :returns: (start, stop) of the wavelengths covered by all the files,
+        found from the headers only.
+    """
+    start, stop = -np.inf, np.inf
+    for path in paths:
+        header = SifHeader.read(path)
+        wavelengths = _header_calibration(header, header.as_dict(frames=False))
+        if wavelengths is None:
+            raise ValueError(f'{path} has no wavelength calibration.')
+        start = max(start, np.min(wavelengths))
+        stop = min(stop, np.max(wavelengths))
+
+    if not start < stop:
+        raise ValueError('The files do not share a wavelength range.')
+    return start, stop
+
+
+def parse_grid(text: str):
+    """
+    :param text: `START:STOP:STEP` for the wavelengths from START to STOP
+        (inclusive) every STEP, or the number of points.
+    :returns: np.ndarray of the wavelengths, or the number of points.
+    """
+    try:
+        if ':' not in text:
+            return int(text)
+        start, stop, step = map(float, text.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'Grid should be START:STOP:STEP or a number of points, not {text}.'
+        )
+    if step <= 0 or stop < start:
+        raise argparse.ArgumentTypeError(f'Empty grid {text}.')
+    return start + step * np.arange(int(np.floor((stop - start) / step + 1e-9)) + 1)
+
+
 def get_parser() -> argparse.ArgumentParser:
     """
     Creates the argument parser for the CLI.
@@ -139,6 +279,98 @@ def get_parser() -> argparse.ArgumentParser:
         help='Log actions.'
     )
 
+    parser.add_argument(
+        '--grid',
+        type=parse_grid,
+        help=(
+            'Resample all spectra onto a common wavelength grid, given as '
+            'START:STOP:STEP or a number of points over the shared range, '
+            'and join them into a single file with a row for each spectrum.'
+        )
+    )
+
+    return parser
+
+
+def catalog_main(argv):
+    """
+    Subcommand to build and search a catalog of sif files.
+
+        sif_parser catalog build ROOT [--db index.sqlite] [--workers N]
+        sif_parser catalog query [WHERE ...] [--db index.sqlite] [--columns C ...]
+
+    :param argv: Arguments after `catalog`.
+    """
+    from . import catalog
+
+    parser = get_catalog_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        summary = catalog.build(args.root, workers=args.workers, db=args.db)
+        print(', '.join(f'{k} {v}' for k, v in summary.items()))
+        return
+
+    if not os.path.exists(args.db):
+        print(f'Catalog {args.db} does not exist, aborting.')
+        sys.exit(1)
+
+    columns = ['path'] + (args.columns or [])
+    rows = catalog.query(
+        args.db, where=' '.join(args.where) or None, columns=columns
+    )
+    writer = csv.writer(sys.stdout, delimiter='\t', lineterminator='\n')
+    if args.columns:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow(row.values())
+
+
+def get_catalog_parser() -> argparse.ArgumentParser:
+    """
+    Creates the argument parser for the catalog subcommand.
+
+    :returns ArgumentParser: Argument parser for the catalog subcommand.
+    """
+    parser = argparse.ArgumentParser(
+        prog='sif_parser catalog',
+        description='Build and search a catalog of .sif file headers.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser(
+        'build',
+        help='Scan a directory tree, reading only the changed files.'
+    )
+    build.add_argument('root', help='Directory to scan.')
+    build.add_argument(
+        '--workers',
+        type=int,
+        help='Number of processes. [Default: number of CPUs]'
+    )
+
+    query = commands.add_parser(
+        'query',
+        help='Print the paths of the files matching an SQL condition.'
+    )
+    query.add_argument(
+        'where',
+        nargs='*',
+        help='SQL condition, e.g. "GateDelay > 4e-4 AND ExposureTime < 1".'
+    )
+    query.add_argument(
+        '--columns',
+        nargs='+',
+        help='Columns to print after the path.'
+    )
+
+    for sub in (build, query):
+        sub.add_argument(
+            '--db',
+            default='index.sqlite',
+            help='Path of the catalog database. [Default: index.sqlite]'
+        )
+
     return parser
 
 
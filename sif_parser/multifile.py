@@ -0,0 +1,295 @@
+import os
+import glob
+import numbers
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .sif_open import (
+    _open_file, _read_header, _file_size, _corrupt, _readinto, _seconds,
+    _attrs, _header_calibration, _CHUNK_BYTES
+)
+
+
+# a file of open_mfsif, whose header is read. info has no items of each frame.
+_Member = namedtuple('_Member', ['path', 'header', 'info', 'n_frames'])
+
+
+def open_mfsif(paths, concat_dim='file', lazy=True, chunks=None, workers=None,
+               ignore_corrupt=False):
+    """
+    Open multiple sif files as one xr.DataArray, such as a scan over the
+    gate delay or the position.
+
+    Only the headers are read here, by a pool of threads, and the
+    compatibility of the files is checked from them. The pixel data is read
+    on demand.
+
+    Parameters
+    ----------
+    paths: str or list
+        a glob pattern, or the list of the paths in the order to concatenate.
+    concat_dim: str, xr.DataArray or pd.Index
+        the dimension along which the files are concatenated.
+        'Time': the frames of the files follow one after another.
+        other str: the files are stacked along a new dimension, whose
+            coordinate is the paths. All the files need the same number of
+            frames.
+        xr.DataArray or pd.Index: a new dimension named after it, with its
+            values as the coordinate, e.g. pd.Index(delays, name='delay').
+    lazy: bool
+        True: the data is dask.Array, which reads the frames when computed.
+            This requires dask installed.
+        False: read all the data into the memory.
+    chunks: int
+        number of frames in a dask chunk. Default: as many as fit in 16 MB.
+    workers: int
+        number of threads to read the headers, and the data if lazy=False.
+    ignore_corrupt:
+        True if ignore the corrupted frames.
+
+    Returns
+    -------
+    dataarray: xr.DataArray
+        sized [files x Time x height x width], or [Time x height x width]
+        for concat_dim='Time'.
+        The Time and calibration coordinates of the files are stacked, unless
+        they are the same for all the files. The attributes that differ among
+        the files, such as GateDelay, become coordinates along concat_dim.
+    """
+    try:
+        import xarray as xr
+    except ImportError:
+        raise ImportError(
+            "xarray needs to be installed to use open_mfsif."
+        )
+    if isinstance(paths, (str, os.PathLike)):
+        pattern = os.fspath(paths)
+        paths = sorted(glob.glob(pattern))
+        if len(paths) == 0:
+            raise FileNotFoundError('No files match {}'.format(pattern))
+    paths = list(paths)
+    if len(paths) == 0:
+        raise ValueError('No files to open.')
+
+    if isinstance(concat_dim, str):
+        dim = concat_dim
+        dim_coord = np.array([os.fspath(p) for p in paths])
+    else:
+        dim = concat_dim.name
+        dim_coord = np.asarray(concat_dim)
+        if dim is None:
+            raise ValueError('concat_dim needs a name.')
+        if len(dim_coord) != len(paths):
+            raise ValueError(
+                'concat_dim has {} values for {} files.'.format(
+                    len(dim_coord), len(paths)))
+    stack = dim != 'Time'
+
+    with ThreadPoolExecutor(workers) as executor:
+        members = list(executor.map(
+            lambda path: _read_member(path, ignore_corrupt), paths))
+    calibrations = [_calibration(m) for m in members]
+    _check_members(members, calibrations, stack)
+
+    first = members[0]
+    width, height = first.header.size
+    if lazy:
+        data = _dask_array(members, stack, chunks)
+    else:
+        data = np.empty((sum(m.n_frames for m in members), height, width),
+                        dtype=np.float32)
+        starts = np.cumsum([0] + [m.n_frames for m in members])
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(
+                lambda i: _read_into(members[i].path, members[i].header.offset, 0,
+                                     data[starts[i]:starts[i + 1]]),
+                range(len(members))))
+        if stack:
+            data = data.reshape(len(members), first.n_frames, height, width)
+
+    dims = ['Time', 'height', 'width']
+    coords = OrderedDict()
+    if stack:
+        dims = [dim] + dims
+        coords[dim] = ((dim, ), dim_coord)
+
+    times = [_seconds(m.header.timestamps[:m.n_frames]) for m in members]
+    coords['Time'] = _stack(times, dim, {'Unit': 's'})
+
+    if calibrations[0] is not None:
+        coords['calibration'] = _stack_calibrations(calibrations, members, dim)
+
+    attrs, varying = _merge_attrs([_attrs(m.info) for m in members])
+    for key, values in varying.items():
+        if stack:
+            coords[key] = ((dim, ), np.array(values))
+        else:
+            coords[key] = (('Time', ), np.repeat(
+                values, [m.n_frames for m in members]))
+    if not stack:
+        attrs['NumberOfFrames'] = data.shape[0]
+
+    result = xr.DataArray(data, dims=dims, coords=coords, attrs=attrs)
+    # xarray names it after the dask array even with name=None
+    result.name = None
+    return result
+
+
+def _read_member(path, ignore_corrupt):
+    """ Read the header of path and find the number of frames in the file """
+    with _open_file(path) as f:
+        header = _read_header(f)
+        file_size = _file_size(f)
+    n = header.no_images
+    if file_size is not None:
+        stride = header.size[0] * header.size[1] * 4
+        n = min(n, max(file_size - header.offset, 0) // max(stride, 1))
+        if n < header.no_images:
+            _corrupt(header.no_images, n, ignore_corrupt)
+    return _Member(path, header, header.as_dict(frames=False), n)
+
+
+def _check_members(members, calibrations, stack):
+    """ Raise ValueError if the files cannot be concatenated """
+    first = members[0]
+    for m, calibration in zip(members[1:], calibrations[1:]):
+        if m.header.size != first.header.size:
+            raise ValueError(
+                'The frame size of {} is {} but that of {} is {}.'.format(
+                    m.path, m.header.size, first.path, first.header.size))
+        if stack and m.n_frames != first.n_frames:
+            raise ValueError(
+                '{} has {} frames but {} has {}. Use concat_dim="Time" to '
+                'concatenate files with different numbers of frames.'.format(
+                    m.path, m.n_frames, first.path, first.n_frames))
+        if (calibration is None) != (calibrations[0] is None):
+            raise ValueError(
+                'Only one of {} and {} has the calibration.'.format(
+                    m.path, first.path))
+
+
+def _dask_array(members, stack, chunks):
+    import dask.array as da
+    from dask.base import tokenize
+
+    width, height = members[0].header.size
+    frame_bytes = max(width * height * 4, 1)
+    if chunks is None:
+        chunks = max(_CHUNK_BYTES // frame_bytes, 1)
+
+    name = 'open_mfsif-' + tokenize(
+        [(os.fspath(m.path), m.header.offset, m.n_frames) for m in members],
+        chunks)
+    graph = {}
+    frame_chunks = []
+    for i, m in enumerate(members):
+        starts = list(range(0, m.n_frames, chunks))
+        for j, start in enumerate(starts):
+            stop = min(start + chunks, m.n_frames)
+            if stack:
+                key = (name, i, j, 0, 0)
+            else:
+                key = (name, sum(len(c) for c in frame_chunks) + j, 0, 0)
+            graph[key] = (_read_block, m.path, m.header.offset,
+                          (height, width), start, stop, stack)
+        frame_chunks.append(tuple(
+            min(chunks, m.n_frames - start) for start in starts))
+
+    if stack:
+        shape_chunks = ((1, ) * len(members), frame_chunks[0], (height, ), (width, ))
+    else:
+        shape_chunks = (sum(frame_chunks, ()), (height, ), (width, ))
+    return da.Array(graph, name, shape_chunks, dtype=np.float32)
+
+
+def _read_block(path, offset, shape, start, stop, stack):
+    """
+    Read the frames [start, stop) of a file for a dask chunk. The data starts
+    at offset, and the frames are sized shape.
+    """
+    data = np.empty((stop - start, ) + tuple(shape), dtype=np.float32)
+    _read_into(path, offset, start, data)
+    return data[np.newaxis] if stack else data
+
+
+def _read_into(path, offset, start, out):
+    """ Read the frames from start of a file into out """
+    stride = out[0].nbytes if len(out) else 0
+    with _open_file(path) as f:
+        f.seek(offset + start * stride)
+        if _readinto(f, out) < out.nbytes:
+            # the file has been truncated after the header is read
+            raise ValueError('Reached the end of the file {}'.format(path))
+    return out
+
+
+def _calibration(member):
+    """ The calibration of the frames that are in the file """
+    calibration = _header_calibration(member.header, member.info)
+    if calibration is None or calibration.shape[-1] != member.header.size[0]:
+        # such as of an image, which xr_open does not use either
+        return None
+    if calibration.ndim == 2:
+        calibration = calibration[:member.n_frames]
+    return calibration
+
+
+def _stack(arrays, dim, attrs):
+    """
+    Coordinate along Time from the arrays of the files. The arrays are
+    stacked along the new dimension dim, or concatenated along Time.
+    """
+    if dim == 'Time':
+        return (('Time', ), np.concatenate(arrays), attrs)
+    if all(np.array_equal(a, arrays[0]) for a in arrays[1:]):
+        return (('Time', ), arrays[0], attrs)
+    return ((dim, 'Time'), np.stack(arrays), attrs)
+
+
+def _stack_calibrations(calibrations, members, dim):
+    """ The calibration coordinate of the files, similar to _stack """
+    if all(c.shape == calibrations[0].shape and np.array_equal(c, calibrations[0])
+           for c in calibrations[1:]):
+        calibration = calibrations[0]
+        if calibration.ndim == 1:
+            return (('width', ), calibration)
+        if dim != 'Time':
+            return (('Time', 'width'), calibration)
+    if dim != 'Time' and all(c.ndim == 1 for c in calibrations):
+        return ((dim, 'width'), np.stack(calibrations))
+    # broadcast to [frames x width] per file
+    calibrations = [np.broadcast_to(c, (m.n_frames, c.shape[-1]))
+                    for c, m in zip(calibrations, members)]
+    if dim == 'Time':
+        return (('Time', 'width'), np.concatenate(calibrations))
+    return ((dim, 'Time', 'width'), np.stack(calibrations))
+
+
+def _merge_attrs(attrs_list):
+    """
+    Split the attributes into those common to all the files and the scalar
+    ones that differ, which are returned as lists of the values.
+    """
+    common = OrderedDict()
+    varying = OrderedDict()
+    for key, value in attrs_list[0].items():
+        values = [attrs.get(key) for attrs in attrs_list]
+        if all(_equal(v, value) for v in values[1:]):
+            common[key] = value
+        elif all(isinstance(v, (numbers.Number, str)) for v in values):
+            varying[key] = values
+    return common, varying
+
+
+def _equal(a, b):
+    """ NaN-aware equality of two attribute values. """
+    if isinstance(a, str) or isinstance(b, str):
+        return a == b
+    try:
+        a, b = np.asarray(a), np.asarray(b)
+        equal_nan = a.dtype.kind in 'fc' and b.dtype.kind in 'fc'
+        return bool(np.array_equal(a, b, equal_nan=equal_nan))
+    except Exception:
+        return False
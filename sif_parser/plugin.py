@@ -1,27 +1,91 @@
-from PIL import Image, ImageFile
 from . import _sif_open
 
+try:
+    from PIL import Image, ImageFile
+except ImportError:
+    Image = None
+
 # Read Andor Technology Multi-Channel files with PIL.
 # Based on Marcel Leutenegger's MATLAB script.
+#
+# Only the header is parsed when opened. Each frame is decoded by the raw
+# decoder on load(), which reads that frame only.
+#
+# >>> image = Image.open('/path/to/file.sif')
+# >>> image.n_frames
+# >>> image.seek(100)
+# >>> frame = np.asarray(image)
+#
+# The size and the mode are set to _size and _mode in _open, as the plugins
+# of Pillow do. This needs Pillow>=10.1, where mode became read-only.
 
 
-class SifImageFile(ImageFile.ImageFile):
+class SifImageFile(ImageFile.ImageFile if Image is not None else object):
     format = "SIF"
     format_description = "Andor Technology Multi-Channel File"
+    _close_exclusive_fp_after_loading = False
 
     def _open(self):
-        title, size, no_images, info = _sif_open._open(self.fp)
-        self.title = title
-        self.size[:] = size[:]
-        # self.size = size
-        for key, item in info.items():
-            self.info[key] = item
+        header = _sif_open._read_header(self.fp)
+        self._header = header
+        self._size = header.size
+        self._mode = 'F'
+        self._n_frames = header.no_images
+        # the fields of the whole file. The timestamp of the current frame is
+        # set by seek.
+        calibration = header.calibration
+        for key, attr in header._FIELDS:
+            value = getattr(header, attr)
+            # SubImages is a list of tuples, left out as _attrs does
+            if (value is not None and key not in header._RAW_KEYS
+                    and key != 'SubImages'):
+                self.info[key] = value
+        if calibration is not None:
+            self.info['Calibration_data'] = calibration
+        self.info['offset'] = header.offset
+
+        self.__frame = -1
+        self._seek(0)
+
+    @property
+    def n_frames(self):
+        return self._n_frames
+
+    @property
+    def is_animated(self):
+        return self._n_frames > 1
+
+    def seek(self, frame):
+        if not self._seek_check(frame):
+            return
+        self._seek(frame)
+
+    def _seek(self, frame):
+        if frame == self.__frame:
+            return
+        if self.fp is None:
+            raise ValueError('Operation on closed image')
+        width, height = self._size
+        offset = self._header.offset + frame * width * height * 4
+        self.tile = [("raw", (0, 0, width, height), offset, ("F;32F", 0, 1))]
+        self.__frame = frame
+        if len(self._header.timestamps) > frame:
+            self.info['timestamp'] = int(self._header.timestamps[frame])
 
-        self.mode = 'F'
+    def load(self):
+        # ImageFile.load releases self.fp, which is kept for the other
+        # frames, and closed with the image
+        fp = self.fp
+        try:
+            return super().load()
+        finally:
+            self.fp = fp
 
-        # self.fp.seek(tile[2])  # offset
+    def tell(self):
+        return self.__frame
 
 
 # Registry
-Image.register_open("SIF", SifImageFile)
-Image.register_extension("SIF", ".sif")
+if Image is not None:
+    Image.register_open("SIF", SifImageFile)
+    Image.register_extension("SIF", ".sif")
@@ -0,0 +1,304 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+# Reading sif files by byte ranges, e.g. from object storage over HTTP,
+# without downloading the whole file.
+#
+# A storage backend only needs to implement RangeReader.read_range.
+# RangeFile turns it into a seekable binary file object with a bounded LRU
+# block cache, which can be given to np_open, xr_open and SifFile.
+#
+# >>> f = RangeFile(HTTPRangeReader('https://example.com/data/file.sif'))
+# >>> with sif_parser.SifFile(f) as sif:
+# ...     frame = sif[100]  # fetches the header and this frame only
+
+BLOCK_SIZE = 1 << 18
+CACHE_SIZE = 1 << 25
+MAX_READAHEAD = 1 << 23
+
+
+class RangeReader(object):
+    """
+    Interface of a storage backend that reads byte ranges.
+
+    Subclasses implement read_range, and size if it is known without
+    reading.
+    """
+    def read_range(self, start, stop):
+        """
+        Returns the bytes in [start, stop). It can be shorter at the end of
+        the file.
+        """
+        raise NotImplementedError
+
+    def size(self):
+        """ Returns the size of the file in bytes """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LocalRangeReader(RangeReader):
+    """
+    Backend of a local file, which reads ranges by os.pread.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+
+    def read_range(self, start, stop):
+        if hasattr(os, 'pread'):
+            return os.pread(self._file.fileno(), stop - start, start)
+        with self._lock:
+            self._file.seek(start)
+            return self._file.read(stop - start)
+
+    def size(self):
+        return os.fstat(self._file.fileno()).st_size
+
+    def close(self):
+        self._file.close()
+
+
+class HTTPRangeReader(RangeReader):
+    """
+    Backend of a file served over HTTP(S), which reads ranges by the
+    `Range` header.
+
+    Parameters
+    ----------
+    url: str
+    headers: dict
+        additional request headers, such as Authorization.
+    timeout: float
+        timeout of each request in seconds.
+
+    Attributes
+    ----------
+    nrequests: int
+        number of the requests sent
+
+    If the server does not support range requests and sends the whole file,
+    the file is kept in memory and the later ranges are served from it.
+    """
+    def __init__(self, url, headers=None, timeout=30):
+        self.url = url
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.nrequests = 0
+        self._size = None
+        self._body = None
+
+    def _request(self, method, headers):
+        from urllib.request import Request, urlopen
+
+        request = Request(self.url, headers=dict(self.headers, **headers),
+                          method=method)
+        self.nrequests += 1
+        return urlopen(request, timeout=self.timeout)
+
+    def read_range(self, start, stop):
+        from urllib.error import HTTPError
+
+        if stop <= start:
+            return b''
+        if self._body is not None:
+            return self._body[start:stop]
+        try:
+            response = self._request(
+                'GET', {'Range': 'bytes={}-{}'.format(start, stop - 1)})
+        except HTTPError as e:
+            if e.code == 416:  # range not satisfiable, i.e., beyond the end
+                return b''
+            raise
+        with response:
+            if response.status == 206:
+                content_range = response.headers.get('Content-Range', '')
+                total = content_range.rpartition('/')[2]
+                if total.isdigit():
+                    self._size = int(total)
+                return response.read()
+            # the server ignored the range and sent the whole file
+            self._body = response.read()
+            self._size = len(self._body)
+            return self._body[start:stop]
+
+    def size(self):
+        if self._size is None:
+            with self._request('HEAD', {}) as response:
+                length = response.headers.get('Content-Length')
+            if length is None:
+                raise ValueError('The size of {} is unknown.'.format(self.url))
+            self._size = int(length)
+        return self._size
+
+    def close(self):
+        self._body = None
+
+
+class RangeFile(io.RawIOBase):
+    """
+    Seekable binary file object on a RangeReader.
+
+    The data is fetched in blocks, which are kept in an LRU cache. The
+    blocks missing for a read are fetched together by one request. For
+    sequential reads, such as of the header, the number of blocks fetched
+    at once grows up to max_readahead bytes.
+
+    Parameters
+    ----------
+    reader: RangeReader
+    block_size: int
+        size of a cached block in bytes
+    cache_size: int
+        maximum size of the cache in bytes
+    max_readahead: int
+        maximum size fetched at once for sequential reads
+    """
+    def __init__(self, reader, block_size=BLOCK_SIZE, cache_size=CACHE_SIZE,
+                 max_readahead=MAX_READAHEAD):
+        self.reader = reader
+        self.block_size = block_size
+        self.cache_size = cache_size
+        self.max_readahead = max_readahead
+        self._blocks = OrderedDict()
+        self._size = None
+        self._pos = 0
+        self._next_block = None
+        self._readahead = 1
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._file_size()
+        if offset < 0:
+            raise ValueError('negative seek position {}'.format(offset))
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, b):
+        out = memoryview(b).cast('B')
+        n = 0
+        for block in self._read_blocks(self._pos, self._pos + len(out)):
+            out[n:n + len(block)] = block
+            n += len(block)
+        self._pos += n
+        return n
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = max(self._file_size() - self._pos, 0)
+        data = b''.join(bytes(block) for block in
+                        self._read_blocks(self._pos, self._pos + size))
+        self._pos += len(data)
+        return data
+
+    def readline(self, size=-1):
+        limit = None if size is None or size < 0 else size
+        pieces = []
+        n = 0
+        while limit is None or n < limit:
+            views = self._read_blocks(self._pos, self._pos + 1)
+            if not views:
+                break
+            # search in the cached block without copying it
+            block = views[0].obj
+            start = self._pos % self.block_size
+            end = len(block) if limit is None else min(len(block), start + limit - n)
+            i = block.find(b'\n', start, end)
+            stop = end if i < 0 else i + 1
+            pieces.append(block[start:stop])
+            n += stop - start
+            self._pos += stop - start
+            if i >= 0:
+                break
+        return b''.join(pieces)
+
+    def close(self):
+        if not self.closed:
+            self.reader.close()
+            self._blocks.clear()
+        super().close()
+
+    def _file_size(self):
+        if self._size is None:
+            self._size = self.reader.size()
+        return self._size
+
+    def _read_blocks(self, start, stop):
+        """
+        Returns the list of memoryviews of the data in [start, stop),
+        fetching the missing blocks.
+        """
+        if self._size is not None:
+            stop = min(stop, self._size)
+        if stop <= start:
+            return []
+        bs = self.block_size
+        first, last = start // bs, (stop - 1) // bs
+        blocks = {}
+        for i in range(first, last + 1):
+            if i in self._blocks:
+                self._blocks.move_to_end(i)
+                blocks[i] = self._blocks[i]
+        missing = [i for i in range(first, last + 1) if i not in blocks]
+        if missing:
+            blocks.update(self._fetch(missing[0], missing[-1]))
+
+        views = []
+        for i in range(first, last + 1):
+            block = blocks.get(i)
+            if block is None:
+                # beyond the end of the file
+                break
+            views.append(memoryview(block)[max(start - i * bs, 0):stop - i * bs])
+            if len(block) < bs:
+                break
+        return views
+
+    def _fetch(self, first, last):
+        """
+        Fetch the blocks [first, last] (and more for sequential reads) by one
+        request. Returns a dict from the block index to the block.
+        """
+        if first == self._next_block:
+            self._readahead = min(
+                self._readahead * 2,
+                max(min(self.max_readahead, self.cache_size) // self.block_size, 1))
+        else:
+            self._readahead = 1
+        last = max(last, first + self._readahead - 1)
+        if self._size is not None:
+            last = min(last, max((self._size - 1) // self.block_size, first))
+
+        bs = self.block_size
+        data = self.reader.read_range(first * bs, (last + 1) * bs)
+        if len(data) < (last + 1 - first) * bs:
+            # the end of the file
+            self._size = first * bs + len(data)
+        self._next_block = last + 1
+        fetched = {}
+        for i in range(first, last + 1):
+            block = data[(i - first) * bs:(i + 1 - first) * bs]
+            if not block:
+                break
+            fetched[i] = block
+            self._blocks[i] = block
+            self._blocks.move_to_end(i)
+        while len(self._blocks) * bs > self.cache_size and len(self._blocks) > 1:
+            self._blocks.popitem(last=False)
+        return fetched
@@ -0,0 +1,178 @@
+import os
+import sys
+import numpy as np
+from collections import OrderedDict
+from .sif_open import _open, np_open, np_spool_open, _spool_header, _spool_layout
+from .utils import extract_calibration
+
+
+def share(path, ignore_corrupt=False):
+    """
+    Load a sif file or a spooling acquisition into a named shared memory
+    block, so that other processes can use the data without copying.
+
+    Parameters
+    ----------
+    path:
+        path to the sif file or to the spooling directory.
+    ignore_corrupt:
+        True if ignore the corrupted frames (or missing *.dat files).
+
+    Returns
+    -------
+    handle: SharedSif
+        a small picklable handle. Pass it to the worker processes and use
+        handle.data there. The shared memory block is released by
+        handle.unlink() or at the end of the `with` block.
+
+    Examples
+    --------
+    >>> with sif_parser.share('/path/to/file.sif') as handle:
+    ...     results = pool.map(analyze, [(handle, i) for i in range(10)])
+    """
+    from multiprocessing import shared_memory
+
+    if os.path.isdir(path):
+        ini_info, info = _spool_header(path)
+        layout = _spool_layout(ini_info, info)
+        shape = (info['NumberOfFrames'], ) + layout['shape']
+        dtype = layout['dtype']
+    else:
+        with open(path, 'rb') as f:
+            tile, size, no_images, info = _open(f)
+        shape = (no_images, size[1], size[0])
+        dtype = np.dtype(np.float32)
+
+    nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        if os.path.isdir(path):
+            data, info = np_spool_open(path, ignore_missing=ignore_corrupt, out=out)
+        else:
+            data, info = np_open(path, ignore_corrupt=ignore_corrupt, out=out)
+        # the number of frames may be smaller for corrupt data
+        shape = data.shape
+        del out, data
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    handle = SharedSif(shm.name, shape, dtype, *_split_info(info, shape[0]))
+    handle._shm = shm
+    handle._owner = True
+    return handle
+
+
+class SharedSif:
+    """
+    Handle of the data in a shared memory block, made by sif_parser.share.
+
+    Attributes
+    ----------
+    name: str
+        name of the shared memory block
+    shape: tuple
+    dtype: np.dtype
+    info: OrderedDict
+        the metadata of the file, without the items of each frame
+    timestamps: np.ndarray
+        the timestamp of each frame
+    calibration: np.ndarray
+        the calibration, as extract_calibration returns, or None
+    """
+    def __init__(self, name, shape, dtype, info, timestamps=None,
+                 calibration=None):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.info = info
+        self.timestamps = timestamps
+        self.calibration = calibration
+        self._shm = None
+        self._owner = False
+
+    @property
+    def data(self):
+        """ np.ndarray pointing on the shared memory block """
+        if self._shm is None:
+            self._shm = _attach(self.name)
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    def close(self):
+        """
+        Detach the shared memory block from this process.
+        All the arrays obtained by .data should be deleted before this.
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def unlink(self):
+        """
+        Release the shared memory block. Should be called once, by the
+        process that called sif_parser.share.
+        """
+        from multiprocessing import resource_tracker
+
+        shm = self._shm if self._shm is not None else _attach(self.name)
+        self._shm = None
+        shm.close()
+        if sys.version_info < (3, 13):
+            # _attach unregistered it from the resource tracker, which is
+            # shared with the worker processes of the owner
+            resource_tracker.register(shm._name, 'shared_memory')
+        shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+
+    def __getstate__(self):
+        return {'name': self.name, 'shape': self.shape, 'dtype': self.dtype,
+                'info': self.info, 'timestamps': self.timestamps,
+                'calibration': self.calibration}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return '<SharedSif name={} shape={} dtype={}>'.format(
+            self.name, self.shape, self.dtype)
+
+
+def _split_info(info, n_frames):
+    """
+    Split info into the metadata without the items of each frame, the
+    timestamps and the calibration, so that the handle is pickled quickly.
+    """
+    timestamps = np.array(
+        [info.get('timestamp_of_{:d}'.format(f), 0) for f in range(n_frames)],
+        dtype=np.int64)
+    calibration = extract_calibration(info)
+    info = OrderedDict(
+        (key, value) for key, value in info.items()
+        if key != 'tile' and not key.startswith(
+            ('timestamp_of_', 'Calibration_data_for_frame_')))
+    return info, timestamps, calibration
+
+
+def _attach(name):
+    """
+    Attach the shared memory block without handing its lifetime to this
+    process.
+    """
+    from multiprocessing import shared_memory, resource_tracker
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    # Otherwise the resource tracker removes the block when this process
+    # exits, while the block may still be used by the owner process.
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
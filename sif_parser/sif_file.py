@@ -0,0 +1,269 @@
+import os
+import threading
+import numpy as np
+from . import _instrument
+from .utils import _subimage_rows
+from .sif_open import (
+    _read_header, _to_xarray, _corrupt, _pread_into, _readinto, _open_file
+)
+
+
+class SifFile:
+    """
+    Handle of a sif file that parses the header only once and then reads
+    frames on demand.
+
+    Frames are read with os.pread, which does not move the file position, so
+    that one SifFile can be shared among threads.
+
+    Parameters
+    ----------
+    sif_file:
+        path to the file, or a binary file object. A file object is not
+        closed by SifFile.
+        A http(s) url is read by range requests, see sif_parser.remote.
+        A file compressed by gzip, xz or bz2 is decompressed on the fly.
+        It is decompressed once when opened, to find the number of frames and
+        to make checkpoints so that a frame can be read without decompressing
+        from the beginning. See sif_parser.build_index.
+    ignore_corrupt:
+        True if ignore the corrupted frames.
+
+    Attributes
+    ----------
+    header: SifHeader
+        the header with typed fields
+    info: OrderedDict
+        the metadata, the same as the one returned by np_open
+    shape: tuple
+        (frames, height, width)
+    dtype: np.dtype
+
+    Examples
+    --------
+    >>> with sif_parser.SifFile('/path/to/file.sif') as sif:
+    ...     first = sif[0]
+    ...     every_10th = sif[::10]
+    ...     roi = sif[5:8, 100:200, :]
+    """
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, sif_file, ignore_corrupt=False):
+        self._lock = threading.Lock()
+        if hasattr(sif_file, 'read'):
+            self._file = sif_file
+            self._will_close = False
+        else:
+            self._file = _open_file(sif_file)
+            self._will_close = True
+        try:
+            self._init(ignore_corrupt)
+        except Exception:
+            self.close()
+            raise
+
+    def _init(self, ignore_corrupt):
+        self.header = header = _read_header(self._file)
+        self._info = None
+        size, no_images = header.size, header.no_images
+        self._offset = header.offset
+        self._stride = size[0] * size[1] * self.dtype.itemsize
+        try:
+            self._fd = self._file.fileno()
+        except (AttributeError, OSError):
+            # such as io.BytesIO
+            self._fd = None
+
+        if self._fd is not None:
+            file_size = os.fstat(self._fd).st_size
+        else:
+            file_size = self._file.seek(0, os.SEEK_END)
+        n = min(no_images, max(file_size - self._offset, 0) // max(self._stride, 1))
+        if n < no_images:
+            _corrupt(no_images, n, ignore_corrupt)
+        self.shape = (n, size[1], size[0])
+
+    @property
+    def info(self):
+        if self._info is None:
+            self._info = self.header.as_dict()
+        return self._info
+
+    @property
+    def ndim(self):
+        return 3
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def close(self):
+        """ Close the file, if it was opened by SifFile """
+        if self._file is not None and self._will_close:
+            self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, key):
+        """
+        Read frames. The first index selects the frames (an integer, a slice
+        or an array of integers or booleans), and the others are applied to
+        the frames read.
+        """
+        return self._getitem(key)
+
+    @property
+    def tracks(self):
+        """
+        List of SifTrack, which reads the rows of each subimage (track) of
+        a multi-track acquisition without reading the others.
+        """
+        subimages = self.header.subimages
+        return [SifTrack(self, rows, subimage) for rows, subimage in
+                zip(_subimage_rows(subimages, self.header.size[1]), subimages)]
+
+    def _getitem(self, key, rows=None):
+        """ __getitem__ for the rows [start, stop) of frames """
+        if not isinstance(key, tuple):
+            key = (key, )
+        index, rest = key[0], key[1:]
+        if index is Ellipsis:
+            return self._read(0, len(self), rows=rows)[key]
+
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                data = self._read(start, max(start, stop), rows=rows)
+            else:
+                data = self._read_frames(range(start, stop, step), rows=rows)
+        elif isinstance(index, (int, np.integer)):
+            i = int(index)
+            if i < 0:
+                i += len(self)
+            if not 0 <= i < len(self):
+                raise IndexError(
+                    'index {} is out of bounds for {} frames'.format(index, len(self)))
+            data = self._read(i, i + 1, rows=rows)[0]
+            return data[rest] if rest else data
+        else:
+            # numpy takes care of the negative indices and boolean masks
+            data = self._read_frames(np.arange(len(self))[index], rows=rows)
+        return data[(slice(None), ) + rest] if rest else data
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[:]
+        return data if dtype is None else data.astype(dtype)
+
+    def to_numpy(self):
+        """ Read all the frames into np.ndarray """
+        return self[:]
+
+    def to_xarray(self):
+        """
+        Read all the frames into xr.DataArray, the same as xr_open.
+        """
+        return _to_xarray(self[:], self.info)
+
+    def _read(self, start, stop, out=None, rows=None):
+        """ Read the contiguous frames [start, stop), or their rows """
+        height, width = self.shape[1:]
+        row_start, row_stop = (0, height) if rows is None else rows
+        if out is None:
+            out = np.ndarray((stop - start, row_stop - row_start, width),
+                             dtype=self.dtype)
+        if stop <= start:
+            return out
+        if self._file is None:
+            raise ValueError('I/O operation on closed file.')
+
+        offset = self._offset + start * self._stride
+        if row_stop - row_start == height:
+            self._read_at(offset, out)
+        else:
+            # the rows of a frame are contiguous but frames are not
+            offset += row_start * width * self.dtype.itemsize
+            for i in range(stop - start):
+                self._read_at(offset + i * self._stride, out[i])
+        return out
+
+    def _read_at(self, offset, out):
+        """ Read into the C-contiguous array out from offset """
+        if self._fd is not None and hasattr(os, 'pread'):
+            nbytes, nreads = _pread_into(self._fd, out, offset)
+            _instrument.count(nbytes, nreads)
+        else:
+            with self._lock:
+                self._file.seek(offset)
+                nbytes = _readinto(self._file, out)
+        if nbytes < out.nbytes:
+            # the file has been truncated after opening
+            raise ValueError('Reached the end of the file')
+
+    def _read_frames(self, indices, rows=None):
+        """ Read the frames at indices, reading consecutive ones at once """
+        indices = np.asarray(indices, dtype=int)
+        height = self.shape[1] if rows is None else rows[1] - rows[0]
+        data = np.ndarray((len(indices), height, self.shape[2]), dtype=self.dtype)
+        i = 0
+        while i < len(indices):
+            j = i + 1
+            while j < len(indices) and indices[j] == indices[j - 1] + 1:
+                j += 1
+            self._read(indices[i], indices[j - 1] + 1, out=data[i:j], rows=rows)
+            i = j
+        return data
+
+    def __repr__(self):
+        return '<SifFile shape={} dtype={}{}>'.format(
+            self.shape, self.dtype, ' closed' if self.closed else '')
+
+
+class SifTrack(object):
+    """
+    Rows of a subimage (track) of SifFile, which are read on demand.
+    Indexing is the same as SifFile.
+
+    Attributes
+    ----------
+    subimage: SubImage
+        geometry of the track on the detector
+    rows: tuple
+        the range of rows [start, stop) of the track in a frame
+    shape: tuple
+        (frames, track_height, width)
+    """
+    def __init__(self, sif, rows, subimage):
+        self._sif = sif
+        self.rows = tuple(rows)
+        self.subimage = subimage
+        self.shape = (len(sif), rows[1] - rows[0], sif.shape[2])
+        self.dtype = sif.dtype
+
+    @property
+    def ndim(self):
+        return 3
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        return self._sif._getitem(key, rows=self.rows)
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[:]
+        return data if dtype is None else data.astype(dtype)
+
+    def __repr__(self):
+        return '<SifTrack rows={} shape={}>'.format(self.rows, self.shape)
@@ -1,19 +1,31 @@
 import warnings
 import numpy as np
 from collections import OrderedDict
-from ._sif_open import _open
+from . import _sif_open, _instrument, _compressed, remote
 from .utils import extract_calibration, ordered_dat_files
-import glob, os
+import glob, io, os
+from concurrent.futures import CancelledError
 
 
-def np_open(sif_file, ignore_corrupt=False, lazy=None):
+_open = _instrument.timed_header(_sif_open._open)
+_read_header = _instrument.timed_header(_sif_open._read_header)
+
+
+@_instrument.timed('np_open')
+def np_open(sif_file, ignore_corrupt=False, lazy=None, bin=None, vbin=False,
+            out=None, progress=None, cancel=None, workers=None, salvage=False):
     """
     Open sif_file and return as np.array.
 
     Parameters
     ----------
     sif_file: 
-        path to the file
+        path to the file, which may be compressed by gzip, xz or bz2
+        (e.g. file.sif.gz), a http(s) url that supports range requests,
+        a binary file object, or the content of the file
+        as bytes, memoryview or any other object supporting the buffer
+        protocol. For the latter, the data is a read-only view of the buffer
+        (writable if the buffer is), without copying.
     ignore_corrupt: 
         True if ignore the corrupted frames.
     lazy: either of None | 'memmap' | 'dask'
@@ -21,19 +33,80 @@ def np_open(sif_file, ignore_corrupt=False, lazy=None):
         'memmap': returns np.memmap pointing on the disk
         'dask': returns dask.Array that consists of np.memmap
             This requires dask installed into the computer.
+        For a file object without a file descriptor, such as io.BytesIO,
+        the arrays point on its buffer instead.
+    bin: a tuple (by, bx)
+        sum up by x bx pixels of each frame as they are read. by and bx are
+        positive integers not larger than the height and width.
+        The remaining rows and columns are discarded.
+        Not available with lazy='memmap'.
+    vbin:
+        True to sum up all the rows of each frame (full vertical binning).
+    out: np.ndarray
+        C-contiguous float32 array sized [frames x height x width], into which
+        the data is directly read. Only available with lazy=None.
+    progress: callable
+        called as progress(frames_done, frames_total) while reading.
+    cancel: threading.Event
+        if it is set while reading, the file is closed and
+        concurrent.futures.CancelledError is raised.
+    workers: int
+        number of threads that read chunks of frames in parallel with
+        os.pread. Only available with lazy=None. This is effective for fast
+        storage, such as NVMe or parallel file systems.
+    salvage:
+        True to also return the last incomplete frame of a truncated file,
+        whose missing pixels are NaN. Use with ignore_corrupt=True.
+        Only available with lazy=None.
     """
     will_close = False
-    try:
+    buffer = _as_buffer(sif_file)
+    if buffer is not None:
+        f = _BufferReader(buffer)
+        tile, size, no_images, info = _open(f)
+    elif hasattr(sif_file, 'read'):
         f = sif_file
         tile, size, no_images, info = _open(f)
-    except AttributeError:
-        f = open(sif_file,'rb')
+    else:
+        f = _open_file(sif_file)
         will_close = True
         try:
             tile, size, no_images, info = _open(f)
-        except SyntaxError as e:
+        except Exception:
+            f.close()
+            raise
+
+    try:
+        return _read_data(
+            f, sif_file, tile, size, no_images, info, ignore_corrupt, lazy,
+            bin, vbin, out, progress, cancel, workers, salvage)
+    finally:
+        if will_close:
             f.close()
-            raise e
+
+
+def _read_data(f, sif_file, tile, size, no_images, info, ignore_corrupt, lazy,
+               bin, vbin, out, progress, cancel, workers, salvage):
+    """
+    Read the data of np_open after the header.
+    """
+    if vbin:
+        bin = (size[1], 1 if bin is None else bin[1])
+    if bin is not None:
+        by, bx = _check_bin(bin, size)
+        bin = (by, bx)
+        if lazy == 'memmap':
+            raise ValueError("bin is not available with lazy='memmap'.")
+        binned_size = (size[0] // bx, size[1] // by)
+        info['xbin'] *= bx
+        info['ybin'] *= by
+        info['SoftwareBinning'] = (by, bx)
+        info['size'] = binned_size
+        
+    if out is not None and lazy is not None:
+        raise ValueError("out is only available with lazy=None.")
+    if workers is not None and lazy is not None:
+        raise ValueError("workers is only available with lazy=None.")
 
     # allocate np.array
     if lazy == 'dask':
@@ -44,6 +117,30 @@ def np_open(sif_file, ignore_corrupt=False, lazy=None):
                 "Install dask to use lazy='dask'"
             )
 
+    if isinstance(f, _BufferReader) or (lazy is not None and not _has_fileno(f)):
+        if not isinstance(f, _BufferReader):
+            if not hasattr(f, 'getbuffer'):
+                raise ValueError(
+                    "lazy='{}' needs a file on the disk or a buffer.".format(lazy))
+            f = _BufferReader(memoryview(f.getbuffer()))
+        offset = tile[0][2] if len(tile) > 0 else info['offset']
+        return _read_buffer(f.buffer, offset, size, no_images, info,
+                            ignore_corrupt, lazy, bin, out, progress, cancel,
+                            salvage)
+
+    # the number of complete frames from the file size
+    offset = tile[0][2] if len(tile) > 0 else info['offset']
+    stride = size[0] * size[1] * np.dtype('<f').itemsize
+    file_size = _file_size(f)
+    n = no_images
+    if file_size is not None:
+        n = min(no_images, max(file_size - offset, 0) // max(stride, 1))
+        if n < no_images:
+            _corrupt(no_images, n, ignore_corrupt)
+    # one more frame for the incomplete one
+    n_alloc = n + 1 if salvage and lazy is None and n < no_images else n
+    tile = tile[:n_alloc]
+
     if lazy == 'memmap':
         # make sure the data is contiguous
         sizes = [tile[i + 1][2] - tile[i][2] for i in range(len(tile) - 1)]
@@ -53,55 +150,418 @@ def np_open(sif_file, ignore_corrupt=False, lazy=None):
             )
 
     if lazy is None:
-        data = np.ndarray((no_images, size[1], size[0]), dtype=np.float32)
+        shape = (no_images, size[1], size[0])
+        if bin is not None:
+            shape = (no_images, binned_size[1], binned_size[0])
+        if out is None:
+            data = np.ndarray((n_alloc, ) + shape[1:], dtype=np.float32)
+        else:
+            data = _check_out(out, shape, np.float32)
+            if n_alloc < no_images:
+                data = data[:n_alloc]
     elif lazy == 'memmap':
+        if len(tile) == 0:
+            return np.ndarray((0, size[1], size[0]), dtype=np.float32), info
         data = np.memmap(
             sif_file, '<f', mode='r', offset=tile[0][2], shape=(len(tile), size[1], size[0]), 
             order='C'
         )
+        return data, info
     elif lazy == 'dask':
         data = [None for _ in range(len(tile))]
 
-    for i, tile1 in enumerate(tile):
-        f.seek(tile1[2])  # offset
-        try:
-            if lazy is None:
-                data[i] = np.fromfile(f, count=size[0]*size[1],dtype='<f').reshape(size[1],size[0])
-            elif lazy == 'dask':
+    if (workers is not None and n > 0 and hasattr(os, 'pread')
+            and _has_fileno(f)):
+        with _instrument.stage('read'):
+            complete = _pread_frames(
+                f.fileno(), offset, size, data[:n], bin, workers, progress, cancel)
+            if complete < n:
+                # the file has been truncated after its size is known
+                if n == no_images:
+                    _corrupt(no_images, complete, ignore_corrupt)
+                n = complete
+                n_alloc = n + 1 if salvage else n
+                data = data[:n_alloc]
+            if n_alloc > n:
+                frame = np.ndarray((size[1], size[0]), dtype=np.float32)
+                f.seek(offset + n * stride)
+                if _salvage(frame, _readinto(f, frame)):
+                    data[n] = frame if bin is None else _bin(frame, *bin)
+                else:
+                    data = data[:n]
+        return data, info
+
+    # report the progress every ~1 MB
+    block = max(1, _PROGRESS_BYTES // max(stride, 1))
+    with _instrument.stage('dask_graph' if lazy == 'dask' else 'read'):
+        for i, tile1 in enumerate(tile):
+            if i % block == 0:
+                _poll(progress, cancel, i, len(tile))
+            f.seek(tile1[2])  # offset
+            if lazy == 'dask':
                 data[i] = da.from_array(np.memmap(
                     f, dtype='<f', mode='r', offset=tile1[2], 
                     shape=(size[1], size[0]), order='C'
                 ), chunks=(-1, -1))
+                if bin is not None:
+                    data[i] = _bin(data[i], *bin)
+                continue
+
+            frame = data[i] if bin is None else np.ndarray((size[1], size[0]), dtype=np.float32)
+            nbytes = _readinto(f, frame)
+            kept = nbytes == frame.nbytes or (salvage and _salvage(frame, nbytes))
+            if kept and bin is not None:
+                data[i] = _bin(frame, *bin)
+            if nbytes < frame.nbytes:
+                # the end of the file, whose size was not known
+                data = data[:i + kept]
+                if n == no_images:
+                    _corrupt(no_images, i, ignore_corrupt)
+                break
+
+        if progress is not None:
+            progress(len(data), len(tile))
+        if lazy == 'dask':
+            data = da.stack(data, axis=0)
+    return data, info
+
+
+def _salvage(frame, nbytes):
+    """
+    Fill the missing pixels of an incomplete frame by NaN.
+    Returns False if no pixel is read.
+    """
+    if nbytes < frame.itemsize:
+        return False
+    frame.reshape(-1)[nbytes // frame.itemsize:] = np.nan
+    return True
+
+
+def _file_size(f):
+    """
+    Size of the file, or None if it is not known without reading it, such
+    as of a compressed file.
+    """
+    if _has_fileno(f):
+        return os.fstat(f.fileno()).st_size
+    if hasattr(f, 'getbuffer'):
+        with f.getbuffer() as buffer:
+            return buffer.nbytes
+    if isinstance(f, remote.RangeFile):
+        return f.seek(0, io.SEEK_END)
+    return None
+
+
+def _read_buffer(buffer, offset, size, no_images, info, ignore_corrupt, lazy,
+                 bin, out, progress, cancel, salvage=False):
+    """
+    np_open for the file content in memory. The frames are a view of buffer,
+    except with the incomplete frame salvaged, which is appended to a copy.
+    """
+    _poll(progress, cancel, 0, no_images)
+    count = size[0] * size[1]
+    n = min(no_images, max(len(buffer) - offset, 0) // (count * 4))
+    if n < no_images:
+        _corrupt(no_images, n, ignore_corrupt)
+    data = np.frombuffer(
+        buffer, dtype='<f', count=n * count, offset=offset
+    ).reshape(n, size[1], size[0])
+    if salvage and lazy is None and n < no_images:
+        start = offset + n * count * 4
+        frame = np.ndarray((size[1], size[0]), dtype=np.float32)
+        nbytes = min(max(len(buffer) - start, 0), frame.nbytes)
+        frame.view(np.uint8).reshape(-1)[:nbytes] = np.frombuffer(
+            buffer, dtype=np.uint8, count=nbytes, offset=start)
+        if _salvage(frame, nbytes):
+            data = np.concatenate([data, frame[np.newaxis]])
+            n += 1
 
-        except ValueError:
-            data = data[:i]
-            if not ignore_corrupt:
-                if will_close:
-                    f.close()
-                raise ValueError(
-                    'The file might be corrupt. Number of files should be {} '
-                    'according to the header, but only {} is found in the file.'
-                    'Use "ignore_corrupt=True" keyword argument to ignore.'.format(
-                        no_images, len(data)
-                    )
-                )
-            else:
-                warnings.warn(
-                    'The file might be corrupt. Number of files should be {} '
-                    'according to the header, but only {} is found in the file.'.format(
-                        no_images, len(data)
-                    )
-                )
-
-    if will_close:
-        f.close()
-        
     if lazy == 'dask':
-        data = da.stack(data, axis=0)        
+        import dask.array as da
+        data = da.from_array(data, chunks=(1, -1, -1))
+    if bin is not None:
+        data = _bin(data, *bin)
+    if out is not None:
+        out = _check_out(out, (no_images, ) + data.shape[1:], np.float32)
+        out[:n] = data
+        data = out[:n]
+    if progress is not None:
+        progress(n, no_images)
     return data, info
 
+
+def _as_buffer(obj):
+    """
+    Returns a flat memoryview if obj is the file content in memory, otherwise
+    None.
+    """
+    if isinstance(obj, (str, os.PathLike)) or hasattr(obj, 'read'):
+        return None
+    try:
+        return memoryview(obj).cast('B')
+    except TypeError:
+        return None
+
+
+def _open_file(path):
+    """
+    Open path for reading. A compressed file is decompressed on the fly,
+    and a http(s) url is read by range requests.
+    """
+    path = os.fspath(path)
+    is_url = isinstance(path, str) and path.startswith(('http://', 'https://'))
+    if is_url:
+        f = remote.RangeFile(remote.HTTPRangeReader(path))
+    else:
+        f = open(path, 'rb')
+    try:
+        codec = _compressed.detect(f)
+    except Exception:
+        f.close()
+        raise
+    if codec is None:
+        return f
+    if is_url:
+        return io.BufferedReader(_compressed.CompressedReader(f, codec))
+    f.close()
+    return _compressed.open_compressed(path, codec)
+
+
+def _has_fileno(f):
+    try:
+        f.fileno()
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+class _BufferReader(object):
+    """
+    Minimal binary file object on a buffer to parse the header, without
+    copying the buffer.
+    """
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self._pos = 0
+
+    def read(self, size=-1):
+        end = len(self.buffer)
+        if size is not None and size >= 0:
+            end = min(self._pos + size, end)
+        data = self.buffer[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+
+    def readline(self, size=-1):
+        end = len(self.buffer)
+        if size is not None and size >= 0:
+            end = min(self._pos + size, end)
+        pos = self._pos
+        while pos < end:
+            i = self.buffer[pos:min(pos + 256, end)].tobytes().find(b'\n')
+            if i >= 0:
+                end = pos + i + 1
+                break
+            pos += 256
+        return self.read(end - self._pos)
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += len(self.buffer)
+        self._pos = offset
+        return self._pos
+
+
+def _corrupt(no_images, n_found, ignore_corrupt):
+    """
+    Raise an error or warn that only n_found frames are in the file.
+    """
+    if not ignore_corrupt:
+        raise ValueError(
+            'The file might be corrupt. Number of files should be {} '
+            'according to the header, but only {} is found in the file.'
+            'Use "ignore_corrupt=True" keyword argument to ignore.'.format(
+                no_images, n_found
+            )
+        )
+    warnings.warn(
+        'The file might be corrupt. Number of files should be {} '
+        'according to the header, but only {} is found in the file.'.format(
+            no_images, n_found
+        )
+    )
+
+
+_CHUNK_BYTES = 16 << 20
+
+
+def _pread_frames(fd, offset, size, data, bin, workers, progress, cancel):
+    """
+    Read frames starting at offset into data with a pool of threads.
+    The frames are split into chunks of about _CHUNK_BYTES, and each chunk is
+    read into its slice of data by os.pread, so that no file position is
+    shared among the threads.
+
+    Returns
+    -------
+    n: number of the frames completely read
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    stride = size[0] * size[1] * 4
+    no_images = len(data)
+    chunk = max(1, _CHUNK_BYTES // stride)
+    if no_images < chunk * workers:
+        # make sure all the workers have something to do
+        chunk = max(1, -(-no_images // workers))
+
+    def read(start):
+        if cancel is not None and cancel.is_set():
+            raise CancelledError('Reading was cancelled.')
+        stop = min(start + chunk, no_images)
+        if bin is None:
+            buffer = data[start:stop]
+        else:
+            buffer = np.ndarray((stop - start, size[1], size[0]), dtype=np.float32)
+        nbytes, nreads = _pread_into(fd, buffer, offset + start * stride)
+        n = nbytes // stride
+        if bin is not None:
+            data[start:start + n] = _bin(buffer[:n], *bin)
+        return start + n if n < stop - start else stop, nbytes, nreads
+
+    done = 0
+    complete = no_images
+    _poll(progress, cancel, 0, no_images)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(read, start) for start in range(0, no_images, chunk)]
+        try:
+            for start, future in zip(range(0, no_images, chunk), futures):
+                stop, nbytes, nreads = future.result()
+                # the stages are thread local, so count in this thread
+                _instrument.count(nbytes, nreads)
+                if stop < min(start + chunk, no_images):
+                    complete = min(complete, stop)
+                done += stop - start
+                _poll(progress, None, done, no_images)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return complete
+
+
+def _pread_into(fd, array, offset):
+    """
+    Read into the C-contiguous array from offset of fd, without moving the
+    file position. Returns the number of bytes read and of the read calls.
+    """
+    buffer = memoryview(array).cast('B')
+    n = 0
+    nreads = 0
+    while n < len(buffer):
+        if hasattr(os, 'preadv'):
+            m = os.preadv(fd, [buffer[n:]], offset + n)
+        else:
+            chunk = os.pread(fd, len(buffer) - n, offset + n)
+            m = len(chunk)
+            buffer[n:n + m] = chunk
+        nreads += 1
+        if not m:
+            break
+        n += m
+    return n, nreads
+
+
+_PROGRESS_BYTES = 1 << 20
+
+
+def _poll(progress, cancel, done, total):
+    """
+    Report the progress and raise CancelledError if cancelled.
+    """
+    if cancel is not None and cancel.is_set():
+        raise CancelledError('Reading was cancelled.')
+    if progress is not None:
+        progress(done, total)
+
+
+def _check_out(out, shape, dtype):
+    """
+    Make sure out can be used as the output buffer.
+    """
+    if tuple(out.shape) != tuple(shape):
+        raise ValueError(
+            'out should have shape {}, but has {}.'.format(tuple(shape), out.shape))
+    if out.dtype != np.dtype(dtype):
+        raise ValueError(
+            'out should have dtype {}, but has {}.'.format(np.dtype(dtype), out.dtype))
+    if not out.flags['C_CONTIGUOUS'] or not out.flags['WRITEABLE']:
+        raise ValueError('out should be a writeable C-contiguous array.')
+    return out
+
+
+def _readinto(f, array):
+    """
+    Read the file content directly into a C-contiguous array.
+    Returns the number of bytes read, which is smaller than array.nbytes
+    at the end of the file.
+    """
+    buffer = memoryview(array).cast('B')
+    n = 0
+    nreads = 0
+    while n < len(buffer):
+        m = f.readinto(buffer[n:])
+        nreads += 1
+        if not m:
+            break
+        n += m
+    _instrument.count(n, nreads)
+    return n
+
+
+def _check_bin(bin, size):
+    """
+    Returns bin as (by, bx) after checking that it fits the frame sized
+    size (width, height).
+    """
+    try:
+        by, bx = bin
+    except (TypeError, ValueError):
+        raise ValueError('bin should be a tuple (by, bx). Given {}'.format(bin))
+    for b, length, name in [(by, size[1], 'by'), (bx, size[0], 'bx')]:
+        if (not isinstance(b, (int, np.integer)) or isinstance(b, bool)
+                or not 1 <= b <= length):
+            raise ValueError(
+                'bin {} should be a positive integer not larger than {} of the '
+                'frame (height, width) = {}. Given {}'.format(
+                    name, length, (size[1], size[0]), bin))
+    return int(by), int(bx)
+
+
+def _bin(data, by, bx):
+    """
+    Sum up by x bx pixels of data sized [..., height, width].
+    The remaining rows and columns are discarded.
+    """
+    height = data.shape[-2] // by
+    width = data.shape[-1] // bx
+    data = data[..., :height * by, :width * bx]
+    data = data.reshape(data.shape[:-2] + (height, by, width, bx))
+    return data.sum(axis=(-3, -1), dtype=np.float32)
+
 # --- xarray open ---
-def xr_open(sif_file, ignore_corrupt=False, lazy=None):
+def xr_open(sif_file, ignore_corrupt=False, lazy=None, bin=None, vbin=False,
+            progress=None, cancel=None, salvage=False):
     """
     Read file and set into xr.DataArray.
     
@@ -116,16 +576,30 @@ def xr_open(sif_file, ignore_corrupt=False, lazy=None):
         'memmap': returns np.memmap pointing on the disk
         'dask': returns dask.Array that consists of np.memmap
             This requires dask installed into the computer.
+    bin: a tuple (by, bx)
+        sum up by x bx pixels of each frame as they are read.
+    vbin:
+        True to sum up all the rows of each frame (full vertical binning).
+    progress: callable
+        called as progress(frames_done, frames_total) while reading.
+    cancel: threading.Event
+        if it is set while reading, concurrent.futures.CancelledError is raised.
+    salvage:
+        True to also return the last incomplete frame of a truncated file,
+        whose missing pixels are NaN. Use with ignore_corrupt=True.
 
     Returns
     -------
     dataarray: xr.DataArray
         with attributes and coordinates from the metadata
     """
-    data, info = np_open(sif_file, ignore_corrupt=ignore_corrupt, lazy=lazy)
+    data, info = np_open(
+        sif_file, ignore_corrupt=ignore_corrupt, lazy=lazy, bin=bin, vbin=vbin,
+        progress=progress, cancel=cancel, salvage=salvage)
     return _to_xarray(data, info)
 
 
+@_instrument.timed('_to_xarray')
 def _to_xarray(data, info):
     try:
         import xarray as xr
@@ -138,19 +612,8 @@ def _to_xarray(data, info):
     
     # coordinates
     coords = OrderedDict()
-    # extract time stamps
-    time = np.ndarray(len(data), dtype=float)
-    
-    count = 0
-    time_prev = -1
-    for f in range(len(data)):
-        # for a very long experiment, the following can overflow in converting to floats
-        time_current = info['timestamp_of_{0:d}'.format(f)] * 1.0e-6  # unit [s]
-        if time_current < time_prev:
-            count += 1
-        time_prev = time_current
-        time[f] = time_current + count * (2.0**32 * 1e-6)
-    coords['Time'] = (('Time', ), time, {'Unit': 's'})
+    timestamps = [info['timestamp_of_{0:d}'.format(f)] for f in range(len(data))]
+    coords['Time'] = (('Time', ), _seconds(timestamps), {'Unit': 's'})
 
     # calibration data
     x_calibration = extract_calibration(info)
@@ -160,20 +623,55 @@ def _to_xarray(data, info):
         elif x_calibration.shape == x_calibration.shape == (data.shape[2], ):
             coords['calibration'] = (('width'), x_calibration)
 
+    return xr.DataArray(data, dims=['Time', 'height', 'width'],
+                        coords=coords, attrs=_attrs(info))
+
+
+def _seconds(timestamps):
+    """
+    Convert the timestamps in microseconds into seconds.
+    For a very long experiment, the timestamps stored in 32 bits wrap around,
+    which is detected by a decrease.
+    """
+    time = np.asarray(timestamps, dtype=float) * 1.0e-6  # unit [s]
+    wraps = np.zeros(len(time), dtype=int)
+    wraps[1:] = np.cumsum(time[1:] < time[:-1])
+    if len(time) > 0 and time[0] < -1:
+        wraps += 1
+    return time + wraps * (2.0**32 * 1e-6)
+
+
+def _header_calibration(header, info):
+    """
+    extract_calibration for info of header.as_dict(frames=False), which does
+    not have the calibrations of the frames.
+    """
+    frame_calibrations = header._frame_calibrations()
+    if frame_calibrations is not None:
+        info = OrderedDict(info)
+        info.pop('Calibration_data', None)
+        for i, coefs in enumerate(frame_calibrations):
+            info['Calibration_data_for_frame_{:d}'.format(i + 1)] = coefs
+    return extract_calibration(info)
+
+
+def _attrs(info):
+    """ The items of info that are kept as the attributes of xr.DataArray """
     new_info = OrderedDict()
+    # SubImages is a list of tuples, which is not allowed in netCDF attributes
     unused_keys = ['Calibration_data', 'timestamp_of_', 'tile']
     for key in list(info.keys()):
-        if all(k not in key for k in unused_keys):
+        if key != 'SubImages' and all(k not in key for k in unused_keys):
             new_info[key] = info[key]
             # remove time stamps from attrs
             if type(new_info[key]) == bytes:
                 new_info[key] = new_info[key].decode('utf-8')
-
-    return xr.DataArray(data, dims=['Time', 'height', 'width'],
-                        coords=coords, attrs=new_info)
+    return new_info
 
 
-def np_spool_open(spool_dir, ignore_missing=False, lazy=None):
+@_instrument.timed('np_spool_open')
+def np_spool_open(spool_dir, ignore_missing=False, lazy=None, out=None,
+                  progress=None, cancel=None):
     """
     Read the binary files and meta data from the directory generated via the spooling acquisition. 
     Returns a np.array and a dictionary of the meta data. 
@@ -193,6 +691,16 @@ def np_spool_open(spool_dir, ignore_missing=False, lazy=None):
         'memmap': returns np.memmap pointing on the disk
         'dask': returns dask.Array that consists of np.memmap
             This requires dask installed into the computer. *Not yet implemented*
+
+    out: np.ndarray
+        C-contiguous array sized [frames x height x width] with the dtype of
+        the pixel encoding, into which the data is directly read.
+
+    progress: callable
+        called as progress(frames_done, frames_total) while reading.
+
+    cancel: threading.Event
+        if it is set while reading, concurrent.futures.CancelledError is raised.
     Returns
     ----------
     array: np.ndarray
@@ -202,13 +710,97 @@ def np_spool_open(spool_dir, ignore_missing=False, lazy=None):
     if not os.path.isdir(spool_dir):
         raise ValueError(f"The path provide '{spool_dir}' to be a valid directory. Check that the directory provided is correct." )
 
-    dat_files_list = sorted(glob.glob(spool_dir + "/*spool.dat"), key = ordered_dat_files)
-    ini_file = glob.glob(spool_dir + "/*.ini" )
-    sifx_file = glob.glob(spool_dir + "/*.sifx")
-
+    dat_files_list = _spool_dat_files(spool_dir)
     if len(dat_files_list) < 1:
         raise ValueError('Not Binary file(s) with extension {} found in the directory provided {} '.format(
             "*spool.dat", spool_dir))
+
+    ini_info, info = _spool_header(spool_dir)
+    layout = _spool_layout(ini_info, info)
+    t = info["NumberOfFrames"]
+
+    # possible frame number
+    t_sizes = [os.path.getsize(f) // layout['frame_bytes'] for f in dat_files_list]
+    available = sum(t_sizes)
+    # create np array with the given info. The frames beyond the header are
+    # not read, with or without out
+    if out is None:
+        data = np.ndarray((min(available, t), ) + layout['shape'], dtype=layout['dtype'])
+    else:
+        data = _check_out(out, (t, ) + layout['shape'], layout['dtype'])
+    n = 0
+    with _instrument.stage('read'):
+        for f, t_size in zip(dat_files_list, t_sizes):
+            _poll(progress, cancel, n, len(data))
+            t_size = min(t_size, len(data) - n)
+            n += len(_read_spool_frames(f, layout, 0, t_size, out=data[n:n + t_size]))
+    if progress is not None:
+        progress(n, len(data))
+    data = data[:n]
+
+    if n != t or available != t:
+        if not ignore_missing:
+            raise ValueError('The spooling acquisition might be corrupt. Number of files should be {} '
+                        'according to the header, but only {} binary files were found in the directory.'.format(
+                            t, len(dat_files_list)))
+        else:
+            warnings.warn('The spooling acquisition might be corrupt. Number of files should be {} '
+                        'according to the header, but only {} binary files were found in the directory.'.format(
+                            t, len(dat_files_list)))
+
+    return data, info
+
+def xr_spool_open(spool_dir, ignore_missing=False, lazy=None):
+    """
+    Read the binary files and meta data from the directory generated via the spooling acquisition. 
+    Returns a np.array and a dictionary of the meta data. 
+
+    Parameters
+    ----------
+    spool_dir: 
+        directory path containing the spooling files. 
+        Must contain at least one "sifx_file", one "ini_file" and 
+        one or more "spooled_file(s)":
+        
+    ignore_missing: 
+        True if ignore missing or corrupted *.dat files
+    
+    lazy: either of None | 'memmap' | 'dask'
+        None: load all the data into the memory
+        'memmap': returns np.memmap pointing on the disk
+        'dask': returns dask.Array that consists of np.memmap
+            This requires dask installed into the computer. *Not yet implemented*
+
+    Returns
+    -------
+    dataarray: xr.DataArray
+        with attributes and coordinates from the metadata
+    """
+    data, info = np_spool_open(spool_dir, ignore_missing, lazy)
+    return _to_xarray(data, info)
+
+
+def _spool_dat_files(spool_dir):
+    """
+    List the *spool.dat files in spool_dir, sorted in the acquisition order.
+    """
+    return sorted(glob.glob(spool_dir + "/*spool.dat"), key=ordered_dat_files)
+
+
+def _spool_header(spool_dir):
+    """
+    Read the "ini_file" and the "sifx_file" of a spooling acquisition.
+
+    Returns
+    -------
+    ini_info: dict
+        key-value pairs found in the ini file.
+    info: OrderedDict
+        metadata read from the sifx file.
+    """
+    ini_file = glob.glob(spool_dir + "/*.ini" )
+    sifx_file = glob.glob(spool_dir + "/*.sifx")
+
     if len(ini_file) < 1:
         raise ValueError('Not "ini_file" file with extension {} found in the directory provided {} '.format(
             "*.ini" , spool_dir))
@@ -229,46 +821,32 @@ def np_spool_open(spool_dir, ignore_missing=False, lazy=None):
         raise ValueError(f"Problem handeling the 'ini' file. Probably the file is corrupted or keys are missing. Check that your 'ini' file contains the keys: {expected_ini_keys}, and their corresponding values.")
 
     # Checking for supported pixel encoding
-    allowed_encodings = ['Mono16', 'Mono32', 'Mono12Packed']
-    if ini_info['PixelEncoding'] not in allowed_encodings:
-        raise ValueError(f"Unknown pixel encoding found with value: '{ini_info['PixelEncoding']}. Allowed pixel encodings are: {allowed_encodings}.'")
+    if ini_info['PixelEncoding'] not in _SPOOL_ENCODINGS:
+        raise ValueError(f"Unknown pixel encoding found with value: '{ini_info['PixelEncoding']}. Allowed pixel encodings are: {_SPOOL_ENCODINGS}.'")
     
     # read only metadata (ignoring expected warning on missing data)
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         _ , info = np_open(sifx_file[0], ignore_corrupt=True)
+    return ini_info, info
 
-    # get the expected shape of the image from metadata
-    x, y = info["DetectorDimensions"]
-    t = info["NumberOfFrames"]
 
-    if ini_info['PixelEncoding'] != allowed_encodings[2]:
-
-        if ini_info['PixelEncoding'] == allowed_encodings[0]:
-            datatype = np.uint16
-            n_bits = 2
-        elif ini_info['PixelEncoding'] == allowed_encodings[1]:        
-            datatype = np.uint32
-            n_bits = 4    
-        # shape found from ini file
-        x_, y_ =  int( int(ini_info['AOIStride']) / n_bits ), int(ini_info['AOIHeight'])
-        image_size = int(ini_info['ImageSizeBytes']) // n_bits
-        # possible frame number
-        t_size = np.fromfile(dat_files_list[0], offset=0, dtype=datatype).size // (image_size)
-        size = t_size * image_size
-        # create np array with the given info     
-        data = np.concatenate([
-            np.fromfile(
-                f, offset=0, dtype=datatype
-            )[:size].reshape(t_size, image_size)[:, :x_ * y_].reshape(t_size, y_, x_)
-            for f in dat_files_list
-        ], axis=0)
-
-        # account for the extra padding to trim if present
-        if x != x_:
-            end_padding =  x_ - x
-            data = data[:, :, :-end_padding]
-    else:
+_SPOOL_ENCODINGS = ['Mono16', 'Mono32', 'Mono12Packed']
+
+
+def _spool_layout(ini_info, info):
+    """
+    Compute how a single frame is stored in the *spool.dat files.
+
+    Returns
+    -------
+    layout: dict
+        dtype: the pixel type
+        frame_bytes: bytes per frame, including the padding
+        stride_shape: (rows, pixels per row) including the row padding
+        shape: (height, width) of the frame after the padding is trimmed
+    """
+    if ini_info['PixelEncoding'] == 'Mono12Packed':
         raise TypeError(f"Support for the spooling file of type = '{ini_info['PixelEncoding']}' is currently not fully developed. Please rise an issue to implement this feature.")
         # return warnings.warn(f"Support for the spooling file of type = '{ini_info['PixelEncoding']}' is currently not fully developed. Please rise an issue to implement this feature.")
         
@@ -297,44 +875,88 @@ def np_spool_open(spool_dir, ignore_missing=False, lazy=None):
         
         # data = np.stack(image_mono12, axis = 0).reshape((t, y, x))  
 
-    if len(data) != t:
-        if not ignore_missing:
-            raise ValueError('The spooling acquisition might be corrupt. Number of files should be {} '
-                        'according to the header, but only {} binary files were found in the directory.'.format(
-                            t, len(dat_files_list)))
-        else:
-            warnings.warn('The spooling acquisition might be corrupt. Number of files should be {} '
-                        'according to the header, but only {} binary files were found in the directory.'.format(
-                            t, len(dat_files_list)))
-            data = data[:t]
+    if ini_info['PixelEncoding'] == 'Mono16':
+        datatype = np.uint16
+        n_bits = 2
+    elif ini_info['PixelEncoding'] == 'Mono32':
+        datatype = np.uint32
+        n_bits = 4
+    # get the expected shape of the image from metadata
+    x, y = info["DetectorDimensions"]
+    # shape found from ini file
+    x_, y_ =  int( int(ini_info['AOIStride']) / n_bits ), int(ini_info['AOIHeight'])
+    return {
+        'dtype': np.dtype(datatype),
+        'frame_bytes': int(ini_info['ImageSizeBytes']),
+        'stride_shape': (y_, x_),
+        'shape': (y_, min(x, x_)),
+    }
 
-    return data, info
 
-def xr_spool_open(spool_dir, ignore_missing=False, lazy=None):
+def _readinto_rows(f, out, stride):
     """
-    Read the binary files and meta data from the directory generated via the spooling acquisition. 
-    Returns a np.array and a dictionary of the meta data. 
-
-    Parameters
-    ----------
-    spool_dir: 
-        directory path containing the spooling files. 
-        Must contain at least one "sifx_file", one "ini_file" and 
-        one or more "spooled_file(s)":
-        
-    ignore_missing: 
-        True if ignore missing or corrupted *.dat files
-    
-    lazy: either of None | 'memmap' | 'dask'
-        None: load all the data into the memory
-        'memmap': returns np.memmap pointing on the disk
-        'dask': returns dask.Array that consists of np.memmap
-            This requires dask installed into the computer. *Not yet implemented*
-
-    Returns
-    -------
-    dataarray: xr.DataArray
-        with attributes and coordinates from the metadata
+    Read rows of stride items from the file into a C-contiguous array sized
+    [rows x width], trimming the padding at the end of each row.
+    The padded rows are read into the array itself and moved into their
+    places, so only the last rows that do not fit go through a small buffer.
+    Returns the number of rows completely read.
     """
-    data, info = np_spool_open(spool_dir, ignore_missing, lazy)
-    return _to_xarray(data, info)
\ No newline at end of file
+    rows, width = out.shape
+    flat = out.reshape(-1)
+    row_bytes = stride * out.itemsize
+    # the rows moved at once, which bounds the temporary copy by numpy
+    group = max(1, (1 << 16) // row_bytes)
+    done = 0
+    while done < rows:
+        m = min((flat.size - done * width) // stride, rows - done)
+        if m == 0:
+            row = np.empty(stride, dtype=out.dtype)
+            if _readinto(f, row) < row_bytes:
+                return done
+            out[done] = row[:width]
+            done += 1
+            continue
+        block = flat[done * width:done * width + m * stride].reshape(m, stride)
+        n = _readinto(f, block) // row_bytes
+        # the first row is already in its place
+        for j in range(1, n, group):
+            k = min(j + group, n)
+            out[done + j:done + k] = block[j:k, :width]
+        done += n
+        if n < m:
+            return done
+    return done
+
+
+def _read_spool_frames(filename, layout, start, stop, out=None):
+    """
+    Read frames [start, stop) of a single *spool.dat file.
+    The row padding is trimmed without copying.
+    If out is given, the frames are read into out and its view is returned.
+    """
+    y_, x_ = layout['stride_shape']
+    if out is not None:
+        # Directly read into the output, trimming the row padding if present
+        with open(filename, 'rb') as f:
+            for i in range(stop - start):
+                f.seek((start + i) * layout['frame_bytes'])
+                if x_ == layout['shape'][1]:
+                    complete = _readinto(f, out[i]) == out[i].nbytes
+                else:
+                    complete = _readinto_rows(f, out[i], x_) == y_
+                if not complete:
+                    return out[:i]
+        return out[:stop - start]
+
+    itemsize = layout['dtype'].itemsize
+    image_size = layout['frame_bytes'] // itemsize
+    n = stop - start
+    data = np.fromfile(
+        filename, offset=start * layout['frame_bytes'], dtype=layout['dtype'],
+        count=n * image_size
+    )
+    _instrument.count(data.nbytes)
+    n = data.size // image_size
+    data = data[:n * image_size].reshape(n, image_size)[:, :x_ * y_].reshape(n, y_, x_)
+    # account for the extra padding to trim if present
+    return data[:, :, :layout['shape'][1]]
@@ -0,0 +1,386 @@
+import os
+import glob
+import time
+import functools
+import numpy as np
+from .sif_open import (
+    _open, _spool_dat_files, _spool_header, _spool_layout, _read_spool_frames,
+    _check_out, _readinto, _corrupt, _CHUNK_BYTES
+)
+
+
+def follow(path, poll_interval=0.5, timeout=None, out=None):
+    """
+    Read frames from a sif file or a spooling directory that is still
+    being written by the camera.
+
+    Frames are yielded one by one as soon as they are completely written to
+    the disk. The growth of the file(s) is checked by polling their sizes;
+    frames that have been already yielded are never read again.
+
+    Parameters
+    ----------
+    path:
+        path to the sif file or to the spooling directory.
+    poll_interval: float
+        interval of the size check in seconds.
+    timeout: float or None
+        stop if no new frame arrived for this many seconds.
+        None: wait until all the frames in the header are delivered.
+    out: np.ndarray
+        C-contiguous array sized [height x width], into which each frame is
+        read. The same array is yielded for every frame, so it should be
+        consumed before the next iteration.
+
+    Yields
+    ------
+    frame: np.ndarray
+        2d array sized [height x width]
+    """
+    if os.path.isdir(path):
+        frames = _follow_spool(path, out)
+    else:
+        frames = _follow_sif(path, out)
+
+    last_update = time.monotonic()
+    for frame in frames:
+        if frame is not None:
+            last_update = time.monotonic()
+            yield frame
+            continue
+        # nothing new is written yet
+        if timeout is not None and time.monotonic() - last_update > timeout:
+            return
+        time.sleep(poll_interval)
+
+
+def _follow_sif(path, out=None):
+    """
+    Yield the newly completed frames of a growing sif file.
+    None is yielded when no new frame is available.
+    """
+    with open(path, 'rb') as f:
+        # the header itself may not be completely written yet
+        while True:
+            file_size = os.fstat(f.fileno()).st_size
+            f.seek(0)
+            try:
+                tile, size, no_images, info = _open(f)
+            except (ValueError, SyntaxError, EOFError):
+                if f.read(1) == b'':
+                    yield None
+                    continue
+                raise
+            # A header cut just before its end can be parsed with a wrong
+            # offset. Trust it only when the first frame is written after it,
+            # and it is parsed again with the same offset.
+            stride = size[0] * size[1] * np.dtype('<f').itemsize
+            if file_size < info['offset'] + min(no_images, 1) * stride:
+                yield None
+                continue
+            f.seek(0)
+            if _open(f)[3]['offset'] == info['offset']:
+                break
+            yield None
+
+        count = size[0] * size[1]
+        offset = info['offset']
+        # frames read at once, so that a long backlog is not loaded at once
+        block = max(1, _CHUNK_BYTES // max(stride, 1))
+        if out is not None:
+            out = _check_out(out, (size[1], size[0]), np.float32)
+        delivered = 0
+        while delivered < no_images:
+            available = (os.fstat(f.fileno()).st_size - offset) // stride
+            available = min(available, no_images)
+            if available <= delivered:
+                yield None
+                continue
+            f.seek(offset + delivered * stride)
+            if out is not None:
+                while delivered < available:
+                    _readinto(f, out)
+                    delivered += 1
+                    yield out
+                continue
+            n = min(available - delivered, block)
+            data = np.fromfile(f, count=count * n, dtype='<f')
+            for frame in data.reshape(-1, size[1], size[0]):
+                delivered += 1
+                yield frame
+
+
+def _follow_spool(spool_dir, out=None):
+    """
+    Yield the newly completed frames of a spooling acquisition.
+    None is yielded when no new frame is available.
+    """
+    # the metadata files are written at the beginning of the acquisition
+    while True:
+        try:
+            ini_info, info = _spool_header(spool_dir)
+            break
+        except (ValueError, SyntaxError, EOFError):
+            if not _spool_header_missing(spool_dir):
+                raise
+            yield None
+    layout = _spool_layout(ini_info, info)
+    no_images = info['NumberOfFrames']
+    if out is not None:
+        out = _check_out(out, layout['shape'], layout['dtype'])
+
+    delivered = 0
+    current = 0  # index of the dat file being written
+    in_current = 0  # frames already yielded from the current dat file
+    while delivered < no_images:
+        dat_files_list = _spool_dat_files(spool_dir)
+        if current >= len(dat_files_list):
+            yield None
+            continue
+        # once the next file appears, the current one is completed
+        finished = current + 1 < len(dat_files_list)
+        filename = dat_files_list[current]
+        available = os.path.getsize(filename) // layout['frame_bytes']
+        if available > in_current and out is not None:
+            _read_spool_frames(filename, layout, in_current, in_current + 1,
+                               out=out[np.newaxis])
+            in_current += 1
+            delivered += 1
+            yield out
+        elif available > in_current:
+            block = max(1, _CHUNK_BYTES // max(layout['frame_bytes'], 1))
+            stop = min(available, in_current + no_images - delivered,
+                       in_current + block)
+            for frame in _read_spool_frames(filename, layout, in_current, stop):
+                in_current += 1
+                delivered += 1
+                yield frame
+        elif finished:
+            current += 1
+            in_current = 0
+        else:
+            yield None
+
+
+def _spool_header_missing(spool_dir):
+    """ True if the ini or the sifx file is not written yet """
+    for pattern in ['/*.ini', '/*.sifx']:
+        files = glob.glob(spool_dir + pattern)
+        if not files or os.path.getsize(files[0]) == 0:
+            return True
+    return False
+
+
+_REDUCE_OPS = ['sum', 'mean', 'max', 'min', 'std', 'frame_total']
+
+
+def reduce(path, ops=('sum', 'mean', 'max', 'frame_total'), axis=0,
+           block_frames=None, workers=None, ignore_corrupt=False):
+    """
+    Compute statistics of a sif file or a spooling acquisition in one
+    streaming pass, without loading the whole data into the memory.
+
+    Parameters
+    ----------
+    path:
+        path to the sif file or to the spooling directory.
+    ops: list of str
+        Any of 'sum' | 'mean' | 'max' | 'min' | 'std' | 'frame_total'
+        'frame_total' gives the sum of each frame.
+    axis: 0 or None
+        0: reduce along the frames, the results are [height x width] images.
+        None: reduce the whole data, the results are scalars.
+        This does not affect 'frame_total'.
+    block_frames: int
+        number of frames read at once.
+        Default: as many as fit in 16 MB (at least one).
+    workers: int or None
+        number of threads that read and reduce the blocks in parallel.
+        None: reduce in the calling thread.
+    ignore_corrupt:
+        True if ignore the corrupted frames (or missing *.dat files).
+
+    Returns
+    -------
+    results: dict
+        mapping from each of ops to the result.
+        The accumulation is done in float64.
+    """
+    for op in ops:
+        if op not in _REDUCE_OPS:
+            raise ValueError(
+                'Unknown op {}. Allowed ops are {}.'.format(op, _REDUCE_OPS))
+    if axis not in [0, None]:
+        raise ValueError('axis should be 0 or None. Given {}'.format(axis))
+
+    tasks = _block_tasks(path, block_frames, ignore_corrupt)[0]
+    needs = _stats_needed(ops)
+    stats = None
+    for partial in _map_blocks(
+            functools.partial(_block_stats, needs=needs), tasks, workers):
+        stats = partial if stats is None else _merge_stats(stats, partial)
+    if stats is None:
+        raise ValueError('No frame is found in {}'.format(path))
+    return _finalize_stats(stats, ops, axis)
+
+
+def _block_tasks(path, block_frames, ignore_corrupt=False):
+    """
+    Split the data in path into blocks of frames.
+    With block_frames=None, a block is about _CHUNK_BYTES.
+    Raise ValueError (or warn, with ignore_corrupt) if frames are missing.
+
+    Returns
+    -------
+    tasks: list
+        list of functions. Each of them reads a block and returns it as a
+        np.ndarray sized [frames x height x width].
+    info: OrderedDict
+        the metadata
+    shape: tuple
+        (frames, height, width) of all the blocks
+    dtype: np.dtype
+    """
+    if os.path.isdir(path):
+        ini_info, info = _spool_header(path)
+        layout = _spool_layout(ini_info, info)
+        if block_frames is None:
+            block_frames = max(1, _CHUNK_BYTES // max(layout['frame_bytes'], 1))
+        tasks = []
+        remaining = info['NumberOfFrames']
+        for filename in _spool_dat_files(path):
+            n = min(os.path.getsize(filename) // layout['frame_bytes'], remaining)
+            remaining -= n
+            for start in range(0, n, block_frames):
+                stop = min(start + block_frames, n)
+                tasks.append(functools.partial(_read_spool_frames, filename, layout, start, stop))
+        if remaining > 0:
+            _corrupt(info['NumberOfFrames'], info['NumberOfFrames'] - remaining,
+                     ignore_corrupt)
+        shape = (info['NumberOfFrames'] - remaining, ) + layout['shape']
+        return tasks, info, shape, layout['dtype']
+
+    with open(path, 'rb') as f:
+        tile, size, no_images, info = _open(f)
+        count = size[0] * size[1]
+        stride = count * np.dtype('<f').itemsize
+        n = min(
+            no_images, (os.fstat(f.fileno()).st_size - info['offset']) // stride)
+    if n < no_images:
+        _corrupt(no_images, n, ignore_corrupt)
+    no_images = n
+    if block_frames is None:
+        block_frames = max(1, _CHUNK_BYTES // max(stride, 1))
+
+    def read(start, stop):
+        return np.fromfile(
+            path, dtype='<f', count=count * (stop - start),
+            offset=info['offset'] + start * stride
+        ).reshape(stop - start, size[1], size[0])
+
+    tasks = [functools.partial(read, start, min(start + block_frames, no_images))
+             for start in range(0, no_images, block_frames)]
+    return tasks, info, (no_images, size[1], size[0]), np.dtype('<f')
+
+
+def _map_blocks(func, tasks, workers):
+    """
+    Yield func(task()) in order. With workers, at most 2 * workers blocks
+    are in flight at the same time to keep the memory bounded.
+    """
+    if workers is None or workers <= 1:
+        for task in tasks:
+            yield func(task())
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+    from collections import deque
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = deque()
+        for task in tasks:
+            futures.append(executor.submit(lambda t: func(t()), task))
+            if len(futures) >= 2 * workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def _stats_needed(ops):
+    """ The statistics to accumulate for ops """
+    needs = set()
+    for op in ops:
+        if op in ['sum', 'mean']:
+            needs.add('sum')
+        elif op == 'std':
+            needs.update(['sum', 'm2'])
+        else:
+            needs.add(op)
+    return frozenset(needs)
+
+
+def _block_stats(block, needs):
+    """
+    Statistics of a block that can be merged by _merge_stats.
+    Only those in needs are computed. The sums are accumulated in float64
+    without copying the block.
+    """
+    n = len(block)
+    stats = {'n': n}
+    if 'sum' in needs:
+        stats['sum'] = block.sum(axis=0, dtype=np.float64)
+    if 'm2' in needs:
+        stats['m2'] = ((block - stats['sum'] / n)**2).sum(axis=0)
+    if 'max' in needs:
+        stats['max'] = block.max(axis=0)
+    if 'min' in needs:
+        stats['min'] = block.min(axis=0)
+    if 'frame_total' in needs:
+        stats['frame_total'] = [block.sum(axis=(1, 2), dtype=np.float64)]
+    return stats
+
+
+def _merge_stats(a, b):
+    """ Merge the statistics of two blocks (Chan's parallel algorithm) """
+    n = a['n'] + b['n']
+    stats = {'n': n}
+    if 'sum' in a:
+        stats['sum'] = a['sum'] + b['sum']
+    if 'm2' in a:
+        delta = b['sum'] / b['n'] - a['sum'] / a['n']
+        stats['m2'] = a['m2'] + b['m2'] + delta**2 * a['n'] * b['n'] / n
+    if 'max' in a:
+        stats['max'] = np.maximum(a['max'], b['max'])
+    if 'min' in a:
+        stats['min'] = np.minimum(a['min'], b['min'])
+    if 'frame_total' in a:
+        stats['frame_total'] = a['frame_total'] + b['frame_total']
+    return stats
+
+
+def _finalize_stats(stats, ops, axis):
+    n = stats['n']
+    if 'sum' in stats:
+        mean = stats['sum'] / n
+    if 'm2' in stats:
+        m2 = stats['m2']
+    if 'sum' in stats and axis is None:
+        n_total = n * mean.size
+        grand_mean = stats['sum'].sum() / n_total
+        if 'm2' in stats:
+            m2 = m2.sum() + (n * (mean - grand_mean)**2).sum()
+        n, mean = n_total, grand_mean
+
+    results = {}
+    for op in ops:
+        if op == 'frame_total':
+            results[op] = np.concatenate(stats['frame_total'])
+        elif op == 'sum':
+            results[op] = stats['sum'] if axis == 0 else stats['sum'].sum()
+        elif op == 'mean':
+            results[op] = mean
+        elif op == 'std':
+            results[op] = np.sqrt(m2 / n)
+        elif op in ['max', 'min']:
+            results[op] = stats[op] if axis == 0 else getattr(stats[op], op)()
+    return results
@@ -1,10 +1,13 @@
 import typing
+import functools
 import numpy as np
 import os
 
 from . import sif_open as sif
+from . import _instrument
 
 
+@_instrument.timed('extract_calibration')
 def extract_calibration(info):
     """
     Extract calibration data from info.
@@ -22,6 +25,10 @@ def extract_calibration(info):
         2d array sized [NumberOfFrames x width] if multiple calibration is
             found.
         None if no calibration is found
+
+        For a Mechelle spectrograph, the calibration is evaluated from
+        PixelCalibration. The evaluation is cached for the files sharing
+        the calibration, and a copy is returned.
     """
     width = info['DetectorDimensions'][0]
     if 'ImageLength' in info:
@@ -33,14 +40,106 @@ def extract_calibration(info):
             key = 'Calibration_data_for_frame_{:d}'.format(f + 1)
             flip_coef = np.flipud(info[key])
             calibration[f] = np.poly1d(flip_coef)(np.arange(1, width + 1))
-        return calibration
+
+    elif info.get('PixelCalibration'):
+        bx = info.get('SoftwareBinning', (1, 1))[1]
+        return _pixel_calibration(
+            tuple(float(c) for c in info['PixelCalibration']), width, bx).copy()
 
     elif 'Calibration_data' in info:
         flip_coef = np.flipud(info['Calibration_data'])
-        return np.poly1d(flip_coef)(np.arange(1, width + 1))
+        calibration = np.poly1d(flip_coef)(np.arange(1, width + 1))
     else:
         return None
 
+    if 'SoftwareBinning' in info:
+        # average over the pixels that are binned by np_open
+        bx = info['SoftwareBinning'][1]
+        width = calibration.shape[-1] // bx
+        calibration = calibration[..., :width * bx].reshape(
+            calibration.shape[:-1] + (width, bx)).mean(axis=-1)
+    return calibration
+
+
+@functools.lru_cache(maxsize=64)
+def _pixel_calibration(coefficients, width, bx):
+    """
+    The wavelength of each pixel of the polynomial calibration
+    sum_i coefficients[i] * pixel**i for pixel = 1, ..., width,
+    averaged over the bx pixels binned by np_open.
+    The result is cached, so it is made read-only. Copy it before
+    returning it to the users.
+    """
+    pixels = np.arange(1, width + 1, dtype=float)
+    calibration = np.polynomial.polynomial.polyval(pixels, coefficients)
+    if bx != 1:
+        calibration = calibration[:width // bx * bx].reshape(-1, bx).mean(axis=-1)
+    calibration.flags.writeable = False
+    return calibration
+
+
+def _jsonable(value):
+    """ JSON serializable value, where NaN and inf become None (null) """
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    if isinstance(value, np.ndarray):
+        return _jsonable(value.tolist())
+    if isinstance(value, np.generic):
+        return _jsonable(value.item())
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    return value
+
+
+def split_tracks(data, info):
+    """
+    Split the data of a multi-track acquisition into the tracks.
+
+    Parameters
+    ----------
+    data: np.ndarray or dask.Array
+        [frames x height x width] array from np_open
+    info: OrderedDict
+        OrderedDict from np_open
+
+    Returns
+    -------
+    tracks: list
+        the views of data sized [frames x track_height x width] for each
+        subimage (track). No data is copied.
+    """
+    return [data[..., start:stop, :] for start, stop in _track_rows(info)]
+
+
+def _track_rows(info):
+    """
+    The range of rows [start, stop) of each subimage in a frame.
+    """
+    return _subimage_rows(info.get('SubImages', None), info['size'][1],
+                          info.get('SoftwareBinning', (1, 1))[0])
+
+
+def _subimage_rows(subimages, height, by=1):
+    """
+    The range of rows [start, stop) of each of subimages in a frame with
+    height rows, binned by by rows on read.
+    """
+    if not subimages:
+        return [(0, height)]
+    if by != 1 and len(subimages) > 1:
+        raise ValueError(
+            'The tracks are mixed by the vertical binning on read.')
+    rows = []
+    start = 0
+    for subimage in subimages:
+        stop = start + subimage.height // by
+        rows.append((start, stop))
+        start = stop
+    return rows
 
 def parse(file: str) -> typing.Tuple[np.ndarray, typing.Dict]:
     """
@@ -60,6 +159,61 @@ def parse(file: str) -> typing.Tuple[np.ndarray, typing.Dict]:
     df = np.column_stack((wavelengths, data.flatten()))
     return (df, info)
 
+def resample(wavelengths, counts, grid):
+    """
+    Linearly interpolate many spectra onto a common grid at once.
+
+    The spectra are searched in one np.searchsorted call, by shifting each
+    of them to its own range of the axis, instead of np.interp for each.
+
+    Parameters
+    ----------
+    wavelengths: np.ndarray
+        sized [width] or [spectra x width]. Monotonic along the last axis.
+    counts: np.ndarray
+        sized [spectra x width]
+    grid: np.ndarray
+        1d array of the wavelengths to interpolate at.
+
+    Returns
+    -------
+    resampled: np.ndarray
+        sized [spectra x len(grid)]. NaN outside the range of each spectrum.
+    """
+    y = np.atleast_2d(np.asarray(counts, dtype=float))
+    x = np.broadcast_to(np.asarray(wavelengths, dtype=float), y.shape)
+    grid = np.asarray(grid, dtype=float)
+    n, width = y.shape
+    if n == 0 or width == 0 or grid.size == 0:
+        return np.full((n, grid.size), np.nan)
+
+    # make every spectrum increasing
+    decreasing = x[:, 0] > x[:, -1]
+    if decreasing.any():
+        x = np.where(decreasing[:, np.newaxis], x[:, ::-1], x)
+        y = np.where(decreasing[:, np.newaxis], y[:, ::-1], y)
+
+    # shift the i-th spectrum by i * span so that all of them are sorted in
+    # a single array
+    low = min(x[:, 0].min(), grid.min())
+    span = max(x[:, -1].max(), grid.max()) - low + 1.0
+    shift = np.arange(n)[:, np.newaxis] * span
+    flat = (x - low + shift).ravel()
+    queries = grid[np.newaxis, :] - low + shift
+    index = np.searchsorted(flat, queries.ravel(), side='right').reshape(n, -1)
+    index = np.clip(index - np.arange(n)[:, np.newaxis] * width, 1, max(width - 1, 1))
+
+    rows = np.arange(n)[:, np.newaxis]
+    x0, x1 = x[rows, index - 1], x[rows, np.minimum(index, width - 1)]
+    y0, y1 = y[rows, index - 1], y[rows, np.minimum(index, width - 1)]
+    dx = x1 - x0
+    t = np.divide(grid - x0, dx, out=np.zeros_like(dx), where=dx != 0)
+    resampled = y0 + t * (y1 - y0)
+    outside = (grid < x[:, :1]) | (grid > x[:, -1:])
+    resampled[outside] = np.nan
+    return resampled
+
+
 def ordered_dat_files(input_string):
     """
     This helper function sort the list of .dat files in the exspected order
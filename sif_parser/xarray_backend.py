@@ -0,0 +1,124 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+import xarray as xr
+from xarray.backends import BackendEntrypoint, BackendArray
+from xarray.core import indexing
+
+from . import _instrument
+from .sif_file import SifFile
+from .sif_open import _seconds, _attrs, _header_calibration
+
+# xarray backend to open sif files by
+#
+# >>> ds = xr.open_dataset('/path/to/file.sif', engine='sif')
+#
+# The data is read on demand: an index of the variable is mapped to the
+# reads of the frames (and the rows) selected only, by SifFile.
+
+
+class SifBackendArray(BackendArray):
+    """
+    Lazily indexed array of the frames of SifFile.
+    """
+    def __init__(self, sif):
+        self.sif = sif
+        self.shape = sif.shape
+        self.dtype = sif.dtype
+
+    def __getitem__(self, key):
+        return indexing.explicit_indexing_adapter(
+            key, self.shape, indexing.IndexingSupport.OUTER_1VECTOR,
+            self._raw_indexing_method)
+
+    def _raw_indexing_method(self, key):
+        frames, rows, columns = key
+        # read only the rows selected by a slice or an integer
+        row_range = None
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(self.shape[1])
+            if step == 1:
+                row_range = (start, max(start, stop))
+                rows = slice(None)
+        elif isinstance(rows, (int, np.integer)):
+            row_range = (int(rows), int(rows) + 1)
+            rows = 0
+
+        with _instrument.stage('read'):
+            data = self.sif._getitem(frames, rows=row_range)
+        if isinstance(frames, (int, np.integer)):
+            return data[rows, columns]
+        return data[:, rows, columns]
+
+
+class SifBackendEntrypoint(BackendEntrypoint):
+    """
+    Backend of xarray for sif files, registered as engine='sif'.
+
+    The dataset has the variable sized [Time x height x width], with the
+    Time and calibration coordinates and the metadata as its attributes,
+    so that xr.open_dataarray(path, engine='sif') is the same as xr_open.
+    """
+    description = "Open Andor sif files in xarray"
+    url = "https://github.com/fujiisoup/sif_parser"
+    open_dataset_parameters = ["filename_or_obj", "drop_variables", "name",
+                               "ignore_corrupt"]
+
+    def open_dataset(self, filename_or_obj, *, drop_variables=None,
+                     name='counts', ignore_corrupt=False):
+        """
+        Parameters
+        ----------
+        filename_or_obj:
+            path to the file, or a binary file object.
+        drop_variables: list of str
+            names of the variables or the coordinates not to load.
+        name: str
+            name of the data variable.
+        ignore_corrupt:
+            True if ignore the corrupted frames.
+        """
+        if isinstance(filename_or_obj, os.PathLike):
+            filename_or_obj = os.fspath(filename_or_obj)
+        sif = SifFile(filename_or_obj, ignore_corrupt=ignore_corrupt)
+        try:
+            dataset = _to_dataset(sif, name, drop_variables or [])
+        except Exception:
+            sif.close()
+            raise
+        dataset.set_close(sif.close)
+        return dataset
+
+    def guess_can_open(self, filename_or_obj):
+        try:
+            _, ext = os.path.splitext(os.fspath(filename_or_obj))
+        except TypeError:
+            return False
+        return ext.lower() == '.sif'
+
+
+def _to_dataset(sif, name, drop_variables):
+    header = sif.header
+    n, height, width = sif.shape
+    info = header.as_dict(frames=False)
+
+    variables = OrderedDict()
+    data = indexing.LazilyIndexedArray(SifBackendArray(sif))
+    variables[name] = xr.Variable(('Time', 'height', 'width'), data, _attrs(info))
+    variables['Time'] = xr.Variable(
+        ('Time', ), _seconds(header.timestamps[:n]), {'Unit': 's'})
+
+    calibration = _header_calibration(header, info)
+    if calibration is not None:
+        if calibration.ndim == 2 and calibration.shape[-1] == width:
+            variables['calibration'] = xr.Variable(
+                ('Time', 'width'), calibration[:n])
+        elif calibration.shape == (width, ):
+            variables['calibration'] = xr.Variable(('width', ), calibration)
+
+    for key in drop_variables:
+        variables.pop(key, None)
+    coords = [key for key in ['Time', 'calibration'] if key in variables]
+    return xr.Dataset(variables).set_coords(coords)
+
@@ -0,0 +1,81 @@
+import os
+import json
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+
+pa = pytest.importorskip('pyarrow')
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+CALIBRATED_FILE = THIS_DIR + "/examples_with_calibration/raman1.sif"
+IMAGE_FILE = THIS_DIR + "/public_testdata/image.sif"
+
+
+@pytest.mark.parametrize("filename", [MULTI_FRAME_FILE, CALIBRATED_FILE, IMAGE_FILE])
+def test_to_arrow_spectra(filename):
+    expected = sif_parser.xr_open(filename)
+    n, height, width = expected.shape
+    table = sif_parser.to_arrow(filename)
+    assert table.num_rows == n * height
+    counts = np.asarray(table['counts'].combine_chunks().flatten())
+    np.testing.assert_array_equal(counts.reshape(n, height, width), expected.values)
+    np.testing.assert_array_equal(table['frame'], np.repeat(np.arange(n), height))
+    np.testing.assert_allclose(table['time'], np.repeat(expected['Time'], height))
+
+    metadata = table.schema.metadata
+    assert json.loads(metadata[b'ExposureTime']) == expected.attrs['ExposureTime']
+    assert b'timestamp_of_0' not in metadata
+    if 'calibration' in expected.coords:
+        np.testing.assert_allclose(json.loads(metadata[b'calibration']),
+                                   expected['calibration'])
+    else:
+        assert b'calibration' not in metadata
+
+
+def test_to_arrow_long():
+    expected = sif_parser.xr_open(CALIBRATED_FILE)
+    n, height, width = expected.shape
+    table = sif_parser.to_arrow(CALIBRATED_FILE, layout='long')
+    assert table.num_rows == expected.size
+    np.testing.assert_array_equal(table['counts'], expected.values.reshape(-1))
+    np.testing.assert_array_equal(table['pixel'], np.tile(np.arange(width), n * height))
+    np.testing.assert_allclose(
+        table['wavelength'],
+        np.broadcast_to(expected['calibration'], expected.shape).reshape(-1))
+
+
+def test_to_arrow_zero_copy():
+    from sif_parser._arrow import _Exporter
+
+    with sif_parser.SifFile(MULTI_FRAME_FILE) as sif:
+        data = sif[:]
+        batch = _Exporter(sif, 'spectra').batch(data, 0)
+    # the counts are wrapped, not copied
+    values = batch.column(batch.schema.get_field_index('counts')).values
+    assert values.buffers()[1].address == data.ctypes.data
+
+
+@pytest.mark.parametrize("layout", ['spectra', 'long'])
+def test_to_arrow_reader(layout):
+    expected = sif_parser.to_arrow(MULTI_FRAME_FILE, layout=layout)
+    reader = sif_parser.to_arrow_reader(MULTI_FRAME_FILE, batch_frames=3, layout=layout)
+    assert reader.schema == expected.schema
+    batches = list(reader)
+    with sif_parser.SifFile(MULTI_FRAME_FILE) as sif:
+        n = len(sif)
+    assert len(batches) == (n + 2) // 3
+    assert pa.Table.from_batches(batches).equals(expected)
+
+
+def test_to_arrow_nan_metadata():
+    # RamanExWavelength is NaN in this file
+    table = sif_parser.to_arrow(THIS_DIR + "/echelle/boron_0.05_1us_750ns_5.sif")
+
+    def reject(constant):
+        raise ValueError(constant)
+
+    metadata = {key: json.loads(value, parse_constant=reject)
+                for key, value in table.schema.metadata.items()}
+    assert metadata[b'RamanExWavelength'] is None
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+import sif_parser
+from sif_parser import catalog, cli
+
+
+def _write(path, gate_delay, frames=2):
+    data = np.zeros((frames, 4, 8), dtype=np.float32)
+    sif_parser.write_sif(str(path), data, {'GateDelay': gate_delay})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_and_query(tmp_path, workers):
+    root = tmp_path / "data"
+    (root / "sub").mkdir(parents=True)
+    _write(root / "a.sif", 1e-4)
+    _write(root / "sub" / "b.sif", 5e-4, frames=3)
+    (root / "broken.sif").write_bytes(b"not a sif file")
+    (root / "notes.txt").write_text("ignored")
+    db = str(tmp_path / "index.sqlite")
+
+    summary = catalog.build(str(root), workers=workers, db=db)
+    assert summary == {'added': 3, 'updated': 0, 'removed': 0,
+                       'unchanged': 0, 'failed': 1}
+
+    rows = catalog.query(db, 'GateDelay > ?', (4e-4, ))
+    assert [os.path.basename(r['path']) for r in rows] == ['b.sif']
+    assert rows[0]['NumberOfFrames'] == 3
+    assert (rows[0]['height'], rows[0]['width']) == (4, 8)
+
+    rows = catalog.query(db, 'error IS NOT NULL', columns=['path', 'error'])
+    assert [os.path.basename(r['path']) for r in rows] == ['broken.sif']
+
+
+def test_incremental(tmp_path):
+    root = tmp_path / "data"
+    root.mkdir()
+    _write(root / "a.sif", 1e-4)
+    _write(root / "b.sif", 2e-4)
+    db = str(tmp_path / "index.sqlite")
+    catalog.build(str(root), workers=1, db=db)
+
+    # only the changed files are read again
+    _write(root / "a.sif", 3e-4, frames=5)
+    os.remove(str(root / "b.sif"))
+    _write(root / "c.sif", 4e-4)
+    summary = catalog.build(str(root), workers=1, db=db)
+    assert summary == {'added': 1, 'updated': 1, 'removed': 1,
+                       'unchanged': 0, 'failed': 0}
+    rows = catalog.query(db, columns=['path', 'GateDelay', 'NumberOfFrames'])
+    assert [(os.path.basename(r['path']), r['NumberOfFrames']) for r in rows] == [
+        ('a.sif', 5), ('c.sif', 2)]
+    assert rows[0]['GateDelay'] == pytest.approx(3e-4)
+
+    summary = catalog.build(str(root), workers=1, db=db)
+    assert summary['unchanged'] == 2
+    assert summary['added'] + summary['updated'] + summary['removed'] == 0
+
+
+def test_cli(tmp_path, capsys):
+    root = tmp_path / "data"
+    root.mkdir()
+    _write(root / "a.sif", 1e-4)
+    _write(root / "b.sif", 5e-4)
+    db = str(tmp_path / "index.sqlite")
+
+    cli.main(['catalog', 'build', str(root), '--db', db, '--workers', '1'])
+    assert 'added 2' in capsys.readouterr().out
+
+    cli.main(['catalog', 'query', 'GateDelay > 4e-4', '--db', db])
+    out = capsys.readouterr().out.split()
+    assert [os.path.basename(p) for p in out] == ['b.sif']
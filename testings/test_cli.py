@@ -157,3 +157,36 @@ def test_get_new_join_fn():
 
     cli.convert_files(paths, output_dir=CLI_OUT_DIR, join=True)
     assert os.path.exists(os.path.join(CLI_OUT_DIR, 'sif_joined_data-1.csv'))
+
+
+def test_convert_files_grid():
+    """
+    Validate --grid resamples all spectra onto one wavelength axis.
+    """
+    clean_out_dir()
+    paths = sorted(glob(os.path.join(CLI_DATA_DIR, '*.sif')))
+    grid = cli.parse_grid('600:1000:0.5')
+    cli.convert_files(paths, output_dir=CLI_OUT_DIR, grid=grid)
+
+    df = pd.read_csv(os.path.join(CLI_OUT_DIR, 'sif_joined_data.csv'), index_col='sample')
+    np.testing.assert_allclose(df.columns.astype(float), np.arange(600, 1000.25, 0.5))
+    assert list(df.index) == [os.path.splitext(os.path.basename(p))[0] for p in paths]
+
+    for p, (_, row) in zip(paths, df.iterrows()):
+        data, _ = cli.utils.parse(p)
+        x, y = data[:, 0], data[:, 1]
+        expected = np.where((grid >= x.min()) & (grid <= x.max()), np.interp(grid, x, y), np.nan)
+        np.testing.assert_allclose(row.values, expected, rtol=1e-6, equal_nan=True)
+
+
+def test_convert_files_grid_points():
+    """
+    Validate --grid with a number of points uses the range shared by all files.
+    """
+    clean_out_dir()
+    paths = sorted(glob(os.path.join(CLI_DATA_DIR, '*.sif')))
+    cli.convert_files(paths, output_dir=CLI_OUT_DIR, grid=cli.parse_grid('100'))
+
+    df = pd.read_csv(os.path.join(CLI_OUT_DIR, 'sif_joined_data.csv'), index_col='sample')
+    assert df.shape == (len(paths), 100)
+    assert not df.isna().any().any()
@@ -0,0 +1,137 @@
+import bz2
+import gzip
+import lzma
+import os
+import random
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+from sif_parser import _compressed
+
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+
+
+def _compress(codec, raw, members=1):
+    compress = {"gz": gzip.compress, "xz": lzma.compress, "bz2": bz2.compress}[codec]
+    step = -(-len(raw) // members)
+    return b"".join(compress(raw[i:i + step]) for i in range(0, len(raw), step))
+
+
+@pytest.mark.parametrize("codec", ["gz", "xz", "bz2"])
+@pytest.mark.parametrize("members", [1, 3])
+def test_np_open(tmp_path, codec, members):
+    expected, expected_info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        raw = f.read()
+    path = str(tmp_path / ("file.sif." + codec))
+    with open(path, "wb") as f:
+        f.write(_compress(codec, raw, members))
+
+    data, info = sif_parser.np_open(path)
+    np.testing.assert_array_equal(data, expected)
+    assert info["NumberOfFrames"] == expected_info["NumberOfFrames"]
+    assert sif_parser.xr_open(path).shape == expected.shape
+
+    # the decompressed stream cannot be mapped on the memory
+    with pytest.raises(ValueError):
+        sif_parser.np_open(path, lazy="memmap")
+
+    with sif_parser.SifFile(path) as sif:
+        for i in [5, 0, 19, 3, 3, 18]:
+            np.testing.assert_array_equal(sif[i], expected[i])
+
+    index_path = sif_parser.build_index(path)
+    assert os.path.exists(index_path)
+    with sif_parser.SifFile(path) as sif:
+        assert len(sif._file.raw._checkpoints) == members
+        np.testing.assert_array_equal(sif[::-1], expected[::-1])
+
+
+def test_path(tmp_path):
+    from sif_parser import cli
+
+    expected, _ = sif_parser.np_open(MULTI_FRAME_FILE)
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        raw = f.read()
+    path = tmp_path / "file.sif.gz"
+    path.write_bytes(_compress("gz", raw))
+
+    # pathlib.Path is accepted as a str
+    data, info = sif_parser.np_open(path)
+    np.testing.assert_array_equal(data, expected)
+    assert os.path.exists(sif_parser.build_index(path))
+    with sif_parser.SifFile(path) as sif:
+        np.testing.assert_array_equal(sif[3], expected[3])
+
+    # only the header is read, also from a compressed file
+    header = sif_parser.SifHeader.read(path)
+    assert header.no_images == len(expected)
+    assert cli._shared_range([str(path)]) == cli._shared_range([MULTI_FRAME_FILE])
+
+
+def test_checkpoints(tmp_path):
+    rng = np.random.RandomState(0)
+    frames = rng.normal(size=(50, 32, 64)).astype(np.float32)
+    path = str(tmp_path / "file.sif")
+    sif_parser.write_sif(path, frames)
+    with open(path, "rb") as f:
+        raw = f.read()
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(raw))
+
+    reader = _compressed.open_compressed(path + ".gz", interval=20000)
+    assert reader.seek(0, 2) == len(raw)
+    assert len(reader.raw._checkpoints) > 5
+    random.seed(0)
+    for _ in range(100):
+        start = random.randrange(len(raw))
+        n = random.randrange(20000)
+        reader.seek(start)
+        assert reader.read(n) == raw[start:start + n]
+
+    reader.seek(0)
+    with sif_parser.SifFile(reader) as sif:
+        np.testing.assert_array_equal(sif[[40, 2, 30]], frames[[40, 2, 30]])
+    reader.close()
+
+
+def test_checkpoints_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(_compressed, "MAX_CHECKPOINTS", 4)
+    raw = np.random.RandomState(0).bytes(400000)
+    path = str(tmp_path / "file.gz")
+    with open(path, "wb") as f:
+        f.write(gzip.compress(raw))
+
+    reader = _compressed.open_compressed(path, interval=10000)
+    assert reader.seek(0, 2) == len(raw)
+    states = [c for c in reader.raw._checkpoints if c[2] is not None]
+    assert 2 <= len(states) <= 4
+    assert reader.raw._interval > 10000
+    random.seed(0)
+    for _ in range(20):
+        start = random.randrange(len(raw))
+        reader.seek(start)
+        assert reader.read(1000) == raw[start:start + 1000]
+    reader.close()
+
+
+def test_stale_index(tmp_path):
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        raw = f.read()
+    path = str(tmp_path / "file.sif.gz")
+    with open(path, "wb") as f:
+        f.write(gzip.compress(raw))
+    sif_parser.build_index(path)
+
+    # rewrite the file with another content
+    frames = np.ones((2, 3, 4), dtype=np.float32)
+    sif_parser.write_sif(str(tmp_path / "other.sif"), frames)
+    with open(str(tmp_path / "other.sif"), "rb") as f:
+        other = f.read()
+    with open(path, "wb") as f:
+        f.write(gzip.compress(other) + b"\x00" * 10)
+    data, info = sif_parser.np_open(path)
+    np.testing.assert_array_equal(data, frames)
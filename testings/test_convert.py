@@ -0,0 +1,127 @@
+import os
+import json
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+
+
+SPOOL_DIR = THIS_DIR + "/spool_data/encodings/Mono32/"
+
+
+def _load_npy(dest):
+    with open(os.path.join(dest, 'meta.json')) as f:
+        meta = json.load(f)
+    chunks = [np.load(os.path.join(dest, 'chunk_{:06d}.npy'.format(i)), mmap_mode='r')
+              for i in range(len(meta['chunks']))]
+    assert [len(c) for c in chunks] == meta['chunks']
+    return np.concatenate(chunks), meta
+
+
+@pytest.mark.parametrize("chunks", [None, 1, 3])
+def test_convert_sif(tmp_path, chunks):
+    path = str(tmp_path / 'data.sif')
+    expected = np.random.RandomState(0).randn(7, 1, 8).astype(np.float32)
+    sif_parser.write_sif(path, expected, {'Calibration_data': [500.0, 0.5, 0.0, 0.0]})
+    _, info = sif_parser.np_open(path)
+
+    dest = sif_parser.convert(path, str(tmp_path / 'store'), chunks=chunks, format='npy')
+    data, meta = _load_npy(dest)
+    np.testing.assert_array_equal(data, expected)
+    if chunks == 3:
+        assert meta['chunks'] == [3, 3, 1]
+    assert meta['shape'] == [7, 1, 8]
+    assert meta['dtype'] == '<f4'
+    assert meta['timestamps'] == [info['timestamp_of_{}'.format(i)] for i in range(7)]
+    np.testing.assert_allclose(meta['calibration'],
+                               sif_parser.utils.extract_calibration(info))
+    assert meta['info']['NumberOfFrames'] == 7
+    assert 'timestamp_of_0' not in meta['info']
+    assert 'tile' not in meta['info']
+
+
+def test_convert_blocks(tmp_path, monkeypatch):
+    from sif_parser import _convert, streaming
+
+    path = str(tmp_path / 'data.sif')
+    expected = np.random.RandomState(0).randn(7, 2, 8).astype(np.float32)
+    sif_parser.write_sif(path, expected)
+
+    # the blocks read are sized by bytes, not by the chunks
+    monkeypatch.setattr(streaming, '_CHUNK_BYTES', 2 * expected[0].nbytes)
+    sizes = []
+    map_blocks = _convert._map_blocks
+
+    def spy(func, tasks, workers):
+        for block in map_blocks(func, tasks, workers):
+            sizes.append(len(block))
+            yield block
+
+    monkeypatch.setattr(_convert, '_map_blocks', spy)
+    dest = sif_parser.convert(path, str(tmp_path / 'store'), chunks=5, format='npy')
+    assert sizes == [2, 2, 2, 1]
+    data, meta = _load_npy(dest)
+    assert meta['chunks'] == [5, 2]
+    np.testing.assert_array_equal(data, expected)
+
+
+def test_convert_frame_calibrations(tmp_path):
+    path = str(tmp_path / 'data.sif')
+    expected = np.zeros((3, 1, 8), dtype=np.float32)
+    info = {'Calibration_data_for_frame_{}'.format(i + 1): [500.0 + i, 0.5, 0.0, 0.0]
+            for i in range(3)}
+    sif_parser.write_sif(path, expected, info)
+
+    dest = sif_parser.convert(path, str(tmp_path / 'store'), format='npy')
+    data, meta = _load_npy(dest)
+    # the calibrations are stored only once
+    assert not any(key.startswith('Calibration_data_for_frame_') for key in meta['info'])
+    assert np.shape(meta['calibration']) == (3, 8)
+    np.testing.assert_allclose(np.array(meta['calibration'])[:, 0], [500.5, 501.5, 502.5])
+
+
+def test_convert_corrupt(tmp_path):
+    filename = THIS_DIR + "/corrupt_data/c0rrupt.sif"
+    with pytest.raises(ValueError, match="corrupt"):
+        sif_parser.convert(filename, str(tmp_path / 'store'), format='npy')
+    with pytest.warns(UserWarning, match="corrupt"):
+        dest = sif_parser.convert(filename, str(tmp_path / 'store'), format='npy',
+                                  ignore_corrupt=True)
+    with pytest.warns(UserWarning, match="corrupt"):
+        expected, info = sif_parser.np_open(filename, ignore_corrupt=True)
+    data, meta = _load_npy(dest)
+    np.testing.assert_array_equal(data, expected)
+
+
+def test_convert_spool(tmp_path):
+    expected, info = sif_parser.np_spool_open(SPOOL_DIR)
+    dest = sif_parser.convert(SPOOL_DIR, str(tmp_path / 'store'), chunks=2,
+                              format='npy', workers=2)
+    data, meta = _load_npy(dest)
+    assert data.dtype == expected.dtype
+    np.testing.assert_array_equal(data, expected)
+
+
+def test_convert_zarr(tmp_path):
+    zarr = pytest.importorskip('zarr')
+    path = str(tmp_path / 'data.sif')
+    expected = np.random.RandomState(0).randn(5, 3, 4).astype(np.float32)
+    sif_parser.write_sif(path, expected)
+    dest = sif_parser.convert(path, str(tmp_path / 'store.zarr'), chunks=2, format='zarr')
+    array = zarr.open_array(dest, mode='r')
+    np.testing.assert_array_equal(array[:], expected)
+    assert array.attrs['info']['NumberOfFrames'] == 5
+
+
+def test_convert_nan_metadata(tmp_path):
+    # RamanExWavelength is NaN in this file
+    filename = THIS_DIR + "/echelle/boron_0.05_1us_750ns_5.sif"
+    dest = sif_parser.convert(filename, str(tmp_path / 'store'), format='npy')
+
+    def reject(constant):
+        raise ValueError(constant)
+
+    with open(os.path.join(dest, 'meta.json')) as f:
+        meta = json.load(f, parse_constant=reject)
+    assert meta['info']['RamanExWavelength'] is None
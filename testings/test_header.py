@@ -0,0 +1,117 @@
+import os
+import pickle
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+
+
+d = THIS_DIR + "/"
+FILES = [
+    d + "issue33/measurement.sif",
+    d + "public_testdata/image.sif",
+    d + "examples_with_calibration/raman1.sif",
+    d + "step_and_glue/step_and_glue.sif",
+    d + "spool_data/encodings/Mono32/Spooled files.sifx",
+]
+FILES = [f for f in FILES if os.path.exists(f)]
+
+
+# info of issue33/measurement.sif, as the parser before SifHeader returned,
+# with SubImages added for the tracks
+MEASUREMENT_INFO = [
+    ("SifVersion", 65567),
+    ("ExperimentTime", 1690545064),
+    ("DetectorTemperature", -25.0),
+    ("ExposureTime", 3.0),
+    ("CycleTime", 3.0221),
+    ("AccumulatedCycleTime", 3.0221),
+    ("AccumulatedCycles", 1),
+    ("StackCycleTime", 3.0221),
+    ("PixelReadoutTime", 1e-06),
+    ("GainDAC", 2500.0),
+    ("GateWidth", 1e-08),
+    ("GratingBlaze", 6.5e-06),
+    ("DetectorType", "DH334T-18F-63"),
+    ("DetectorDimensions", (1024, 1024)),
+    ("OriginalFilename",
+     b"C:\\Users\\CCE_setup1\\Documents\\share\\Martijn\\230728\\01_roomtemp.sif"),
+    ("ShutterTime", (0.027, 0.0)),
+    ("spectrograph", "999"),
+    ("GateGain", 2500.0),
+    ("GateDelay", 0.0),
+    ("SifCalbVersion", 65540),
+    ("Calibration_data", [529.93812442523, 0.061715845778342,
+                          -2.28349748230931e-07, -5.07163560661353e-11]),
+    ("RamanExWavelength", 422.0),
+    ("FrameAxis", b"Wavelength"),
+    ("DataType", b"Counts"),
+    ("ImageAxis", b"Pixel number"),
+    ("NumberOfFrames", 20),
+    ("NumberOfSubImages", 1),
+    ("TotalLength", 20480),
+    ("ImageLength", 1024),
+    ("xbin", 1),
+    ("ybin", 1024),
+    ("SubImages", [(1, 1024, 1, 1024, 1, 1024)]),
+] + [("timestamp_of_{}".format(i), 0) for i in range(20)] + [
+    ("size", (1024, 1)),
+    ("tile", [("raw", (0, 0, 1024, 1), 3146 + i * 4096, ("F;32F", 0, 1))
+              for i in range(20)]),
+    ("offset", 3146),
+]
+
+
+def test_as_dict_expected():
+    header = sif_parser.SifHeader.read(THIS_DIR + "/issue33/measurement.sif")
+    actual = header.as_dict()
+    assert list(actual.keys()) == [key for key, _ in MEASUREMENT_INFO]
+    for key, value in MEASUREMENT_INFO:
+        assert actual[key] == value, key
+
+    # without the items of each frame
+    actual = header.as_dict(frames=False)
+    assert list(actual.keys()) == [
+        key for key, _ in MEASUREMENT_INFO
+        if key != "tile" and not key.startswith("timestamp_of_")]
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_as_dict(filename):
+    header = sif_parser.SifHeader.read(filename)
+    info = header.as_dict()
+    assert header.version == info["SifVersion"]
+    assert header.no_images == info["NumberOfFrames"]
+    assert header.exposure_time == info["ExposureTime"]
+    assert header.frame_axis == info["FrameAxis"].decode("utf-8")
+    assert header.timestamps.dtype == np.int64
+    np.testing.assert_array_equal(
+        header.timestamps,
+        [info["timestamp_of_{}".format(i)] for i in range(header.no_images)])
+
+    restored = pickle.loads(pickle.dumps(header))
+    assert list(restored.as_dict().keys()) == list(info.keys())
+
+
+def test_compact():
+    header = sif_parser.SifHeader.read(FILES[0])
+    assert not hasattr(header, "__dict__")
+    with pytest.raises(AttributeError):
+        header.unknown_field = 0
+
+
+def test_frame_calibrations(tmp_path):
+    frames = np.zeros((3, 1, 8), dtype=np.float32)
+    info = {"Calibration_data_for_frame_{}".format(i + 1): [float(i), 1.0, 0.0, 0.0]
+            for i in range(3)}
+    path = str(tmp_path / "frames.sif")
+    sif_parser.write_sif(path, frames, info)
+
+    header = sif_parser.SifHeader.read(path)
+    assert header.calibration is None
+    np.testing.assert_array_equal(
+        header.frame_calibrations, [[i, 1, 0, 0] for i in range(3)])
+    info = header.as_dict()
+    assert info["Calibration_data"] is None
+    assert info["Calibration_data_for_frame_2"] == [1.0, 1.0, 0.0, 0.0]
@@ -0,0 +1,68 @@
+import os
+THIS_DIR = os.path.dirname(__file__)
+
+import pytest
+import sif_parser
+from sif_parser import _instrument
+
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+SPOOL_DIR = THIS_DIR + "/spool_data/encodings/Mono32/"
+
+
+def test_instrument_xr_open():
+    with sif_parser.instrument() as events:
+        data = sif_parser.xr_open(MULTI_FRAME_FILE)
+    stages = [e["stage"] for e in events]
+    assert stages == ["_open", "read", "np_open", "extract_calibration", "_to_xarray"]
+    events = {e["stage"]: e for e in events}
+
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        _, _, _, info = sif_parser._sif_open._open(f)
+    # the parser may read a few bytes ahead
+    assert info["offset"] <= events["_open"]["nbytes"] < info["offset"] + 8
+    assert events["_open"]["depth"] == 1
+    assert events["read"]["nbytes"] == data.values.nbytes
+    assert events["np_open"]["nbytes"] == (
+        events["_open"]["nbytes"] + events["read"]["nbytes"])
+    assert events["np_open"]["depth"] == 0
+    assert all(e["duration"] >= 0 for e in events.values())
+
+    # nothing is reported after the context
+    sif_parser.np_open(MULTI_FRAME_FILE)
+    assert len(events) == 5
+    assert not _instrument.enabled()
+
+
+def test_instrument_callback():
+    events = []
+    with sif_parser.instrument(events.append):
+        data, info = sif_parser.np_spool_open(SPOOL_DIR)
+        sif_parser.np_open(MULTI_FRAME_FILE, lazy="dask")
+    stages = [e["stage"] for e in events]
+    assert "np_spool_open" in stages
+    assert "dask_graph" in stages
+    spool = [e for e in events if e["stage"] == "np_spool_open"][0]
+    assert spool["nbytes"] >= data.nbytes
+    assert spool["nreads"] >= len(data)
+
+    # the headers read by reduce and share are measured as well.
+    # share reads the header once more in np_open
+    for func, n_headers in [(sif_parser.reduce, 1), (sif_parser.share, 2)]:
+        events = []
+        with sif_parser.instrument(events.append):
+            result = func(MULTI_FRAME_FILE)
+        if func is sif_parser.share:
+            result.unlink()
+        headers = [e for e in events if e["stage"] == "_open"]
+        assert len(headers) == n_headers
+        assert all(e["nbytes"] > 0 for e in headers)
+
+
+def test_instrument_error():
+    with sif_parser.instrument() as events:
+        with pytest.raises(ValueError):
+            sif_parser.np_open(THIS_DIR + "/corrupt_data/c0rrupt.sif")
+    # the stages are closed even with the error
+    assert events[-1]["stage"] == "np_open"
+    assert _instrument._stack() == []
@@ -0,0 +1,119 @@
+import os
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+import sif_parser
+
+
+def _write(path, gate_delay, frames=3, seed=0):
+    data = np.random.RandomState(seed).randn(frames, 1, 6).astype(np.float32)
+    info = {'GateDelay': gate_delay, 'Calibration_data': [500.0, 0.5, 0.0, 0.0]}
+    sif_parser.write_sif(str(path), data, info)
+    return data
+
+
+@pytest.fixture
+def scan(tmp_path):
+    paths, data = [], []
+    for i, delay in enumerate([1e-4, 2e-4, 3e-4]):
+        path = tmp_path / 'delay_{}.sif'.format(i)
+        data.append(_write(path, delay, seed=i))
+        paths.append(str(path))
+    return paths, np.stack(data)
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_open_mfsif(scan, lazy):
+    paths, expected = scan
+    da = sif_parser.open_mfsif(paths, lazy=lazy, chunks=2)
+    assert da.dims == ('file', 'Time', 'height', 'width')
+    assert da.shape == expected.shape
+    if lazy:
+        assert da.chunks[1] == (2, 1)
+    np.testing.assert_array_equal(da.values, expected)
+    np.testing.assert_array_equal(da[1, 2].values, expected[1, 2])
+
+    # the same as opening the files one by one
+    single = sif_parser.xr_open(paths[0])
+    np.testing.assert_allclose(da['Time'], single['Time'])
+    np.testing.assert_allclose(da['calibration'], single['calibration'])
+    assert list(da['file'].values) == paths
+    np.testing.assert_allclose(da['GateDelay'], [1e-4, 2e-4, 3e-4])
+    assert 'GateDelay' not in da.attrs
+    assert da.attrs['ExposureTime'] == single.attrs['ExposureTime']
+
+    # the same as the other mode
+    assert da.name is None
+    other = sif_parser.open_mfsif(paths, lazy=not lazy, chunks=2)
+    assert da.compute().identical(other.compute())
+
+
+def test_open_mfsif_glob_and_index(scan, tmp_path):
+    paths, expected = scan
+    delay = pd.Index([1e-4, 2e-4, 3e-4], name='delay')
+    da = sif_parser.open_mfsif(str(tmp_path / '*.sif'), concat_dim=delay)
+    assert da.dims[0] == 'delay'
+    np.testing.assert_allclose(da['delay'], delay)
+    np.testing.assert_array_equal(da.sel(delay=2e-4).values, expected[1])
+
+
+def test_open_mfsif_time(scan, tmp_path):
+    paths, expected = scan
+    path = tmp_path / 'longer.sif'
+    longer = _write(path, 4e-4, frames=5)
+    paths = paths + [str(path)]
+    with pytest.raises(ValueError):
+        sif_parser.open_mfsif(paths)
+
+    da = sif_parser.open_mfsif(paths, concat_dim='Time', chunks=2)
+    assert da.dims == ('Time', 'height', 'width')
+    expected = np.concatenate(list(expected) + [longer])
+    np.testing.assert_array_equal(da.values, expected)
+    np.testing.assert_allclose(da['GateDelay'], [1e-4] * 3 + [2e-4] * 3 + [3e-4] * 3 + [4e-4] * 5)
+    assert da.attrs['NumberOfFrames'] == len(expected)
+
+
+def test_open_mfsif_task_size(tmp_path):
+    import pickle
+
+    # the tasks do not carry the items of each frame
+    sizes = []
+    for n in [10, 1000]:
+        paths = [str(tmp_path / 'f{}_{}.sif'.format(n, i)) for i in range(2)]
+        for i, path in enumerate(paths):
+            _write(path, 1e-4 * i, frames=n)
+        da = sif_parser.open_mfsif(paths, chunks=n)
+        graph = dict(da.data.__dask_graph__())
+        sizes.append(max(len(pickle.dumps(task)) for task in graph.values()))
+    # only the path and the frame numbers differ
+    assert sizes[1] - sizes[0] < 16
+
+
+def test_open_mfsif_incompatible(scan, tmp_path):
+    paths, _ = scan
+    path = str(tmp_path / 'other.sif')
+    sif_parser.write_sif(path, np.zeros((3, 2, 6), dtype=np.float32))
+    with pytest.raises(ValueError):
+        sif_parser.open_mfsif(paths + [path], concat_dim='Time')
+
+
+def test_open_mfsif_files():
+    paths = [THIS_DIR + '/issue33/measurement.sif'] * 2
+    da = sif_parser.open_mfsif(paths, concat_dim='Time')
+    expected = sif_parser.xr_open(paths[0])
+    xr.testing.assert_equal(da[:len(expected)].drop_vars('Time'),
+                            expected.drop_vars('Time'))
+
+
+def test_open_mfsif_nan_attrs():
+    # RamanExWavelength is NaN in this file
+    path = THIS_DIR + '/echelle/boron_0.05_1us_750ns_5.sif'
+    single = sif_parser.xr_open(path)
+    assert np.isnan(single.attrs['RamanExWavelength'])
+    da = sif_parser.open_mfsif([path, path])
+    assert 'RamanExWavelength' not in da.coords
+    assert np.isnan(da.attrs['RamanExWavelength'])
+    assert set(da.coords) == {'file', 'Time', 'calibration'}
@@ -166,6 +166,13 @@ def test_open(filename):
         assert np.allclose(ref, data)
 
 
+@pytest.mark.parametrize("filename", filenames)
+def test_xr_open_attrs(filename):
+    data = sif_parser.xr_open(filename)
+    assert "NumberOfSubImages" in data.attrs
+    assert "SubImages" not in data.attrs
+
+
 @pytest.mark.parametrize("filename", filenames)
 def test_dask_open(filename):
     data, info = sif_parser.np_open(filename)
@@ -425,5 +432,292 @@ def test_echelle():
     assert np.allclose(data, expected)
     
 
+@pytest.mark.parametrize("lazy", [None, "dask"])
+@pytest.mark.parametrize("filename", filenames)
+def test_binning(filename, lazy):
+    data, info = sif_parser.np_open(filename)
+    n, height, width = data.shape
+    expected = data[:, :height // 2 * 2, :width // 2 * 2].reshape(
+        n, height // 2, 2, width // 2, 2).sum(axis=(2, 4))
+
+    actual, binned_info = sif_parser.np_open(filename, lazy=lazy, bin=(2, 2))
+    assert actual.shape == expected.shape
+    assert np.allclose(actual, expected)
+    assert binned_info["xbin"] == info["xbin"] * 2
+    assert binned_info["ybin"] == info["ybin"] * 2
+
+    actual, binned_info = sif_parser.np_open(filename, lazy=lazy, vbin=True)
+    assert actual.shape == (n, 1, width)
+    assert np.allclose(actual, data.sum(axis=1, keepdims=True))
+
+    with pytest.raises(ValueError):
+        sif_parser.np_open(filename, lazy="memmap", bin=(2, 2))
+
+    for bin in [(0, 1), (1, 0), (-1, 1), (1.5, 1), (height + 1, 1),
+                (1, width + 1), (2, ), 2]:
+        with pytest.raises(ValueError, match="bin"):
+            sif_parser.np_open(filename, lazy=lazy, bin=bin)
+    with pytest.raises(ValueError, match="bin bx"):
+        sif_parser.np_open(filename, lazy=lazy, bin=(1, width + 1))
+
+
+def test_binning_calibration():
+    filename = PUBLIC_DATA_DIR + "cli/cli-0.sif"
+    data = sif_parser.xr_open(filename)
+    binned = sif_parser.xr_open(filename, bin=(1, 4))
+    assert binned.sizes["width"] == data.sizes["width"] // 4
+    expected = data["calibration"].values.reshape(-1, 4).mean(axis=-1)
+    assert np.allclose(binned["calibration"], expected)
+    assert np.allclose(binned.isel(Time=0, height=0),
+                       data.values[0, 0].reshape(-1, 4).sum(axis=-1))
+
+
+@pytest.mark.parametrize("filename", filenames)
+def test_open_out(filename):
+    expected, info = sif_parser.np_open(filename)
+    out = np.zeros_like(expected)
+    actual, info = sif_parser.np_open(filename, out=out)
+    assert actual is out
+    assert np.allclose(out, expected)
+
+    with pytest.raises(ValueError):
+        sif_parser.np_open(filename, out=np.zeros(expected.shape, dtype=float))
+    with pytest.raises(ValueError):
+        sif_parser.np_open(filename, out=out[:, :, :-1])
+    with pytest.raises(ValueError):
+        sif_parser.np_open(filename, lazy="dask", out=out)
+    assert is_file_not_in_use(filename)
+
+
+def test_open_out_shared_memory():
+    from multiprocessing import shared_memory
+
+    expected, info = sif_parser.np_open(PUBLIC_DATA_DIR + "image.sif")
+    shm = shared_memory.SharedMemory(create=True, size=expected.nbytes)
+    try:
+        out = np.ndarray(expected.shape, dtype=expected.dtype, buffer=shm.buf)
+        sif_parser.np_open(PUBLIC_DATA_DIR + "image.sif", out=out)
+        assert np.allclose(out, expected)
+        del out
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@pytest.mark.parametrize("spool_dir", spool_encoding_dirs)
+def test_np_spool_open_out(spool_dir):
+    expected, info = sif_parser.np_spool_open(spool_dir)
+    out = np.zeros_like(expected)
+    actual, info = sif_parser.np_spool_open(spool_dir, out=out)
+    assert np.shares_memory(actual, out)
+    assert np.all(out == expected)
+
+    with pytest.raises(ValueError):
+        sif_parser.np_spool_open(spool_dir, out=out.astype(np.float32))
+
+
+def test_np_spool_open_out_extra_frames(tmp_path):
+    import shutil
+
+    # the last dat file holds one more frame than the header says
+    spool_dir = str(tmp_path / "spool")
+    shutil.copytree(THIS_DIR + "/spool_data/encodings/Mono32/", spool_dir)
+    dat_files = sorted(glob.glob(os.path.join(spool_dir, "*spool.dat")),
+                       key=sif_parser.utils.ordered_dat_files)
+    with open(dat_files[-1], "rb") as f:
+        frame = f.read()
+    with open(dat_files[-1], "ab") as f:
+        f.write(frame)
+
+    expected, info = sif_parser.np_spool_open(THIS_DIR + "/spool_data/encodings/Mono32/")
+    out = np.zeros_like(expected)
+    for kwargs in [{}, {"out": out}]:
+        with pytest.raises(ValueError, match="corrupt"):
+            sif_parser.np_spool_open(spool_dir, **kwargs)
+        with pytest.warns(UserWarning, match="corrupt"):
+            actual, info = sif_parser.np_spool_open(spool_dir, ignore_missing=True, **kwargs)
+        assert np.all(actual == expected)
+
+
+@pytest.mark.parametrize("spool_dir", spool_encoding_dirs)
+def test_np_spool_open_out_padded(spool_dir, tmp_path):
+    import shutil
+
+    # an item of padding at the end of each row
+    padded_dir = str(tmp_path / "padded")
+    shutil.copytree(spool_dir, padded_dir)
+    ini_file = os.path.join(padded_dir, "acquisitionmetadata.ini")
+    with open(ini_file, encoding="utf-8-sig") as f:
+        lines = f.read().splitlines()
+    itemsize = 2 if "Mono16" in spool_dir else 4
+    lines = ["AOIStride = {}".format(201 * itemsize) if line.startswith("AOIStride")
+             else line for line in lines]
+    with open(ini_file, "w", encoding="utf-8-sig") as f:
+        f.write("\n".join(lines))
+
+    expected, info = sif_parser.np_spool_open(padded_dir)
+    assert expected.shape[1:] == (200, 200)
+    dat_file = sorted(glob.glob(os.path.join(padded_dir, "*spool.dat")))[0]
+    raw = np.fromfile(dat_file, dtype=expected.dtype, count=200 * 201)
+    assert np.all(expected[0] == raw.reshape(200, 201)[:, :200])
+
+    out = np.zeros_like(expected)
+    actual, info = sif_parser.np_spool_open(padded_dir, out=out)
+    assert np.shares_memory(actual, out)
+    assert np.all(out == expected)
+
+
+def test_progress_and_cancel():
+    import threading
+    from concurrent.futures import CancelledError
+
+    filename = THIS_DIR + "/issue33/measurement.sif"
+    calls = []
+    data, info = sif_parser.np_open(
+        filename, progress=lambda done, total: calls.append((done, total)))
+    assert calls[0] == (0, len(data))
+    assert calls[-1] == (len(data), len(data))
+    assert all(d1 <= d2 for (d1, _), (d2, _) in zip(calls[:-1], calls[1:]))
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(CancelledError):
+        sif_parser.np_open(filename, cancel=cancel)
+    assert is_file_not_in_use(filename)
+
+    # cancel from the progress callback, i.e., during reading
+    spool_dir = THIS_DIR + "/spool_data/encodings/Mono32/"
+    cancel = threading.Event()
+    calls = []
+
+    def progress(done, total):
+        calls.append(done)
+        if done >= 3:
+            cancel.set()
+
+    with pytest.raises(CancelledError):
+        sif_parser.np_spool_open(spool_dir, progress=progress, cancel=cancel)
+    assert calls == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("filename", filenames[:6] + corrupt_filenames)
+@pytest.mark.parametrize("bin", [None, (2, 2)])
+def test_open_workers(filename, bin, monkeypatch):
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected, info = sif_parser.np_open(filename, ignore_corrupt=True, bin=bin)
+        # make small chunks to read with several threads
+        with monkeypatch.context() as m:
+            m.setattr(sif_parser.sif_open, "_CHUNK_BYTES", 1)
+            actual, info = sif_parser.np_open(
+                filename, ignore_corrupt=True, bin=bin, workers=3)
+    np.testing.assert_array_equal(actual, expected)
+    assert is_file_not_in_use(filename)
+
+    out = np.zeros_like(expected)
+    if len(expected) == info['NumberOfFrames']:
+        data, info = sif_parser.np_open(filename, bin=bin, out=out, workers=2)
+        assert data is out
+        np.testing.assert_array_equal(out, expected)
+
+
+def test_open_workers_truncated(tmp_path, monkeypatch):
+    frames = np.arange(5 * 3 * 8, dtype=np.float32).reshape(5, 3, 8)
+    path = str(tmp_path / "truncated.sif")
+    sif_parser.write_sif(path, frames)
+    with open(path, "rb") as f:
+        raw = f.read()
+    with open(path, "wb") as f:
+        f.write(raw[:len(raw) - frames[3:].nbytes + 10])
+
+    # the file is truncated after its size is known
+    monkeypatch.setattr(sif_parser.sif_open, "_file_size", lambda f: len(raw))
+    with pytest.raises(ValueError, match="corrupt"):
+        sif_parser.np_open(path, workers=2)
+    with pytest.warns(UserWarning, match="corrupt"):
+        data, info = sif_parser.np_open(path, ignore_corrupt=True, workers=2)
+    np.testing.assert_array_equal(data, frames[:3])
+
+
+@pytest.mark.parametrize("buffer_type", [bytes, bytearray, memoryview])
+@pytest.mark.parametrize("lazy", [None, "memmap", "dask"])
+def test_open_buffer(buffer_type, lazy):
+    filename = THIS_DIR + "/issue33/measurement.sif"
+    expected, expected_info = sif_parser.np_open(filename)
+    with open(filename, "rb") as f:
+        raw = f.read()
+    buffer = buffer_type(raw)
+    data, info = sif_parser.np_open(buffer, lazy=lazy)
+    np.testing.assert_array_equal(np.asarray(data), expected)
+    assert info["NumberOfFrames"] == expected_info["NumberOfFrames"]
+    if lazy is None:
+        # zero copy
+        assert np.shares_memory(data, np.frombuffer(buffer, dtype=np.uint8))
+
+    truncated = raw[:expected_info["offset"] + expected[:-1].nbytes + 100]
+    with pytest.raises(ValueError, match="corrupt"):
+        sif_parser.np_open(buffer_type(truncated), lazy=lazy)
+
+
+@pytest.mark.parametrize("lazy", [None, "memmap", "dask"])
+@pytest.mark.parametrize("bin", [None, (1, 4)])
+def test_open_bytesio(lazy, bin):
+    import io
+
+    filename = THIS_DIR + "/issue33/measurement.sif"
+    if lazy == "memmap" and bin is not None:
+        return
+    expected, info = sif_parser.np_open(filename, bin=bin)
+    with open(filename, "rb") as f:
+        data, info = sif_parser.np_open(io.BytesIO(f.read()), lazy=lazy, bin=bin)
+    np.testing.assert_array_equal(np.asarray(data), expected)
+
+
+@pytest.mark.parametrize("source", ["path", "bytesio", "bytes", "gzip"])
+@pytest.mark.parametrize("workers", [None, 2])
+@pytest.mark.parametrize("bin", [None, (1, 2)])
+def test_truncated_salvage(tmp_path, source, workers, bin):
+    import gzip
+    import io
+
+    rng = np.random.RandomState(0)
+    frames = rng.normal(size=(5, 3, 8)).astype(np.float32)
+    path = str(tmp_path / "full.sif")
+    sif_parser.write_sif(path, frames)
+    with open(path, "rb") as f:
+        raw = f.read()
+    # cut in the middle of the 4th frame
+    n_pixels = 10
+    truncated = raw[:len(raw) - frames[3:].nbytes + n_pixels * 4 + 2]
+    path = str(tmp_path / "truncated.sif")
+    if source == "gzip":
+        truncated = gzip.compress(truncated)
+        path += ".gz"
+    with open(path, "wb") as f:
+        f.write(truncated)
+
+    def open_(**kwargs):
+        sif_file = {"bytesio": io.BytesIO(truncated), "bytes": truncated}.get(
+            source, path)
+        return sif_parser.np_open(sif_file, workers=workers, bin=bin, **kwargs)
+
+    def expected(salvage):
+        expected = frames[:4].copy() if salvage else frames[:3].copy()
+        expected[3:].reshape(-1)[n_pixels:] = np.nan
+        if bin is not None:
+            expected = expected.reshape(-1, 3, 4, 2).sum(axis=-1)
+        return expected
+
+    with pytest.raises(ValueError, match="corrupt"):
+        open_()
+    with pytest.warns(UserWarning, match="corrupt"):
+        data, info = open_(ignore_corrupt=True)
+    np.testing.assert_array_equal(data, expected(False))
+    with pytest.warns(UserWarning, match="corrupt"):
+        data, info = open_(ignore_corrupt=True, salvage=True)
+    np.testing.assert_array_equal(data, expected(True))
+
+
 if __name__ == "__main__":
     unittest.main()
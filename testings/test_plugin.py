@@ -8,11 +8,37 @@ from sif_parser import plugin, np_open
 
 
 class test(unittest.TestCase):
-    def _test_open(self):
-        data = PIL.Image.open(THIS_DIR + '/examples/image.sif')
-        actual = np.asarray(data)
-        expected, _ = np_open(THIS_DIR + '/examples/image.sif')
-        self.assertTrue(np.allclose(actual, expected))
+    def test_open(self):
+        filename = THIS_DIR + '/public_testdata/image.sif'
+        with PIL.Image.open(filename) as image:
+            self.assertEqual(image.format, 'SIF')
+            self.assertEqual(image.mode, 'F')
+            actual = np.asarray(image)
+        expected, info = np_open(filename)
+        self.assertTrue(np.allclose(actual, expected[0]))
+        self.assertEqual(image.info['ExposureTime'], info['ExposureTime'])
+        self.assertEqual(image.info['NumberOfSubImages'], 1)
+        self.assertNotIn('SubImages', image.info)
+
+    def test_seek(self):
+        filename = THIS_DIR + '/issue33/measurement.sif'
+        expected, info = np_open(filename)
+        with PIL.Image.open(filename) as image:
+            self.assertEqual(image.n_frames, len(expected))
+            self.assertTrue(image.is_animated)
+            # per-frame timestamps are not copied into info
+            self.assertNotIn('timestamp_of_1', image.info)
+            for frame in [0, 3, 1, len(expected) - 1]:
+                image.seek(frame)
+                self.assertEqual(image.tell(), frame)
+                np.testing.assert_array_equal(np.asarray(image), expected[frame])
+                self.assertEqual(image.info['timestamp'],
+                                 info['timestamp_of_{}'.format(frame)])
+            with self.assertRaises(EOFError):
+                image.seek(len(expected))
+        # the file is closed with the image
+        with self.assertRaises(ValueError):
+            image.seek(2)
 
 
 if __name__ == '__main__':
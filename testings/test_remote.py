@@ -0,0 +1,125 @@
+import functools
+import gzip
+import os
+import re
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+from sif_parser.remote import RangeFile, HTTPRangeReader, LocalRangeReader
+
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+
+
+class RangeHandler(SimpleHTTPRequestHandler):
+    """ SimpleHTTPRequestHandler that supports the Range header """
+    def send_head(self):
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        path = self.translate_path(self.path)
+        if match is None or not os.path.isfile(path):
+            return super().send_head()
+        with open(path, "rb") as f:
+            data = f.read()
+        start = int(match.group(1))
+        stop = min(int(match.group(2) or len(data) - 1) + 1, len(data))
+        if start >= len(data):
+            self.send_error(416)
+            return None
+        self.send_response(206)
+        self.send_header("Content-Range", "bytes {}-{}/{}".format(start, stop - 1, len(data)))
+        self.send_header("Content-Length", str(stop - start))
+        self.end_headers()
+        self.wfile.write(data[start:stop])
+        return None
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(directory, handler):
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(handler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("http")
+    shutil.copy(MULTI_FRAME_FILE, str(directory / "measurement.sif"))
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        (directory / "measurement.sif.gz").write_bytes(gzip.compress(f.read()))
+    rng = np.random.RandomState(0)
+    frames = rng.normal(size=(100, 32, 64)).astype(np.float32)
+    sif_parser.write_sif(str(directory / "large.sif"), frames)
+
+    range_server = _serve(str(directory), RangeHandler)
+    plain_server = _serve(str(directory), SimpleHTTPRequestHandler)
+    yield {
+        "url": "http://127.0.0.1:{}/".format(range_server.server_address[1]),
+        "plain_url": "http://127.0.0.1:{}/".format(plain_server.server_address[1]),
+        "frames": frames,
+    }
+    range_server.shutdown()
+    plain_server.shutdown()
+
+
+@pytest.mark.parametrize("name", ["measurement.sif", "measurement.sif.gz"])
+@pytest.mark.parametrize("url", ["url", "plain_url"])
+def test_np_open_url(server, name, url):
+    expected, expected_info = sif_parser.np_open(MULTI_FRAME_FILE)
+    data, info = sif_parser.np_open(server[url] + name)
+    np.testing.assert_array_equal(data, expected)
+    assert info["NumberOfFrames"] == expected_info["NumberOfFrames"]
+    with sif_parser.SifFile(server[url] + name) as sif:
+        np.testing.assert_array_equal(sif[[3, 1]], expected[[3, 1]])
+
+
+def test_fetch_only_requested(server):
+    frames = server["frames"]
+    frame_bytes = frames[0].nbytes
+    reader = HTTPRangeReader(server["url"] + "large.sif")
+    f = RangeFile(reader, block_size=4096, cache_size=4 * frame_bytes)
+    with sif_parser.SifFile(f) as sif:
+        # the header is fetched by a few requests
+        assert reader.nrequests <= 2
+        assert len(sif) == len(frames)
+        n = reader.nrequests
+        np.testing.assert_array_equal(sif[50], frames[50])
+        assert reader.nrequests == n + 1
+        # from the cache
+        np.testing.assert_array_equal(sif[50], frames[50])
+        assert reader.nrequests == n + 1
+        np.testing.assert_array_equal(sif[90:95], frames[90:95])
+        # the cache is bounded
+        assert len(f._blocks) * f.block_size <= f.cache_size
+        np.testing.assert_array_equal(sif[::7], frames[::7])
+        assert len(f._blocks) * f.block_size <= f.cache_size
+
+
+def test_local_backend():
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    f = RangeFile(LocalRangeReader(MULTI_FRAME_FILE), block_size=1000, cache_size=5000)
+    data, info = sif_parser.np_open(f)
+    np.testing.assert_array_equal(data, expected)
+    f.seek(0)
+    with sif_parser.SifFile(f) as sif:
+        np.testing.assert_array_equal(sif[::-3], expected[::-3])
+    f.close()
+
+
+def test_server_without_range(server):
+    # the whole file is downloaded only once
+    frames = server["frames"]
+    reader = HTTPRangeReader(server["plain_url"] + "large.sif")
+    f = RangeFile(reader, block_size=4096, cache_size=4 * frames[0].nbytes)
+    with sif_parser.SifFile(f) as sif:
+        np.testing.assert_array_equal(sif[50], frames[50])
+        np.testing.assert_array_equal(sif[::7], frames[::7])
+    assert reader.nrequests == 1
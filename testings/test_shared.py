@@ -0,0 +1,78 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+SPOOL_DIR = THIS_DIR + "/spool_data/encodings/Mono32/"
+
+
+def _frame_total(args):
+    handle, i = args
+    data = handle.data
+    total = float(data[i].sum())
+    del data
+    handle.close()
+    return total
+
+
+@pytest.mark.parametrize("path", [MULTI_FRAME_FILE, SPOOL_DIR])
+def test_share(path):
+    if os.path.isdir(path):
+        expected, info = sif_parser.np_spool_open(path)
+    else:
+        expected, info = sif_parser.np_open(path)
+
+    with sif_parser.share(path) as handle:
+        assert handle.shape == expected.shape
+        assert handle.info["NumberOfFrames"] == info["NumberOfFrames"]
+        assert np.all(handle.timestamps == [
+            info["timestamp_of_{:d}".format(f)] for f in range(len(expected))])
+        data = handle.data
+        assert np.all(data == expected)
+        del data
+
+        # the handle is small, and does not contain the data
+        assert len(pickle.dumps(handle)) < expected.nbytes
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            totals = list(executor.map(
+                _frame_total, [(handle, i) for i in range(len(expected))]))
+        assert np.allclose(totals, expected.sum(axis=(1, 2), dtype=float))
+
+    # the shared memory is released
+    with pytest.raises(FileNotFoundError):
+        pickle.loads(pickle.dumps(handle)).data
+
+
+def test_share_handle_size(tmp_path):
+    # the handle does not carry the items of each frame in info
+    sizes = []
+    for n in [10, 1000]:
+        path = str(tmp_path / "{}.sif".format(n))
+        sif_parser.write_sif(path, np.zeros((n, 1, 4), dtype=np.float32))
+        with sif_parser.share(path) as handle:
+            assert "tile" not in handle.info
+            assert "timestamp_of_0" not in handle.info
+            sizes.append(len(pickle.dumps(handle)))
+    # only the timestamps grow with the number of frames
+    assert sizes[1] - sizes[0] <= 8 * (1000 - 10) + 64
+
+
+def test_share_corrupt():
+    filename = THIS_DIR + "/corrupt_data/c0rrupt.sif"
+    with pytest.raises(ValueError):
+        sif_parser.share(filename)
+
+    with pytest.warns(UserWarning, match="corrupt."):
+        handle = sif_parser.share(filename, ignore_corrupt=True)
+    expected, info = sif_parser.np_open(filename, ignore_corrupt=True)
+    with handle:
+        assert handle.shape == expected.shape
+        data = handle.data
+        assert np.all(data == expected)
+        del data
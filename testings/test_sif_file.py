@@ -0,0 +1,119 @@
+import io
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+d = THIS_DIR + "/corrupt_data/"
+CORRUPT_FILES = [d + f for f in os.listdir(d) if f[-4:] in [".sif", ".SIF"]]
+
+
+@pytest.mark.parametrize("key", [
+    0, -1, 3, slice(None), slice(2, 5), slice(None, None, 3), slice(-4, None, -1),
+    [0, 1, 2, 5], np.array([4, 1]), (slice(1, 3), 0), (2, slice(None), 1),
+    Ellipsis, (Ellipsis, 0),
+])
+def test_getitem(key):
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with sif_parser.SifFile(MULTI_FRAME_FILE) as sif:
+        assert len(sif) == len(expected)
+        assert sif.shape == expected.shape
+        np.testing.assert_array_equal(sif[key], expected[key])
+    assert sif.closed
+
+
+def test_getitem_mask_and_errors():
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with sif_parser.SifFile(MULTI_FRAME_FILE) as sif:
+        mask = np.arange(len(sif)) % 2 == 0
+        np.testing.assert_array_equal(sif[mask], expected[mask])
+        with pytest.raises(IndexError):
+            sif[len(sif)]
+        assert sif[len(sif):].shape == (0, ) + expected.shape[1:]
+    with pytest.raises(ValueError):
+        sif[0]
+
+
+def test_info_and_xarray():
+    expected = sif_parser.xr_open(MULTI_FRAME_FILE)
+    with sif_parser.SifFile(MULTI_FRAME_FILE) as sif:
+        assert sif.info['NumberOfFrames'] == len(expected)
+        actual = sif.to_xarray()
+        np.testing.assert_array_equal(np.asarray(sif), expected.values)
+    assert actual.identical(expected)
+
+
+def test_file_objects():
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with open(MULTI_FRAME_FILE, 'rb') as f:
+        sif = sif_parser.SifFile(f)
+        np.testing.assert_array_equal(sif[1:3], expected[1:3])
+        sif.close()
+        assert not f.closed
+
+        f.seek(0)
+        sif = sif_parser.SifFile(io.BytesIO(f.read()))
+        np.testing.assert_array_equal(sif[::2], expected[::2])
+
+
+def test_threads():
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with sif_parser.SifFile(MULTI_FRAME_FILE) as sif:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            frames = list(executor.map(sif.__getitem__, list(range(len(sif))) * 4))
+    np.testing.assert_array_equal(np.stack(frames), np.concatenate([expected] * 4))
+
+
+@pytest.mark.parametrize("filename", CORRUPT_FILES)
+def test_corrupt(filename):
+    with pytest.raises(ValueError, match="corrupt"):
+        sif_parser.SifFile(filename)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected, info = sif_parser.np_open(filename, ignore_corrupt=True)
+        with sif_parser.SifFile(filename, ignore_corrupt=True) as sif:
+            np.testing.assert_array_equal(sif[:], expected)
+
+
+def test_tracks(tmp_path, monkeypatch):
+    from sif_parser._sif_open import SubImage
+
+    rng = np.random.RandomState(0)
+    frames = rng.normal(size=(6, 5, 16)).astype(np.float32)
+    # two tracks of 2 and 3 rows, binned by 4 rows
+    subimages = [SubImage(1, 16, 11, 18, 1, 4), SubImage(1, 16, 101, 112, 1, 4)]
+    path = str(tmp_path / "tracks.sif")
+    sif_parser.write_sif(path, frames, {"SubImages": subimages, "ybin": 4})
+
+    data, info = sif_parser.np_open(path)
+    assert info["SubImages"] == subimages
+    tracks = sif_parser.utils.split_tracks(data, info)
+    assert [t.shape for t in tracks] == [(6, 2, 16), (6, 3, 16)]
+    np.testing.assert_array_equal(tracks[1], frames[:, 2:])
+    assert all(np.shares_memory(t, data) for t in tracks)
+    assert sif_parser.xr_open(path).shape == frames.shape
+
+    with sif_parser.SifFile(path) as sif:
+        assert sif.header.subimages == subimages
+        # only the geometry of the header is used
+        with monkeypatch.context() as m:
+            m.delattr(sif_parser.SifHeader, "as_dict")
+            track = sif.tracks[1]
+        assert track.shape == (6, 3, 16)
+        assert track.subimage.height == 3
+        np.testing.assert_array_equal(track[4], frames[4, 2:])
+        np.testing.assert_array_equal(track[1:4], frames[1:4, 2:])
+        np.testing.assert_array_equal(track[::-2, 0], frames[::-2, 2])
+        np.testing.assert_array_equal(sif.tracks[0][[5, 0]], frames[[5, 0], :2])
+
+    # the tracks are mixed by the vertical binning
+    data, info = sif_parser.np_open(path, bin=(5, 1))
+    with pytest.raises(ValueError):
+        sif_parser.utils.split_tracks(data, info)
@@ -0,0 +1,249 @@
+import os
+import shutil
+import threading
+import time
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+SPOOL_DIR = THIS_DIR + "/spool_data/encodings/Mono32/"
+
+
+def _write_later(path, content, delay=0.05):
+    def write():
+        time.sleep(delay)
+        with open(path, "ab") as f:
+            f.write(content)
+    thread = threading.Thread(target=write)
+    thread.start()
+    return thread
+
+
+def test_follow_sif(tmp_path):
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        content = f.read()
+    stride = expected[0].nbytes
+    # header + 5 and half frames
+    n_first = info["offset"] + stride * 5 + stride // 2
+    path = str(tmp_path / "growing.sif")
+    with open(path, "wb") as f:
+        f.write(content[:n_first])
+
+    frames = list(sif_parser.follow(path, poll_interval=0.01, timeout=0.05))
+    assert len(frames) == 5
+    assert np.allclose(frames, expected[:5])
+
+    # rest of the frames are written while following
+    thread = _write_later(path, content[n_first:])
+    frames = list(sif_parser.follow(path, poll_interval=0.01, timeout=10))
+    thread.join()
+    assert len(frames) == len(expected)
+    assert np.allclose(frames, expected)
+
+
+def test_follow_sif_block(monkeypatch):
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    # the frames already written are read a few at a time
+    monkeypatch.setattr(sif_parser.streaming, "_CHUNK_BYTES", expected[0].nbytes * 3)
+    counts = []
+    fromfile = np.fromfile
+
+    def fromfile_counted(*args, **kwargs):
+        counts.append(kwargs["count"])
+        return fromfile(*args, **kwargs)
+
+    monkeypatch.setattr(np, "fromfile", fromfile_counted)
+    frames = list(sif_parser.follow(MULTI_FRAME_FILE, timeout=0))
+    assert np.allclose(frames, expected)
+    assert max(counts) == expected[0].size * 3
+
+
+def test_follow_sif_incomplete_header(tmp_path):
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        content = f.read()
+    path = str(tmp_path / "growing.sif")
+    with open(path, "wb") as f:
+        f.write(content[:1000])
+    assert list(sif_parser.follow(path, poll_interval=0.01, timeout=0.05)) == []
+
+    thread = _write_later(path, content[1000:])
+    frames = list(sif_parser.follow(path, poll_interval=0.01, timeout=10))
+    thread.join()
+    assert np.allclose(frames, expected)
+
+
+def test_follow_sif_header_cut_at_end(tmp_path):
+    expected, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    with open(MULTI_FRAME_FILE, "rb") as f:
+        content = f.read()
+    # cut just before the last flag of the header, which can be parsed
+    n_first = info["offset"] - 2
+    path = str(tmp_path / "growing.sif")
+    with open(path, "wb") as f:
+        f.write(content[:n_first])
+    assert list(sif_parser.follow(path, poll_interval=0.01, timeout=0.05)) == []
+
+    thread = _write_later(path, content[n_first:])
+    frames = list(sif_parser.follow(path, poll_interval=0.01, timeout=10))
+    thread.join()
+    assert len(frames) == len(expected)
+    assert np.allclose(frames, expected)
+
+
+def test_follow_spool(tmp_path):
+    expected, info = sif_parser.np_spool_open(SPOOL_DIR)
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    dat_files = []
+    for filename in os.listdir(SPOOL_DIR):
+        if filename.endswith("spool.dat"):
+            dat_files.append(filename)
+        elif not os.path.isdir(SPOOL_DIR + filename):
+            shutil.copy(SPOOL_DIR + filename, str(spool_dir))
+    dat_files = sorted(dat_files, key=sif_parser.utils.ordered_dat_files)
+    for filename in dat_files[:3]:
+        shutil.copy(SPOOL_DIR + filename, str(spool_dir))
+
+    frames = list(sif_parser.follow(str(spool_dir), poll_interval=0.01, timeout=0.05))
+    assert np.allclose(frames, expected[:3])
+
+    def write():
+        for filename in dat_files[3:]:
+            time.sleep(0.01)
+            shutil.copy(SPOOL_DIR + filename, str(spool_dir))
+    thread = threading.Thread(target=write)
+    thread.start()
+    frames = list(sif_parser.follow(str(spool_dir), poll_interval=0.01, timeout=10))
+    thread.join()
+    assert np.allclose(frames, expected)
+
+
+def test_follow_spool_header(tmp_path):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    ini_file = "acquisitionmetadata.ini"
+    for filename in os.listdir(SPOOL_DIR):
+        if filename.endswith(".sifx"):
+            shutil.copy(SPOOL_DIR + filename, str(spool_dir))
+    (spool_dir / ini_file).write_bytes(b"")
+    with open(SPOOL_DIR + ini_file, "rb") as f:
+        content = f.read()
+
+    # waits while the ini file is empty, but fails once it is invalid
+    thread = _write_later(str(spool_dir / ini_file),
+                          content.replace(b"Mono32", b"Mono64"))
+    with pytest.raises(ValueError, match="pixel encoding"):
+        next(sif_parser.follow(str(spool_dir), poll_interval=0.01))
+    thread.join()
+
+
+@pytest.mark.parametrize("path", [MULTI_FRAME_FILE, SPOOL_DIR])
+def test_follow_out(path):
+    if os.path.isdir(path):
+        expected, info = sif_parser.np_spool_open(path)
+    else:
+        expected, info = sif_parser.np_open(path)
+    out = np.zeros_like(expected[0])
+    frames = []
+    for frame in sif_parser.follow(path, out=out, timeout=0):
+        assert frame is out
+        frames.append(frame.copy())
+    assert np.all(np.array(frames) == expected)
+
+    with pytest.raises(ValueError):
+        next(sif_parser.follow(path, out=out[:-1]))
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+@pytest.mark.parametrize("path", [MULTI_FRAME_FILE, SPOOL_DIR])
+def test_reduce(path, workers):
+    if os.path.isdir(path):
+        data, info = sif_parser.np_spool_open(path)
+    else:
+        data, info = sif_parser.np_open(path)
+    data = data.astype(np.float64)
+    ops = ["sum", "mean", "max", "min", "std", "frame_total"]
+
+    actual = sif_parser.reduce(path, ops=ops, block_frames=3, workers=workers)
+    assert np.allclose(actual["sum"], data.sum(axis=0))
+    assert np.allclose(actual["mean"], data.mean(axis=0))
+    assert np.allclose(actual["max"], data.max(axis=0))
+    assert np.allclose(actual["min"], data.min(axis=0))
+    assert np.allclose(actual["std"], data.std(axis=0))
+    assert np.allclose(actual["frame_total"], data.sum(axis=(1, 2)))
+
+    actual = sif_parser.reduce(path, ops=ops, axis=None, block_frames=3, workers=workers)
+    assert np.allclose(actual["sum"], data.sum())
+    assert np.allclose(actual["mean"], data.mean())
+    assert np.allclose(actual["max"], data.max())
+    assert np.allclose(actual["min"], data.min())
+    assert np.allclose(actual["std"], data.std())
+
+
+@pytest.mark.parametrize("op", ["sum", "mean", "max", "min", "std", "frame_total"])
+@pytest.mark.parametrize("axis", [0, None])
+def test_reduce_single_op(op, axis):
+    data, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    data = data.astype(np.float64)
+    actual = sif_parser.reduce(MULTI_FRAME_FILE, ops=[op], axis=axis)
+    if op == "frame_total":
+        expected = data.sum(axis=(1, 2))
+    else:
+        expected = getattr(data, op)(axis=axis)
+    assert np.allclose(actual[op], expected)
+
+
+def test_reduce_blocks(monkeypatch):
+    from sif_parser import streaming
+
+    # only the statistics needed are computed
+    block = np.ones((2, 3, 4), dtype=np.float32)
+    assert set(streaming._block_stats(block, streaming._stats_needed(["max"]))) == {"n", "max"}
+    assert set(streaming._block_stats(block, streaming._stats_needed(["mean"]))) == {"n", "sum"}
+
+    # the blocks are sized by bytes
+    data, info = sif_parser.np_open(MULTI_FRAME_FILE)
+    monkeypatch.setattr(streaming, "_CHUNK_BYTES", 2 * data[0].nbytes)
+    tasks = streaming._block_tasks(MULTI_FRAME_FILE, None)[0]
+    assert [len(task()) for task in tasks[:-1]] == [2] * (len(tasks) - 1)
+
+
+def test_reduce_invalid():
+    with pytest.raises(ValueError):
+        sif_parser.reduce(MULTI_FRAME_FILE, ops=["median"])
+    with pytest.raises(ValueError):
+        sif_parser.reduce(MULTI_FRAME_FILE, axis=1)
+
+
+def test_reduce_corrupt(tmp_path):
+    filename = THIS_DIR + "/corrupt_data/c0rrupt.sif"
+    with pytest.raises(ValueError, match="corrupt"):
+        sif_parser.reduce(filename, ops=["frame_total"])
+    with pytest.warns(UserWarning, match="corrupt"):
+        actual = sif_parser.reduce(filename, ops=["frame_total"], ignore_corrupt=True)
+    with pytest.warns(UserWarning, match="corrupt"):
+        data, info = sif_parser.np_open(filename, ignore_corrupt=True)
+    assert np.allclose(actual["frame_total"], data.sum(axis=(1, 2)))
+
+    # a spooling acquisition without the last dat file
+    spool_dir = tmp_path / "spool"
+    shutil.copytree(SPOOL_DIR, str(spool_dir))
+    dat_files = sorted(
+        [f for f in os.listdir(str(spool_dir)) if f.endswith("spool.dat")],
+        key=sif_parser.utils.ordered_dat_files)
+    os.remove(str(spool_dir / dat_files[-1]))
+    with pytest.raises(ValueError, match="corrupt"):
+        sif_parser.reduce(str(spool_dir), ops=["frame_total"])
+    with pytest.warns(UserWarning, match="corrupt"):
+        actual = sif_parser.reduce(str(spool_dir), ops=["frame_total"],
+                                   ignore_corrupt=True)
+    expected, _ = sif_parser.np_spool_open(SPOOL_DIR)
+    n = len(actual["frame_total"])
+    assert n < len(expected)
+    assert np.allclose(actual["frame_total"], expected[:n].sum(axis=(1, 2)))
@@ -36,6 +36,64 @@ class TestExtract(unittest.TestCase):
             expected = np.poly1d(np.flipud(info[key]))(np.arange(1, 1025))
             self.assertTrue(np.allclose(actual[f], expected))
 
+    def test_calibration_mechelle(self):
+        info = OrderedDict()
+        info['DetectorDimensions'] = (1024, 1)
+        info['spectrograph'] = 'Mechelle'
+        info['PixelCalibration'] = [190.0, 0.3, -1.0e-5, 2.0e-10, 1.0e-14]
+        # the fallback from the older field should not be used
+        info['Calibration_data'] = [0.0, 1.0, 0.0, 0.0]
+
+        actual = utils.extract_calibration(info)
+        pixels = np.arange(1, 1025)
+        expected = sum(c * pixels**i for i, c in enumerate(info['PixelCalibration']))
+        self.assertTrue(np.allclose(actual, expected))
+
+        # cached for the same calibration, but a copy is returned
+        other = OrderedDict(info)
+        other['PixelCalibration'] = list(info['PixelCalibration'])
+        hits = utils._pixel_calibration.cache_info().hits
+        again = utils.extract_calibration(other)
+        self.assertEqual(utils._pixel_calibration.cache_info().hits, hits + 1)
+        self.assertIsNot(again, actual)
+        self.assertTrue(again.flags.writeable)
+        again[0] = 0.0
+        self.assertTrue(np.allclose(utils.extract_calibration(info), expected))
+
+        binned = OrderedDict(info)
+        binned['SoftwareBinning'] = (1, 4)
+        actual = utils.extract_calibration(binned)
+        self.assertTrue(np.allclose(actual, expected.reshape(-1, 4).mean(axis=-1)))
+
+    def test_calibration_echelle_file(self):
+        import sif_parser
+
+        # the calibration of this echelle file is from Calibration_data
+        filename = THIS_DIR + '/echelle/boron_0.05_1us_750ns_5.sif'
+        data, info = sif_parser.np_open(filename)
+        actual = utils.extract_calibration(info)
+        width = info['DetectorDimensions'][0]
+        expected = np.poly1d(np.flipud(info['Calibration_data']))(
+                                    np.arange(1, width + 1))
+        np.testing.assert_array_equal(actual, expected)
+        self.assertTrue(np.allclose(actual[[0, -1]], [199.51445344, 856.49833025]))
+
+    def test_calibration_mechelle_xr_open(self):
+        import tempfile
+        import sif_parser
+
+        coefficients = [190.0, 0.3, -1.0e-5, 2.0e-10]
+        data = np.arange(2 * 1 * 64, dtype=np.float32).reshape(2, 1, 64)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'mechelle.sif')
+            sif_parser.write_sif(path, data, {
+                'spectrograph': 'Mechelle', 'PixelCalibration': coefficients})
+            actual = sif_parser.xr_open(path)
+        pixels = np.arange(1, 65)
+        expected = sum(c * pixels**i for i, c in enumerate(coefficients))
+        self.assertEqual(actual['calibration'].dims, ('width', ))
+        self.assertTrue(np.allclose(actual['calibration'], expected))
+
 
 if __name__ == '__main__':
      unittest.main()
@@ -0,0 +1,114 @@
+import os
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import sif_parser
+
+
+filenames = [
+    THIS_DIR + "/issue33/measurement.sif",
+    THIS_DIR + "/step_and_glue/step_and_glue.sif",
+    THIS_DIR + "/echelle/boron_0.05_1us_750ns_5.sif",
+    THIS_DIR + "/raman_data/DD58_785_1_Fe2O3_5x10s.sif",
+    THIS_DIR + "/issue27/test.sif",
+    THIS_DIR + "/public_testdata/image.sif",
+]
+
+keys = [
+    "ExperimentTime", "DetectorTemperature", "ExposureTime", "CycleTime",
+    "AccumulatedCycleTime", "AccumulatedCycles", "StackCycleTime",
+    "PixelReadoutTime", "GainDAC", "GratingBlaze", "DetectorType",
+    "DetectorDimensions", "ShutterTime", "NumberOfFrames", "NumberOfSubImages",
+    "TotalLength", "ImageLength", "xbin", "ybin", "size", "Calibration_data",
+    "FrameAxis", "DataType", "ImageAxis",
+]
+
+
+@pytest.mark.parametrize("filename", filenames)
+def test_round_trip(filename, tmp_path):
+    data, info = sif_parser.np_open(filename)
+    path = str(tmp_path / "written.sif")
+    assert sif_parser.write_sif(path, data, info) == len(data)
+
+    actual, actual_info = sif_parser.np_open(path)
+    assert np.all(actual == data)
+    for key in keys:
+        assert actual_info[key] == info[key], key
+    for f in range(len(data)):
+        key = "timestamp_of_{:d}".format(f)
+        assert actual_info[key] == info[key]
+    assert np.allclose(
+        sif_parser.utils.extract_calibration(actual_info),
+        sif_parser.utils.extract_calibration(info))
+
+
+def test_write_array_calibration(tmp_path):
+    data, info = sif_parser.np_open(THIS_DIR + "/issue33/measurement.sif")
+    info = dict(info, Calibration_data=np.array([500.0, 0.5, 0.0, 0.0]),
+                SifVersion=65559)
+    path = str(tmp_path / "written.sif")
+    sif_parser.write_sif(path, data, info)
+
+    actual, actual_info = sif_parser.np_open(path)
+    assert np.allclose(actual_info["Calibration_data"], [500.0, 0.5, 0.0, 0.0])
+    # always written in the newest version
+    assert actual_info["SifVersion"] == 65567
+
+
+def test_write_iterable(tmp_path):
+    data, info = sif_parser.np_open(THIS_DIR + "/issue33/measurement.sif")
+    path = str(tmp_path / "written.sif")
+    # blocks and frames can be mixed
+    frames = (block for block in [data[:5], data[5], data[6:]])
+    sif_parser.write_sif(path, frames, info)
+    actual, _ = sif_parser.np_open(path)
+    assert np.all(actual == data)
+
+    # number of frames is necessary
+    with pytest.raises(ValueError):
+        sif_parser.write_sif(path, iter(data), {})
+    with pytest.raises(ValueError):
+        sif_parser.write_sif(path, iter(data[:-1]), info)
+    with pytest.raises(ValueError):
+        sif_parser.write_sif(path, iter(data), dict(info, NumberOfFrames=3))
+    # the incomplete file is not left
+    assert not os.path.exists(path)
+    with pytest.raises(ValueError, match="No frames"):
+        sif_parser.write_sif(path, iter([]), info)
+    assert not os.path.exists(path)
+
+
+def test_write_one_frame(tmp_path):
+    frame = np.arange(3 * 8, dtype=np.float32).reshape(3, 8)
+    path = str(tmp_path / "written.sif")
+    assert sif_parser.write_sif(path, frame, {"NumberOfFrames": 1}) == 1
+    actual, info = sif_parser.np_open(path)
+    assert np.all(actual == frame[np.newaxis])
+    assert info["size"] == (8, 3)
+
+
+def test_write_calibration_for_frames(tmp_path):
+    info = {"NumberOfFrames": 2, "GateDelay": 4.8e-4, "GateWidth": 2e-6,
+            "GateGain": 4095.0, "RamanExWavelength": 785.0}
+    info["Calibration_data_for_frame_1"] = [500.0, 0.1, 0.0, 0.0]
+    info["Calibration_data_for_frame_2"] = [600.0, 0.1, 0.0, 0.0]
+    data = np.arange(2 * 1 * 16, dtype=np.float32).reshape(2, 1, 16)
+    path = str(tmp_path / "written.sif")
+    sif_parser.write_sif(path, data, info)
+
+    actual = sif_parser.xr_open(path)
+    assert np.all(actual.values == data)
+    assert actual["calibration"].shape == (2, 16)
+    assert np.allclose(actual["calibration"][1, 0], 600.1)
+    for key in ["GateDelay", "GateWidth", "GateGain", "RamanExWavelength"]:
+        assert np.allclose(actual.attrs[key], info[key])
+
+
+def test_write_header_only(tmp_path):
+    path = str(tmp_path / "header.sifx")
+    assert sif_parser.write_sif(path, None, {"NumberOfFrames": 3, "size": (8, 4)}) == 0
+    with pytest.warns(UserWarning, match="corrupt"):
+        data, info = sif_parser.np_open(path, ignore_corrupt=True)
+    assert info["NumberOfFrames"] == 3
+    assert info["size"] == (8, 4)
@@ -0,0 +1,56 @@
+import os
+THIS_DIR = os.path.dirname(__file__)
+
+import numpy as np
+import pytest
+import xarray as xr
+import sif_parser
+from sif_parser.xarray_backend import SifBackendEntrypoint
+
+
+MULTI_FRAME_FILE = THIS_DIR + "/issue33/measurement.sif"
+FILES = [
+    MULTI_FRAME_FILE,
+    THIS_DIR + "/public_testdata/image.sif",
+    THIS_DIR + "/examples_with_calibration/raman1.sif",
+    THIS_DIR + "/echelle/boron_0.05_1us_750ns_5.sif",
+]
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_open_dataarray(filename):
+    expected = sif_parser.xr_open(filename)
+    with xr.open_dataarray(filename, engine=SifBackendEntrypoint) as actual:
+        assert actual.name == 'counts'
+        xr.testing.assert_identical(actual.rename(None).load(), expected)
+
+
+@pytest.mark.parametrize("key", [
+    (5, ), (slice(2, 7), ), (slice(None, None, 3), 0), ([1, 4, 3], ),
+    (slice(1, 3), slice(None), [0, 10, 5]),
+])
+def test_lazy_indexing(key):
+    expected = sif_parser.xr_open(MULTI_FRAME_FILE)
+    with xr.open_dataset(MULTI_FRAME_FILE, engine=SifBackendEntrypoint) as ds:
+        with sif_parser.instrument() as events:
+            actual = ds['counts'][key].values
+        np.testing.assert_array_equal(actual, expected[key].values)
+        # only the frames selected are read
+        n_frames = len(np.arange(len(expected))[key[0]].reshape(-1))
+        nbytes = sum(e['nbytes'] for e in events if e['stage'] == 'read')
+        assert 0 < nbytes <= n_frames * expected[0].nbytes
+
+
+def test_chunks_and_drop():
+    expected = sif_parser.xr_open(MULTI_FRAME_FILE)
+    with xr.open_dataset(MULTI_FRAME_FILE, engine=SifBackendEntrypoint,
+                         chunks={'Time': 4}, drop_variables=['calibration']) as ds:
+        assert ds['counts'].chunks[0][0] == 4
+        assert 'calibration' not in ds.coords
+        np.testing.assert_array_equal(ds['counts'].values, expected.values)
+
+
+def test_guess_can_open():
+    backend = SifBackendEntrypoint()
+    assert backend.guess_can_open(MULTI_FRAME_FILE)
+    assert not backend.guess_can_open('file.nc')